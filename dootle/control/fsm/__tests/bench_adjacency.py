@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Compare predecessor scans over a networkx DiGraph, with status lookups through machines,
+against the same scans over an AdjacencyIndex, for time and memory.
+
+As the tracker keeps its graph when using an index,
+the memory the index retains is reported as added to the graph's.
+The machine the benchmark ran on is printed first, for recording results.
+
+Not collected by pytest. Run with:
+python -m dootle.control.fsm.__tests.bench_adjacency [count] [fanin]
+
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import gc
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+import networkx as nx
+from doot.workflow._interface import TaskStatus_e
+
+# ##-- end 3rd party imports
+
+from ..adjacency import AdjacencyIndex
+
+# Vars:
+DEFAULT_COUNT  : int  = 200_000
+DEFAULT_FANIN  : int  = 4
+ROOT           : str  = "__root"
+SEED           : int  = 1
+##--|
+
+class _Machine:
+    """ Stands in for a TaskMachine, as the tracker's status lookup reads it """
+    __slots__ = ("current_state_value",)
+
+    def __init__(self, status:TaskStatus_e) -> None:
+        self.current_state_value = status
+
+def _edges(count:int, fanin:int) -> list[tuple[str, str]]:
+    rng = random.Random(SEED)
+    edges = [(f"task::{x}", ROOT) for x in range(count)]
+    for x in range(1, count):
+        edges += [(f"task::{y}", f"task::{x}") for y in rng.sample(range(x), min(x, fanin))]
+    else:
+        return edges
+
+def _measure_build(build:Callable) -> tuple[object, float, float, float]:
+    """ Returns the built object, the build time in ms, and the retained and peak memory in MiB """
+    gc.collect()
+    tracemalloc.start()
+    start          = time.perf_counter_ns()
+    result         = build()
+    done           = time.perf_counter_ns()
+    current, peak  = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, (done - start) / 1e6, current / 1024 / 1024, peak / 1024 / 1024
+
+def _measure_scan(label:str, scan:Callable, nodes:list, build_ms:float, peak:float) -> None:
+    edges  = 0
+    start  = time.perf_counter_ns()
+    for node in nodes:
+        edges += len(scan(node))
+    else:
+        done = time.perf_counter_ns()
+
+    print(f"{label:<16} : build {build_ms:>9.1f} ms "
+          f": build peak mem {peak:>8.1f} MiB "
+          f": scan {(done - start) / 1e6:>9.1f} ms "
+          f": {edges / ((done - start) / 1e9) / 1e6:>6.2f} M preds/s")
+
+def main(count:int=DEFAULT_COUNT, fanin:int=DEFAULT_FANIN) -> None:
+    edges     = _edges(count, fanin)
+    nodes     = [f"task::{x}" for x in range(count)]
+    statuses  = list(TaskStatus_e)
+    machines  = {x:_Machine(statuses[i % len(statuses)]) for i, x in enumerate(nodes)}
+    print(f"Python {platform.python_version()} : {platform.platform()} : {platform.processor() or platform.machine()}")
+    print(f"Tasks: {count} : Edges: {len(edges)}")
+
+    def build_graph() -> nx.DiGraph:
+        graph = nx.DiGraph()
+        graph.add_edges_from(edges)
+        return graph
+
+    graph, build_ms, graph_mem, peak = _measure_build(build_graph)
+
+    def scan_graph(node:str) -> list:
+        return [(x, machines[x].current_state_value) for x in graph.pred[node] if x != ROOT]
+
+    _measure_scan("networkx", scan_graph, nodes, build_ms, peak)
+
+    def build_index() -> AdjacencyIndex:
+        index = AdjacencyIndex()
+        index.index(graph.nodes, graph.pred, graph.succ, exclude=ROOT)
+        for x in nodes:
+            index.set_status(x, machines[x].current_state_value)
+        else:
+            return index
+
+    index, build_ms, index_mem, peak = _measure_build(build_index)
+    _measure_scan("AdjacencyIndex", index.pred_states, nodes, build_ms, peak)
+    print(f"Retained : graph {graph_mem:>8.1f} MiB "
+          f": graph + index {graph_mem + index_mem:>8.1f} MiB "
+          f": index adds {100 * index_mem / graph_mem:>5.1f}%")
+
+##--|
+if __name__ == "__main__":
+    main(*(int(x) for x in sys.argv[1:3]))
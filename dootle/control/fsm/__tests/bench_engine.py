@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Compare TaskMachine and TaskEngine, for time and memory,
+over a number of simple task models.
+
+Not collected by pytest. Run with:
+python -m dootle.control.fsm.__tests.bench_engine [count]
+
+Prints the machine it ran on, each engine's build and run times and build memory,
+and TaskEngine's cost as a fraction of TaskMachine's, for recording with the change being measured.
+
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import gc
+import platform
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+
+# ##-- end stdlib imports
+
+from ..engine import TaskEngine
+from ..machines import TaskMachine
+from .test_machines import SimpleTaskModel
+
+# Vars:
+DEFAULT_COUNT : int  = 50_000
+TRACKER       : dict = {"blah": 5}
+##--|
+
+def _build_machines(models:list) -> list:
+    return [TaskMachine(x) for x in models]
+
+def _build_engine(models:list) -> list:
+    engine = TaskEngine()
+    return [engine.machine(x) for x in models]
+
+def measure(label:str, build:Callable, count:int) -> tuple[float, float]:
+    """ Build and run count machines, returning the ns per task and the peak bytes per task """
+    models = [SimpleTaskModel() for _ in range(count)]
+    gc.collect()
+    tracemalloc.start()
+    start     = time.perf_counter_ns()
+    machines  = build(models)
+    built     = time.perf_counter_ns()
+    _, peak   = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    for fsm in machines:
+        fsm.run_until_dead(TRACKER)
+    else:
+        done = time.perf_counter_ns()
+
+    print(f"{label:<12} : build {(built - start) / 1e6:>10.1f} ms "
+          f": run {(done - built) / 1e6:>10.1f} ms "
+          f": build peak mem {peak / 1024 / 1024:>8.1f} MiB "
+          f": {(done - start) / count / 1e3:>6.2f} us/task")
+    return (done - start) / count, peak / count
+
+def main(count:int=DEFAULT_COUNT) -> None:
+    print(f"Python {platform.python_version()} : {platform.platform()} : {platform.processor() or platform.machine()}")
+    print(f"Tasks: {count}")
+    machine_ns, machine_mem  = measure("TaskMachine", _build_machines, count)
+    engine_ns, engine_mem    = measure("TaskEngine", _build_engine, count)
+    print(f"TaskEngine/TaskMachine : time {engine_ns / machine_ns:.2f}x : build mem {engine_mem / machine_mem:.2f}x")
+
+##--|
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if 1 < len(sys.argv) else DEFAULT_COUNT)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Measure the per task overhead of FSMTask,
+and the cost of hashing and comparing tasks, as a tracker does.
+
+Not collected by pytest. Run with:
+python -m dootle.control.fsm.__tests.bench_task [count]
+
+Prints the machine it ran on, with the per task memory and lookup times,
+for recording in FSMTask's docstring or the change being measured.
+
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import gc
+import platform
+import sys
+import time
+import tracemalloc
+
+# ##-- end stdlib imports
+
+from ..factory import FSMFactory
+from ..task import FSMTask
+
+# Vars:
+DEFAULT_COUNT : int  = 50_000
+factory              = FSMFactory()
+##--|
+
+def main(count:int=DEFAULT_COUNT) -> None:
+    specs  = [factory.build({"name":f"bench::task.{i}"}) for i in range(count)]
+    gc.collect()
+    tracemalloc.start()
+    tasks          = [FSMTask(x) for x in specs]
+    current, peak  = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"Python {platform.python_version()} : {platform.platform()} : {platform.processor() or platform.machine()}")
+    print(f"Tasks: {count}")
+    print(f"Shell only  : {sys.getsizeof(tasks[0])} bytes")
+    print(f"Allocated   : {current / count:>8.1f} bytes/task (peak {peak / count:.1f})")
+
+    lookup  = {x:x for x in tasks}
+    names   = [x.spec.name[:] for x in tasks]
+    start   = time.perf_counter_ns()
+    for task in tasks:
+        lookup[task]
+    else:
+        hashed = time.perf_counter_ns()
+
+    for task, name in zip(tasks, names, strict=True):
+        task == name  # noqa: B015
+    else:
+        compared = time.perf_counter_ns()
+
+    print(f"Dict lookup : {(hashed - start) / count:>8.1f} ns/task")
+    print(f"Eq to name  : {(compared - hashed) / count:>8.1f} ns/task")
+
+##--|
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if 1 < len(sys.argv) else DEFAULT_COUNT)
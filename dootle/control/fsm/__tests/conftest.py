@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Fixtures shared by the fsm tests
+
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import logging as logmod
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+import pytest
+from doot.workflow import TaskName
+# ##-- end 3rd party imports
+
+from dootle.actions.postbox import _DootPostBox
+from ..observe import HOOKS
+
+logging = logmod.root
+
+@pytest.fixture(scope="function")
+def name():
+    return TaskName("basic::task")
+
+@pytest.fixture(scope="function")
+def postbox():
+    """ The global postbox, emptied before and after the test """
+    _DootPostBox.clear()
+    yield _DootPostBox
+    _DootPostBox.clear()
+
+@pytest.fixture(scope="function")
+def hooks():
+    """ The global observe.HOOKS, with every subscriber removed before and after the test """
+    HOOKS.clear()
+    yield HOOKS
+    HOOKS.clear()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import logging as logmod
+import pathlib as pl
+import warnings
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+import networkx as nx
+import pytest
+from doot.workflow._interface import TaskStatus_e
+
+# ##-- end 3rd party imports
+
+from .. import adjacency as adj
+from ..adjacency import AdjacencyIndex
+
+logging = logmod.root
+
+ROOT : str = "__root"
+
+@pytest.fixture(scope="function")
+def graph():
+    graph = nx.DiGraph()
+    graph.add_edges_from([("a", "b"), ("b", "c"), ("a", "c"), ("c", ROOT)])
+    return graph
+
+class TestAdjacencyIndex:
+
+    def test_ctor(self):
+        obj = AdjacencyIndex()
+        assert(isinstance(obj, AdjacencyIndex))
+        assert(len(obj) == 0)
+
+    def test_index(self, graph):
+        obj = AdjacencyIndex()
+        new = obj.index(graph.nodes, graph.pred, graph.succ, exclude=ROOT)
+        assert(set(new) == {"a", "b", "c"})
+        assert(set(obj.preds("c")) == {"a", "b"})
+        assert(obj.succs("a") == list(graph.succ["a"]))
+        assert(obj.succs("c") == [])
+        assert(ROOT not in obj)
+
+    def test_neighbours_are_not_indexed(self, graph):
+        obj = AdjacencyIndex()
+        obj.index(["a"], graph.pred, graph.succ, exclude=ROOT)
+        assert("a" in obj)
+        assert("b" not in obj)
+
+    def test_status_defaults_unknown(self, graph):
+        obj = AdjacencyIndex()
+        obj.index(graph.nodes, graph.pred, graph.succ, exclude=ROOT)
+        assert(all(y is None for _, y in obj.pred_states("c")))
+
+    def test_set_status(self, graph):
+        obj = AdjacencyIndex()
+        obj.index(graph.nodes, graph.pred, graph.succ, exclude=ROOT)
+        obj.set_status("a", TaskStatus_e.SUCCESS)
+        assert(dict(obj.pred_states("c")) == {"a": TaskStatus_e.SUCCESS, "b": None})
+        assert(dict(obj.succ_states("b")) == {"c": None})
+
+    def test_set_status_unindexed(self):
+        obj = AdjacencyIndex()
+        obj.set_status("a", TaskStatus_e.SUCCESS)
+        assert(len(obj) == 0)
+
+    def test_reindex_patches(self, graph):
+        obj = AdjacencyIndex()
+        obj.index(graph.nodes, graph.pred, graph.succ, exclude=ROOT)
+        graph.add_edge("d", "c")
+        new = obj.index(["d", "c"], graph.pred, graph.succ, exclude=ROOT)
+        assert(new == ["d"])
+        assert(set(obj.preds("c")) == {"a", "b", "d"})
+        assert(set(obj._pred.patched) == {obj.id_of("d"), obj.id_of("c")})
+
+    def test_compaction(self, graph, mocker):
+        mocker.patch.object(adj, "COMPACT_MIN", 1)
+        obj = AdjacencyIndex()
+        obj.index(graph.nodes, graph.pred, graph.succ, exclude=ROOT)
+        for x in range(5):
+            graph.add_edge(f"x{x}", "c")
+            obj.index([f"x{x}", "c"], graph.pred, graph.succ, exclude=ROOT)
+        else:
+            assert(set(obj.preds("c")) == {"a", "b", *(f"x{x}" for x in range(5))})
+            assert(len(obj._pred.patched) <= 2)  # noqa: PLR2004
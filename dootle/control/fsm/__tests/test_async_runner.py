@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+TEST File updated
+
+"""
+# ruff: noqa: ANN201, ARG001, ANN001, ARG002, ANN202, B011, ERA001
+
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import asyncio
+import logging as logmod
+import pathlib as pl
+import warnings
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+import pytest
+import doot.errors
+from doot.workflow.factory import TaskFactory
+from doot.workflow import TaskSpec
+from doot.workflow._interface import TaskStatus_e
+from doot.workflow._interface import ActionResponse_e as ActRE
+
+# ##-- end 3rd party imports
+
+##--|
+from ..fsm_tracker import FSMTracker
+from ..async_runner import AsyncFSMRunner
+from ..observe import HOOKS
+from ..task import FSMJob, FSMTask
+
+##--|
+
+# ##-- types
+# isort: off
+# General
+import abc
+import collections.abc
+import typing
+import types
+from typing import cast, assert_type, assert_never
+from typing import Generic, NewType, Never
+from typing import no_type_check, final, override, overload
+# Protocols and Interfaces:
+from typing import Protocol, runtime_checkable
+if typing.TYPE_CHECKING:
+    from typing import Final, ClassVar, Any, Self
+    from typing import Literal, LiteralString
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+    from jgdv import Maybe
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+factory = TaskFactory()
+# Body:
+
+async def async_action(spec, state) -> dict:
+    await asyncio.sleep(0)
+    return {"async_ran": True}
+
+def sync_action(spec, state) -> dict:
+    return {"sync_ran": True}
+
+called : list = []
+
+async def async_record(spec, state) -> None:
+    await asyncio.sleep(0)
+    called.append(True)
+
+async def async_expand(spec, state) -> list:
+    await asyncio.sleep(0)
+    return []
+
+def fail_action(spec, state) -> bool:
+    return False
+
+class AsyncCallable:
+
+    async def __call__(self, spec, state) -> dict:
+        await asyncio.sleep(0)
+        return {"instance_ran": True}
+
+class TestAsyncFSMRunner:
+
+    def test_basic(self):
+        tracker = FSMTracker()
+        match AsyncFSMRunner(tracker=tracker, workers=10):
+            case AsyncFSMRunner() as runner:
+                assert(runner.workers == 10) # noqa: PLR2004
+                assert(runner.processes == 0)
+            case x:
+                assert(False), x
+
+    def test_run_mixed_actions(self):
+        tracker  = FSMTracker()
+        spec     = factory.build({"name":"simple::basic",
+                                  "actions" : [{"do":async_action}, {"do":sync_action}],
+                                  })
+        name     = tracker.queue(spec, from_user=True)
+        tracker.build()
+        runner   = AsyncFSMRunner(tracker=tracker, workers=4)
+        task     = tracker.machines[name].model
+        for _ in range(20):
+            if not bool(tracker):
+                break
+            runner.run_next_task()
+            if tracker.get_status(target=name)[0] is TaskStatus_e.TEARDOWN:
+                assert(task.internal_state['async_ran'] is True)
+                assert(task.internal_state['sync_ran'] is True)
+
+        assert(tracker.get_status(target=name)[0] is TaskStatus_e.DEAD)
+
+class TestAsyncActions:
+
+    def test_async_instance_is_awaited(self):
+        task = FSMTask(factory.build({"name":"simple::basic", "actions" : [{"do":AsyncCallable}]}))
+        asyncio.run(task.aprecompute(phase=TaskStatus_e.READY))
+        assert(task._precomputed["actions"] == (1, ActRE.SUCCESS))
+        assert(task.internal_state['instance_ran'] is True)
+
+    def test_aprecompute_bookkeeping(self):
+        groups = []
+        task   = FSMTask(factory.build({"name":"simple::basic", "actions" : [{"do":async_action}]}))
+        with HOOKS.subscribe(group_end=lambda *args: groups.append(args[1])):
+            asyncio.run(task.aprecompute(phase=TaskStatus_e.READY))
+
+        assert("actions" in groups)
+        assert(TaskStatus_e.READY in task._timings)
+
+    def test_sync_execution_rejects_async_action(self):
+        task = FSMTask(factory.build({"name":"simple::basic", "actions" : [{"do":async_action}]}))
+        with pytest.raises(doot.errors.TaskError):
+            task._execute_action_group(group="actions")
+
+    def run(self, runner:AsyncFSMRunner, tracker:FSMTracker) -> None:
+        for _ in range(50):
+            if not bool(tracker):
+                break
+            runner.run_next_task()
+
+    def test_job_expansion_is_awaited(self):
+        tracker  = FSMTracker()
+        spec     = factory.build({"name":"simple::job", "ctor":FSMJob, "actions" : [{"do":async_expand}]})
+        name     = tracker.queue(spec, from_user=True)
+        tracker.build()
+        task     = tracker.machines[name].model
+        self.run(AsyncFSMRunner(tracker=tracker, workers=4), tracker)
+        assert(tracker.get_status(target=name)[0] is TaskStatus_e.DEAD)
+        assert(TaskStatus_e.SUCCESS in task._state_history)
+
+    def test_fail_and_cleanup_are_awaited(self):
+        called.clear()
+        tracker  = FSMTracker()
+        spec     = factory.build({"name":"simple::basic",
+                                  "actions"  : [{"do":fail_action}],
+                                  "on_fail"  : [{"do":async_record}],
+                                  "cleanup"  : [{"do":async_record}],
+                                  })
+        name     = tracker.queue(spec, from_user=True)
+        tracker.build()
+        task     = tracker.machines[name].model
+        self.run(AsyncFSMRunner(tracker=tracker, workers=4), tracker)
+        assert(tracker.get_status(target=name)[0] is TaskStatus_e.DEAD)
+        assert(TaskStatus_e.FAILED in task._state_history)
+        assert(len(called) == 2)  # noqa: PLR2004
+
+    def test_halted_cleanup_is_awaited(self):
+        called.clear()
+        tracker  = FSMTracker()
+        spec     = tracker._factory.build({"name":"simple::basic", "depends_on":["simple::dep"], "cleanup":[{"do":async_record}]})
+        dep      = tracker._factory.build({"name":"simple::dep", "actions":[{"do":fail_action}]})
+        tracker.register(spec, dep)
+        name     = tracker.queue(spec.name, from_user=True)
+        tracker.build()
+        task     = tracker.machines[name].model
+        self.run(AsyncFSMRunner(tracker=tracker, workers=4), tracker)
+        assert(tracker.get_status(target=name)[0] is TaskStatus_e.DEAD)
+        assert(TaskStatus_e.HALTED in task._state_history)
+        assert(called == [True])
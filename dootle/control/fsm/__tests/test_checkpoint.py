@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import logging as logmod
+import pathlib as pl
+import warnings
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+import pytest
+from doot.workflow import TaskName
+from doot.workflow._interface import TaskStatus_e
+# ##-- end 3rd party imports
+
+from ..checkpoint import DONE_R, POSTBOX_R, SUCCESS_R, Checkpoint, TransitionLog, instance_key
+from ..factory import FSMFactory
+from ..fsm_tracker import FSMTracker
+from ..task import FSMTask
+
+logging = logmod.root
+
+factory = FSMFactory()
+KEY     = "basic::task#0a1b"
+
+def value_action(*args, **kwargs) -> dict:
+    return {"value": 5}
+
+class TestTransitionLog:
+
+    def test_empty(self, tmp_path):
+        result = Checkpoint.read(tmp_path / "check.log")
+        assert(not bool(result.done))
+        assert(result.postbox is None)
+
+    def test_roundtrip(self, tmp_path):
+        log = TransitionLog(tmp_path / "check.log")
+        log.success(KEY)
+        log.done(KEY)
+        log.success(KEY, state={"value": 5})
+        log.close()
+        result = Checkpoint.read(log.path)
+        assert(result.consume(KEY) == (DONE_R, None))
+        assert(result.consume(KEY) == (SUCCESS_R, {"value": 5}))
+        assert(result.consume(KEY) == (None, None))
+
+    def test_consume_by_key(self, tmp_path):
+        log = TransitionLog(tmp_path / "check.log")
+        log.success("basic::task#other")
+        log.done("basic::task#other")
+        log.close()
+        result = Checkpoint.read(log.path)
+        assert(result.consume(KEY) == (None, None))
+        assert(result.consume("basic::task#other") == (DONE_R, None))
+
+    def test_unpicklable_state_reruns(self, tmp_path):
+        log = TransitionLog(tmp_path / "check.log")
+        log.success(KEY, state={"value": lambda: 5})
+        log.close()
+        assert(Checkpoint.read(log.path).consume(KEY) == (None, None))
+
+    def test_truncated_log(self, tmp_path):
+        log = TransitionLog(tmp_path / "check.log")
+        log.done(KEY)
+        log.success(KEY)
+        log.close()
+        data = log.path.read_bytes()
+        log.path.write_bytes(data[:-3])
+        result = Checkpoint.read(log.path)
+        assert(result.done[KEY] == 1)
+
+    def test_append(self, tmp_path):
+        log = TransitionLog(tmp_path / "check.log")
+        log.success(KEY)
+        log.close()
+        log = TransitionLog(tmp_path / "check.log", append=True)
+        log.success(KEY)
+        log.close()
+        assert(len(Checkpoint.read(log.path).succeeded[KEY]) == 2)  # noqa: PLR2004
+
+    def test_expansion_unpicklable(self, tmp_path):
+        log = TransitionLog(tmp_path / "check.log")
+        assert(not log.expansion(KEY, [lambda: 5]))
+
+    def test_postbox_changes(self, tmp_path, postbox):
+        log = TransitionLog(tmp_path / "check.log")
+        postbox.boxes["box"]["sub"] += [1, 2]
+        assert(log._postbox_changes() == [(POSTBOX_R, "box", "sub", 0, [1, 2])])
+        postbox.boxes["box"]["sub"].append(3)
+        assert(log._postbox_changes() == [(POSTBOX_R, "box", "sub", 2, [3])])
+        assert(log._postbox_changes() == [])
+        # Replaced subboxes are logged in full
+        postbox.boxes["box"]["sub"] = [4]
+        assert(log._postbox_changes() == [(POSTBOX_R, "box", "sub", 0, [4])])
+        postbox.clear()
+        assert(log._postbox_changes() == [(POSTBOX_R, "box", "sub", 0, [])])
+
+    def test_postbox_roundtrip(self, tmp_path, postbox):
+        log = TransitionLog(tmp_path / "check.log")
+        postbox.boxes["box"]["sub"] += [1, 2]
+        log.success(KEY)
+        log.flush()
+        postbox.boxes["box"]["sub"].append(3)
+        postbox.boxes["other"]["sub"].append(4)
+        log.close()
+        assert(Checkpoint.read(log.path).postbox == {"box": {"sub": [1, 2, 3]}, "other": {"sub": [4]}})
+
+class TestInstanceKey:
+
+    def test_same_data(self):
+        first   = factory.build({"name":"basic::task", "value":1})
+        second  = factory.build({"name":"basic::task", "value":1})
+        assert(instance_key(first) == instance_key(second))
+        assert(instance_key(first).startswith("basic::task#"))
+
+    def test_different_data(self):
+        first   = factory.build({"name":"basic::task", "value":1})
+        second  = factory.build({"name":"basic::task", "value":2})
+        assert(instance_key(first) != instance_key(second))
+
+    def test_unpicklable_data(self):
+        spec = factory.build({"name":"basic::task", "value":lambda: 1})
+        assert(instance_key(spec) == "basic::task")
+
+class TestTracker_Resume:
+
+    def test_resume_skips_finished(self, tmp_path):
+        path     = tmp_path / "check.log"
+        tracker  = FSMTracker(checkpoint=path, resume=False)
+        spec     = tracker._factory.build({"name":"basic::Task", "ctor":FSMTask})
+        tracker.register(spec)
+        t_name   = tracker.queue(spec.name, from_user=True)
+        tracker.build()
+        task     = tracker.next_for()
+        tracker.machines[task.name](step=1, tracker=tracker)
+        tracker.machines[task.name](step=1, tracker=tracker)
+        assert(tracker.get_status(target=task.name)[0] is TaskStatus_e.DEAD)
+        tracker.checkpoint.close()
+        ##--|
+        resumed  = FSMTracker(resume=path)
+        resumed.register(resumed._factory.build({"name":"basic::Task", "ctor":FSMTask}))
+        r_name   = resumed.queue(spec.name, from_user=True)
+        assert(resumed.get_status(target=r_name)[0] is TaskStatus_e.DEAD)
+
+    def test_resume_restores_state(self, tmp_path):
+        path     = tmp_path / "check.log"
+        tracker  = FSMTracker(checkpoint=path, resume=False)
+        alpha    = {"name":"basic::alpha", "ctor":FSMTask, "actions":[{"do":value_action}]}
+        beta     = {"name":"basic::beta", "ctor":FSMTask, "depends_on":["basic::alpha"]}
+        tracker.register(tracker._factory.build(alpha), tracker._factory.build(beta))
+        tracker.queue(TaskName(beta['name']), from_user=True)
+        tracker.build()
+        task     = tracker.next_for()
+        assert(TaskName(alpha['name']) < task.name)
+        tracker.machines[task.name](step=1, tracker=tracker)
+        assert(tracker.get_status(target=task.name)[0] is TaskStatus_e.TEARDOWN)
+        tracker.checkpoint.close()
+        ##--| Resume, as if the run stopped before alpha was torn down
+        resumed  = FSMTracker(resume=path)
+        resumed.register(resumed._factory.build(alpha), resumed._factory.build(beta))
+        resumed.queue(TaskName(beta['name']), from_user=True)
+        resumed.build()
+        returned = [resumed.next_for()]
+        a_inst   = next(x for x in resumed.machines if TaskName(alpha['name']) < x)
+        assert(resumed.get_status(target=a_inst)[0] is TaskStatus_e.TEARDOWN)
+        assert(resumed.machines[a_inst].model.internal_state['value'] == 5)  # noqa: PLR2004
+        # Tearing alpha down logs it as done, and beta runs
+        resumed.machines[a_inst](tracker=resumed)
+        assert(resumed.get_status(target=a_inst)[0] is TaskStatus_e.DEAD)
+        returned.append(resumed.next_for())
+        assert(any(TaskName(beta['name']) < x.name for x in returned if x is not None))
+        resumed.checkpoint.close()
+        assert(Checkpoint.read(path).done[instance_key(resumed.machines[a_inst].model.spec)] == 1)
+
+    def test_resume_out_of_order(self, tmp_path):
+        """ Of two instances of one template, only the second finished. Resuming skips just that one """
+        path     = tmp_path / "check.log"
+        tracker  = FSMTracker(checkpoint=path, resume=False)
+        spec     = tracker._factory.build({"name":"basic::Task", "ctor":FSMTask})
+        tracker.register(spec)
+        a_inst   = tracker._instantiate(spec.name, extra={"value":1})
+        b_inst   = tracker._instantiate(spec.name, extra={"value":2})
+        tracker._instantiate(a_inst, task=True)
+        tracker._instantiate(b_inst, task=True)
+        tracker.queue(b_inst)
+        tracker.build()
+        task     = tracker.next_for()
+        assert(task.name == b_inst)
+        tracker.machines[b_inst](step=1, tracker=tracker)
+        tracker.machines[b_inst](step=1, tracker=tracker)
+        assert(tracker.get_status(target=b_inst)[0] is TaskStatus_e.DEAD)
+        tracker.checkpoint.close()
+        ##--| Resume, instantiating in the same order
+        resumed  = FSMTracker(resume=path)
+        resumed.register(resumed._factory.build({"name":"basic::Task", "ctor":FSMTask}))
+        r_a      = resumed._instantiate(spec.name, extra={"value":1})
+        r_b      = resumed._instantiate(spec.name, extra={"value":2})
+        resumed._instantiate(r_a, task=True)
+        resumed._instantiate(r_b, task=True)
+        assert(resumed.get_status(target=r_a)[0] is not TaskStatus_e.DEAD)
+        assert(resumed.get_status(target=r_b)[0] is TaskStatus_e.DEAD)
+        resumed.checkpoint.close()
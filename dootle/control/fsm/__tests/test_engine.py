@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+
+"""
+# mypy: disable-error-code="no-any-return"
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import logging as logmod
+import pathlib as pl
+import warnings
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+import doot
+import pytest
+from doot.workflow._interface import TaskStatus_e
+# ##-- end 3rd party imports
+
+from ..engine import TaskEngine, EngineMachine
+from ..errors import FSMTransitionError
+from .test_machines import SimpleTaskModel
+
+logging = logmod.root
+
+class TestTaskEngine:
+
+    @pytest.fixture(scope="function")
+    def engine(self):
+        return TaskEngine()
+
+    @pytest.fixture(scope="function")
+    def fsm(self, engine):
+        return engine.machine(SimpleTaskModel())
+
+    def test_ctor(self, engine):
+        assert(isinstance(engine, TaskEngine))
+        assert(len(engine) == 0)
+
+    def test_add(self, engine):
+        model = SimpleTaskModel()
+        assert(engine.add(model) == 0)
+        assert(engine.add(SimpleTaskModel()) == 1)
+        assert(len(engine) == 2)
+        assert(engine.state(0) is TaskStatus_e.NAMED)
+        assert(model.status is TaskStatus_e.NAMED)
+
+    def test_add_non_model_fails(self, engine):
+        with pytest.raises(TypeError):
+            engine.add(object())
+
+    def test_tables_are_shared(self, engine):
+        engine.add(SimpleTaskModel())
+        engine.add(SimpleTaskModel())
+        assert(len(engine._tables) == 1)
+
+    def test_machine(self, fsm):
+        assert(isinstance(fsm, EngineMachine))
+        assert(fsm.current_state_value is TaskStatus_e.NAMED)
+
+    def test_setup(self, fsm):
+        fsm.setup(tracker={"blah":5})
+        assert(fsm.current_state_value is TaskStatus_e.DECLARED)
+        fsm.setup()
+        assert(fsm.current_state_value is TaskStatus_e.DEFINED)
+        fsm.setup()
+        assert(fsm.current_state_value is TaskStatus_e.INIT)
+
+    def test_setup_spec_missing(self, fsm):
+        fsm.setup(tracker={})
+        assert(fsm.current_state_value is TaskStatus_e.DEAD)
+
+    def test_setup_should_disable(self, fsm):
+        fsm.model.disabled = True
+        fsm.setup(tracker={"blah":5})
+        fsm.setup(tracker={"blah":5})
+        assert(fsm.current_state_value is TaskStatus_e.DISABLED)
+
+    def test_no_transition(self, fsm):
+        with pytest.raises(FSMTransitionError):
+            fsm.finish()
+
+    def test_run(self, fsm):
+        fsm(until=TaskStatus_e.INIT, tracker={"blah":5})
+        assert(fsm.model.status is TaskStatus_e.INIT)
+        fsm(tracker={"blah":5}, until=TaskStatus_e.SUCCESS)
+        assert(fsm.model.status is TaskStatus_e.SUCCESS)
+        assert(fsm.model.data['has_run'] is True)
+
+    def test_run_wait_timeout(self, fsm):
+        fsm.model.time_out = 5
+        fsm(until=TaskStatus_e.INIT, tracker={"blah":5})
+        fsm(tracker={"blah":5}, until=TaskStatus_e.SUCCESS)
+        assert(fsm.model.status is TaskStatus_e.TEARDOWN)
+        assert(fsm.model.data['has_run'] is False)
+
+    def test_run_skip(self, fsm):
+        fsm.model.skip = True
+        fsm(until=TaskStatus_e.READY, tracker={"blah":5})
+        assert(fsm.model.status is TaskStatus_e.READY)
+        fsm(until=[TaskStatus_e.SKIPPED])
+        assert(fsm.model.status is TaskStatus_e.SKIPPED)
+        assert(fsm.model.data['has_run'] is False)
+
+    def test_run_fail(self, fsm):
+        fsm.model.fail = True
+        fsm(until=TaskStatus_e.READY, tracker={"blah":5})
+        fsm(until=[TaskStatus_e.FAILED])
+        assert(fsm.model.status is TaskStatus_e.FAILED)
+        assert(fsm.model.data['has_run'] is True)
+
+    def test_cancel(self, fsm):
+        fsm(until=TaskStatus_e.INIT, tracker={"blah":5})
+        fsm.cancel()
+        assert(fsm.current_state_value is TaskStatus_e.HALTED)
+        assert(fsm.model.data['has_run'] is False)
+
+    def test_run_until_dead(self, fsm):
+        fsm.run_until_dead({"blah":5})
+        assert(fsm.current_state_value is TaskStatus_e.DEAD)
+
+    def test_matches_task_machine(self, engine):
+        """ The engine and a TaskMachine visit the same states """
+        from ..machines import TaskMachine
+        visited = {"engine": [], "machine": []}
+
+        class RecordingModel(SimpleTaskModel):
+
+            def __init__(self, key):
+                super().__init__()
+                self.key = key
+
+            def on_enter_state(self, target):
+                visited[self.key].append(target.value)
+
+        fsm = engine.machine(RecordingModel("engine"))
+        fsm.run_until_dead({"blah":5})
+        TaskMachine(RecordingModel("machine")).run_until_dead({"blah":5})
+        # The statemachine also enters its initial state
+        assert(visited["engine"] == visited["machine"][-len(visited["engine"]):])
@@ -37,9 +37,11 @@ from doot.workflow._interface import Task_i, TaskStatus_e, TaskSpec_i, TaskName_
 from doot.workflow._interface import Task_p
 from doot.workflow._interface import ActionResponse_e as ActRE
 from ..machines import TaskMachine
+from ..errors import FSMDeadlock
 from ..task import FSMTask
 from ..errors import FSMSkip, FSMHalt
-from ..fsm_tracker import FSMTracker
+from ..fsm_tracker import FSMTracker, configured_flags
+from .._interface import TrackerFlags_d, Tombstone_d
 
 # ##-- types
 # isort: off
@@ -135,6 +137,18 @@ class TestStateTracker_Basic:
             case x:
                 assert(False), x
 
+    def test_configured_flags(self):
+        match configured_flags():
+            case TrackerFlags_d() as flags:
+                assert(not any(flags))
+            case x:
+                assert(False), x
+
+    def test_flags_kwargs(self):
+        obj = FSMTracker(reclaim=True, wait_report=True)
+        assert(obj.reclaim)
+        assert(obj.wait_report)
+
 class TestStateTracker_NextFor:
 
     @pytest.fixture(scope="function")
@@ -226,6 +240,237 @@ class TestStateTracker_NextFor:
         tracker.machines[t_name](step=1, tracker=tracker, until=[TaskStatus_e.READY])
         assert(tracker.get_status(target=t_name)[0] is TaskStatus_e.READY)
 
+    def test_waiting_task_is_counted_not_requeued(self, tracker, specdep):
+        spec, dep = specdep
+        tracker.register(spec, dep)
+        t_name = tracker.queue(spec.name, from_user=True)
+        tracker.build()
+        dep_inst = tracker.next_for()
+        assert(tracker._pending[t_name] == 1)
+        assert(t_name in tracker._blocked_by[dep_inst.name])
+        # Nothing else is ready while the dep is unfinished
+        assert(tracker.next_for() is None)
+        # Settling the dep releases the waiting task
+        tracker.machines[dep_inst.name](step=1, tracker=tracker)
+        assert(t_name not in tracker._pending)
+        match tracker.next_for():
+            case Task_p() as x:
+                assert(x.name == t_name)
+                assert(tracker.get_status(target=t_name)[0] is TaskStatus_e.READY)
+            case x:
+                assert(False), x
+
+    def test_release_records_wait(self, tracker, specdep):
+        spec, dep = specdep
+        tracker.register(spec, dep)
+        t_name = tracker.queue(spec.name, from_user=True)
+        tracker.build()
+        dep_inst = tracker.next_for()
+        assert(t_name in tracker._blocked_at)
+        tracker.machines[dep_inst.name](step=1, tracker=tracker)
+        assert(t_name not in tracker._blocked_at)
+        match tracker.wait_times.last_blocker(t_name):
+            case (blocker, int() as ns):
+                assert(blocker == dep_inst.name)
+                assert(0 <= ns)
+            case x:
+                assert(False), x
+
+        assert(tracker.wait_times.by_task()[0][0] == dep_inst.name)
+
+    def test_blocked_keeps_tracker_truthy(self, tracker, specdep):
+        spec, dep = specdep
+        tracker.register(spec, dep)
+        tracker.queue(spec.name, from_user=True)
+        tracker.build()
+        tracker.next_for()
+        assert(not bool(tracker._queue))
+        assert(bool(tracker))
+
+    def test_stall_raises_deadlock(self, tracker, specdep):
+        spec, dep = specdep
+        tracker.register(spec, dep)
+        tracker.queue(spec.name, from_user=True)
+        tracker.build()
+        dep_inst = tracker.next_for()
+        # Lose the dependency, so nothing can release its waiter
+        del tracker.machines[dep_inst.name]
+        with pytest.raises(FSMDeadlock) as ctx:
+            tracker.next_for()
+
+        assert(ctx.value.args[2] == [dep_inst.name])
+
+    def test_find_wait_cycle(self, tracker):
+        first, second = TaskName("basic::first"), TaskName("basic::second")
+        tracker._blocked_by[first].add(second)
+        tracker._blocked_by[second].add(first)
+        match tracker._find_wait_cycle():
+            case [x, _, y] if x == y:
+                assert(x in {first, second})
+            case x:
+                assert(False), x
+
+    def test_find_wait_cycle_none(self, tracker):
+        tracker._blocked_by[TaskName("basic::first")].add(TaskName("basic::second"))
+        assert(tracker._find_wait_cycle() is None)
+
+    def test_next_batch_empty(self, tracker):
+        tracker.build()
+        assert(tracker.next_batch(4) == [])
+
+    def test_next_batch(self, tracker):
+        specs = [tracker._factory.build({"name":f"basic::task.{x}", "ctor":FSMTask, "priority":10+x}) for x in range(5)]
+        tracker.register(*specs)
+        names = [tracker.queue(x.name, from_user=True) for x in specs]
+        tracker.build()
+        match tracker.next_batch(3):
+            case [Task_p(), Task_p(), Task_p()] as batch:
+                # highest priority first
+                assert([x.name for x in batch] == names[:1:-1])
+                assert(all(tracker.get_status(target=x.name)[0] is TaskStatus_e.READY for x in batch))
+            case x:
+                assert(False), x
+
+        assert(len(tracker.next_batch(3)) == 2)  # noqa: PLR2004
+        assert(tracker.next_batch(3) == [])
+
+    def test_insert_subgraph(self, tracker, spec):
+        tracker.register(spec)
+        tracker.build()
+        match tracker.insert_subgraph([spec.name]):
+            case [TaskName_p() as x]:
+                assert(x in tracker.machines)
+                assert(x in tracker._affected_region([x]))
+                assert(tracker._find_cycle([x]) is None)
+            case x:
+                assert(False), x
+
+    def test_insert_subgraph_empty(self, tracker):
+        tracker.build()
+        assert(tracker.insert_subgraph([]) == [])
+
+class TestStateTracker_CriticalPath:
+
+    @pytest.fixture(scope="function")
+    def tracker(self):
+        return FSMTracker(critical_path=True)
+
+    def test_declared_duration(self, tracker):
+        spec = tracker._factory.build({"name":"basic::Task", "ctor":FSMTask, "duration": 5})
+        tracker.register(spec)
+        t_name = tracker.queue(spec.name, from_user=True)
+        assert(tracker.duration_of(t_name) == 5)  # noqa: PLR2004
+
+    def test_historical_duration(self, tracker):
+        spec = tracker._factory.build({"name":"basic::Task", "ctor":FSMTask, "duration": 5})
+        tracker.register(spec)
+        t_name = tracker.queue(spec.name, from_user=True)
+        tracker.durations = {t_name.de_uniq()[:] : 2}
+        assert(tracker.duration_of(t_name) == 2)  # noqa: PLR2004
+
+    def test_dependency_ranks_higher(self, tracker):
+        spec = tracker._factory.build({"name":"basic::alpha", "depends_on":["basic::dep"], "ctor":FSMTask})
+        dep  = tracker._factory.build({"name":"basic::dep", "ctor":FSMTask})
+        tracker.register(spec, dep)
+        t_name = tracker.queue(spec.name, from_user=True)
+        tracker.build()
+        dep_inst = tracker.next_for()
+        assert(dep.name < dep_inst.name)
+        assert(tracker.rank_of(t_name) < tracker.rank_of(dep_inst.name))
+
+    def test_rank_change_rekeys_ready(self, tracker):
+        alpha  = tracker._factory.build({"name":"basic::alpha", "ctor":FSMTask})
+        beta   = tracker._factory.build({"name":"basic::beta", "ctor":FSMTask})
+        tracker.register(alpha, beta)
+        a_inst = tracker.queue(alpha.name, from_user=True)
+        b_inst = tracker.queue(beta.name, from_user=True)
+        tracker.build()
+        tracker._route(a_inst)
+        tracker._route(b_inst)
+        assert(tracker._ready[0][2] == a_inst)
+        # beta turns out to take longer
+        tracker.durations = {b_inst.de_uniq()[:] : 10}
+        assert(b_inst in tracker._update_ranks([b_inst]))
+        tracker._rekey_ready()
+        assert(tracker.next_for().name == b_inst)
+        assert(tracker.next_for().name == a_inst)
+
+class TestStateTracker_Reclaim:
+
+    @pytest.fixture(scope="function")
+    def tracker(self):
+        return FSMTracker(reclaim=True)
+
+    def test_dead_task_is_reclaimed(self, tracker):
+        spec = tracker._factory.build({"name":"basic::alpha"})
+        tracker.register(spec)
+        t_name = tracker.queue(spec.name, from_user=True)
+        tracker.build()
+        task = tracker.next_for()
+        tracker.machines[task.name](step=1, tracker=tracker)
+        tracker.machines[task.name](tracker=tracker)
+        assert(tracker.get_status(target=t_name)[0] is TaskStatus_e.DEAD)
+        assert(t_name in tracker.machines)
+        tracker.next_for()
+        assert(t_name not in tracker.machines)
+        assert(tracker.tombstones[t_name].outcome is TaskStatus_e.SUCCESS)
+        assert(tracker.get_status(target=t_name)[0] is TaskStatus_e.DEAD)
+
+    def test_tombstone_keeps_timings(self, tracker):
+        spec = tracker._factory.build({"name":"basic::alpha"})
+        tracker.register(spec)
+        t_name = tracker.queue(spec.name, from_user=True)
+        tracker.build()
+        task = tracker.next_for()
+        task._timings[TaskStatus_e.READY] = (10, 5)
+        tracker.machines[task.name](step=1, tracker=tracker)
+        tracker.machines[task.name](tracker=tracker)
+        tracker.next_for()
+        match tracker.tombstones[t_name]:
+            case Tombstone_d(state_ns=tuple() as durations, cpu_ns=5):
+                assert(durations[-1][0] is TaskStatus_e.DEAD)
+                assert(all(0 <= y for _, y in durations))
+            case x:
+                assert(False), x
+
+    def test_dependency_waits_for_successor(self, tracker):
+        spec = tracker._factory.build({"name":"basic::alpha", "depends_on":["basic::dep"]})
+        dep  = tracker._factory.build({"name":"basic::dep"})
+        tracker.register(spec, dep)
+        tracker.queue(spec.name, from_user=True)
+        tracker.build()
+        dep_inst = tracker.next_for()
+        tracker.machines[dep_inst.name](step=1, tracker=tracker)
+        tracker.machines[dep_inst.name](tracker=tracker)
+        assert(tracker.get_status(target=dep_inst.name)[0] is TaskStatus_e.DEAD)
+        tracker.next_for()
+        assert(dep_inst.name in tracker.machines)
+        assert(dep_inst.name not in tracker.tombstones)
+
+class TestStateTracker_Adjacency:
+
+    @pytest.fixture(scope="function")
+    def tracker(self):
+        return FSMTracker(adjacency=True)
+
+    def test_build_indexes(self, tracker):
+        spec = tracker._factory.build({"name":"basic::alpha", "depends_on":["basic::dep"]})
+        dep  = tracker._factory.build({"name":"basic::dep"})
+        tracker.register(spec, dep)
+        t_name = tracker.queue(spec.name, from_user=True)
+        tracker.build()
+        assert(t_name in tracker.adjacency)
+        assert(tracker._dependency_states_of(t_name) == [(x, tracker.get_status(target=x)[0]) for x in tracker._network.pred[t_name]])
+
+    def test_status_follows_notify(self, tracker):
+        spec = tracker._factory.build({"name":"basic::alpha", "depends_on":["basic::dep"]})
+        dep  = tracker._factory.build({"name":"basic::dep"})
+        tracker.register(spec, dep)
+        t_name = tracker.queue(spec.name, from_user=True)
+        tracker.build()
+        dep_inst = tracker.next_for()
+        tracker.machines[dep_inst.name](step=1, tracker=tracker)
+        assert(tracker._dependency_states_of(t_name) == [(dep_inst.name, TaskStatus_e.TEARDOWN)])
 
 class TestStateTracker_Pathways:
 
@@ -324,6 +569,27 @@ class TestStateTracker_Pathways:
             case x:
                 assert(False), x
 
+    def test_fail_halts_downstream(self, tracker) -> None:
+        """ A failure cancels and tears down everything waiting on it, on the next next_for """
+        alpha = tracker._factory.build({"name":"basic::alpha", "depends_on":["basic::beta"]})
+        beta  = tracker._factory.build({"name":"basic::beta", "depends_on":["basic::dep"]})
+        dep   = tracker._factory.build({"name":"basic::dep", "actions":[{"do":fail_action}], "ctor":FSMTask})
+        tracker.register(alpha, beta, dep)
+        t_name = tracker.queue(alpha.name, from_user=True)
+        tracker.build()
+        dep_inst = tracker.next_for()
+        assert(dep_inst.name.de_uniq() == dep.name)
+        tracker.machines[dep_inst.name](step=1, tracker=tracker)
+        assert(dep_inst._state_history[-1] is TaskStatus_e.FAILED)
+        assert(tracker.get_status(target=t_name)[0] is TaskStatus_e.WAIT)
+        tracker.next_for()
+        for name in [x for x in tracker.machines if x != dep_inst.name]:
+            assert(tracker.get_status(target=name)[0] is TaskStatus_e.DEAD)
+            assert(TaskStatus_e.HALTED in tracker.machines[name].model._state_history)
+        else:
+            assert(not bool(tracker._halting))
+            assert(not bool(tracker._pending))
+
     def test_fail(self, tracker) -> None:
         """ An action that fails shunts to teardown """
         spec = tracker._factory.build({
@@ -413,3 +679,37 @@ class TestStateTracker_Pathways:
             assert(tracker.machines[instance].model._state_history[-1] is TaskStatus_e.TEARDOWN)
             # The task internal internal_state is cleaned up
             assert(not bool(tracker.machines[instance].model.internal_state))
+
+    def test_teardown_wait_parks(self, tracker):
+        """ a task whose state is still needed is parked until its injection target settles """
+        alpha = tracker._factory.build({"name":"basic::alpha"})
+        beta  = tracker._factory.build({"name":"basic::beta",
+                                        "depends_on":["basic::alpha"],
+                                        })
+        tracker.register(alpha, beta)
+        a_inst = tracker.queue(alpha.name, from_user=True)
+        b_inst = tracker.queue(beta.name, from_user=True)
+        tracker.build()
+        tracker.specs[a_inst].injection_targets.add(b_inst)
+        assert(tracker.next_for().name == a_inst)
+        tracker.machines[a_inst](step=1, tracker=tracker)
+        assert(tracker.get_status(target=a_inst)[0] is TaskStatus_e.TEARDOWN)
+        # As the runner does, until the task is dead
+        tracker.queue(a_inst)
+        assert(tracker.next_for().name == b_inst)
+        # alpha is parked on beta, rather than returned again
+        assert(tracker._parked[a_inst] == {b_inst})
+        assert(a_inst not in tracker._pending)
+        assert(a_inst not in tracker._blocked_by[b_inst])
+        assert(tracker.next_for() is None)
+        # Once beta is finished, alpha can be torn down
+        tracker.machines[b_inst](step=1, tracker=tracker)
+        tracker.machines[b_inst](tracker=tracker)
+        assert(tracker.get_status(target=b_inst)[0] is TaskStatus_e.DEAD)
+        assert(a_inst not in tracker._parked)
+        assert(tracker.next_for().name == a_inst)
+        tracker.machines[a_inst](tracker=tracker)
+        assert(tracker.get_status(target=a_inst)[0] is TaskStatus_e.DEAD)
+        # The registry's targets are left alone, and the park isn't charged as a wait
+        assert(tracker.specs[a_inst].injection_targets == {b_inst})
+        assert(tracker.wait_times.last_blocker(a_inst) is None)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+
+"""
+# ruff: noqa: B011
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import logging as logmod
+import pathlib as pl
+import warnings
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+import pytest
+from doot.workflow._interface import TaskStatus_e
+# ##-- end 3rd party imports
+
+from ..history import RUN_PHASE, DurationHistory, Duration_d, history_key
+
+logging = logmod.root
+
+class TestDurationHistory:
+
+    def test_ctor(self, tmp_path):
+        obj = DurationHistory(tmp_path / "hist.sqlite")
+        assert(isinstance(obj, DurationHistory))
+        assert(obj.durations() == {})
+
+    def test_record_is_batched(self, tmp_path, name):
+        obj = DurationHistory(tmp_path / "hist.sqlite", batch=10)
+        obj.start(name, RUN_PHASE)
+        obj.stop(name, RUN_PHASE, TaskStatus_e.SUCCESS)
+        assert(not obj.path.exists())
+        obj.flush()
+        assert(obj.path.exists())
+        match obj.last(name):
+            case Duration_d() as x:
+                assert(x.status == TaskStatus_e.SUCCESS.name)
+                assert(0 <= x.wall_ns)
+            case x:
+                assert(False), x
+
+    def test_batch_written_when_full(self, tmp_path, name):
+        obj = DurationHistory(tmp_path / "hist.sqlite", batch=2)
+        for _ in range(2):
+            obj.start(name, RUN_PHASE)
+            obj.stop(name, RUN_PHASE, TaskStatus_e.SUCCESS)
+
+        assert(obj.path.exists())
+        assert(history_key(name) in obj.durations())
+
+    def test_precomputed_timing(self, tmp_path, name):
+        obj = DurationHistory(tmp_path / "hist.sqlite")
+        obj.start(name, RUN_PHASE)
+        obj.stop(name, RUN_PHASE, TaskStatus_e.SUCCESS, precomputed=(5, 3))
+        obj.flush()
+        match obj.last(name):
+            case Duration_d(wall_ns=5, cpu_ns=3):
+                assert(True)
+            case x:
+                assert(False), x
+
+    def test_stop_without_start(self, tmp_path, name):
+        obj = DurationHistory(tmp_path / "hist.sqlite")
+        obj.stop(name, RUN_PHASE, TaskStatus_e.SUCCESS)
+        obj.flush()
+        assert(obj.last(name) is None)
+
+    def test_record_memory(self, tmp_path, name):
+        obj = DurationHistory(tmp_path / "hist.sqlite")
+        obj.record_memory(name, 100)
+        obj.record_memory(name, 300)
+        assert(obj.memory() == {})
+        obj.flush()
+        assert(obj.memory() == {history_key(name): 300})
@@ -271,6 +271,15 @@ class TestTaskMachine:
         assert(fsm.model.status is TaskStatus_e.FAILED)
         assert(fsm.model.data['has_run'] is True)
 
+    def test_cancel(self, fsm):
+        """
+        checks a task which hasn't run can be cancelled
+        """
+        fsm(until=TaskStatus_e.INIT, tracker={"blah":5})
+        fsm.cancel()
+        assert(fsm.model.status is TaskStatus_e.HALTED)
+        assert(fsm.model.data['has_run'] is False)
+
     ##--| finish
 
     def test_finish(self, fsm):
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import logging as logmod
+import pathlib as pl
+import types
+import warnings
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+import pytest
+from doot.workflow import TaskName
+# ##-- end 3rd party imports
+
+from ..memory import MemoryBudget, parse_size, rss_growth, rss_sample
+
+logging = logmod.root
+
+def _task(name:str, *, mem:str|None=None, grown:int=0) -> types.SimpleNamespace:
+    """ A stand in task, with an optional declared 'mem' """
+    extra = {} if mem is None else {"mem": mem}
+    return types.SimpleNamespace(name=TaskName(name), spec=types.SimpleNamespace(extra=extra), _mem_grow=grown)
+
+class TestParseSize:
+
+    @pytest.mark.parametrize(["value", "expected"], [
+        (None, None),
+        (512, 512),
+        ("512", 512),
+        ("2K", 2048),
+        ("1.5M", int(1.5 * 1024**2)),
+        ("4G", 4 * 1024**3),
+        ("2GiB", 2 * 1024**3),
+        ("1gb", 1024**3),
+    ])
+    def test_sizes(self, value, expected):
+        assert(parse_size(value) == expected)
+
+    def test_bad_size(self):
+        with pytest.raises(ValueError):
+            parse_size("lots")
+
+    def test_growth(self):
+        before = rss_sample()
+        assert(0 <= rss_growth(before))
+
+class TestMemoryBudget:
+
+    def test_ctor(self):
+        obj = MemoryBudget("1G")
+        assert(obj.budget == 1024**3)
+        assert(bool(obj))
+        assert(obj.used == 0)
+
+    def test_no_budget_admits_all(self):
+        obj = MemoryBudget(None)
+        assert(not bool(obj))
+        assert(all(obj.admit(_task(f"basic::task.{x}", mem="1T")) for x in range(5)))
+
+    def test_estimate_declared(self):
+        obj = MemoryBudget("1G", estimates={"basic::task": 5})
+        assert(obj.estimate(_task("basic::task", mem="2M")) == 2 * 1024**2)
+
+    def test_estimate_learned(self):
+        obj = MemoryBudget("1G", estimates={"basic::task": 5})
+        assert(obj.estimate(_task("basic::task")) == 5)  # noqa: PLR2004
+        assert(obj.estimate(_task("basic::other")) == 0)
+
+    def test_admit_and_defer(self):
+        obj    = MemoryBudget("3M")
+        first  = _task("basic::task.1", mem="2M")
+        second = _task("basic::task.2", mem="2M")
+        small  = _task("basic::task.3", mem="1M")
+        assert(obj.admit(first))
+        assert(not obj.admit(second))
+        assert(obj.admit(small))
+        assert(obj.used == 3 * 1024**2)
+        obj.release(first)
+        assert(obj.admit(second))
+
+    def test_too_large_is_admitted_alone(self):
+        obj    = MemoryBudget("1M")
+        large  = _task("basic::task.1", mem="4M")
+        other  = _task("basic::task.2")
+        assert(obj.admit(large))
+        assert(not obj.admit(other))
+        obj.release(large)
+        assert(obj.admit(other))
+
+    def test_release_learns_growth(self):
+        obj  = MemoryBudget("1G")
+        task = _task("basic::task", grown=1000)
+        assert(obj.admit(task))
+        obj.release(task)
+        assert(obj.used == 0)
+        assert(obj.estimates == {"basic::task": 1000})
+        assert(obj.estimate(_task("basic::task")) == 1000)  # noqa: PLR2004
+
+    def test_clear(self):
+        obj = MemoryBudget("1G")
+        obj.admit(_task("basic::task", mem="1M"))
+        obj.clear()
+        assert(obj.used == 0)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import logging as logmod
+import pathlib as pl
+import time
+import types
+import warnings
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+import pytest
+from doot.workflow._interface import TaskStatus_e
+# ##-- end 3rd party imports
+
+from ..fsm_tracker import FSMTracker
+from ..metrics import MetricsExporter
+from ..observe import HOOKS
+
+logging = logmod.root
+
+def _tracker(*statuses:TaskStatus_e) -> types.SimpleNamespace:
+    """ A stand in with the attributes the exporter reads """
+    machines = {f"task::{i}" : types.SimpleNamespace(current_state_value=x) for i, x in enumerate(statuses)}
+    return types.SimpleNamespace(machines=machines, tombstones={}, _ready_set={"task::0"},
+                                 _queue=types.SimpleNamespace(active_set={"a", "b"}))
+
+@pytest.mark.usefixtures("hooks")
+class TestMetricsExporter:
+
+    @pytest.fixture(scope="function")
+    def exporter(self, tmp_path):
+        obj = MetricsExporter(tmp_path / "metrics.prom", interval=60)
+        yield obj
+        obj.close()
+
+    def test_ctor(self, exporter):
+        assert(isinstance(exporter, MetricsExporter))
+        assert(exporter.interval == 60)
+
+    def test_render_counts(self, exporter):
+        exporter.attach(_tracker(TaskStatus_e.WAIT, TaskStatus_e.WAIT, TaskStatus_e.RUNNING))
+        text = exporter.render()
+        assert('doot_tasks{state="WAIT"} 2' in text)
+        assert('doot_tasks{state="RUNNING"} 1' in text)
+        assert("doot_queue_active 2" in text)
+        assert("doot_queue_ready 1" in text)
+        assert(text.endswith("\n"))
+
+    def test_render_is_prometheus_text(self, exporter):
+        """ The textfile collector rejects OpenMetrics only lines """
+        exporter.attach(_tracker())
+        lines = exporter.render().splitlines()
+        assert("# EOF" not in lines)
+        assert(not any(x.startswith("# UNIT") for x in lines))
+        assert("# TYPE doot_tasks_completed_total counter" in lines)
+
+    def test_completions(self, exporter):
+        exporter.attach(_tracker())
+        HOOKS.transition(None, TaskStatus_e.TEARDOWN, TaskStatus_e.DEAD)
+        HOOKS.transition(None, TaskStatus_e.WAIT, TaskStatus_e.READY)
+        assert("doot_tasks_completed_total 1" in exporter.render())
+
+    def test_action_histogram(self, exporter):
+        exporter.attach(_tracker())
+        HOOKS.action_end(None, None, "actions", None, 0, 20_000_000)
+        HOOKS.action_end(None, None, "actions", None, 0, 400_000_000_000)
+        text = exporter.render()
+        assert('doot_action_seconds_bucket{group="actions",le="0.01"} 0' in text)
+        assert('doot_action_seconds_bucket{group="actions",le="0.05"} 1' in text)
+        assert('doot_action_seconds_bucket{group="actions",le="+Inf"} 2' in text)
+        assert('doot_action_seconds_count{group="actions"} 2' in text)
+
+    def test_write_is_atomic(self, exporter):
+        exporter.attach(_tracker(TaskStatus_e.WAIT))
+        exporter.write()
+        assert(exporter.path.exists())
+        assert([x.name for x in exporter.path.parent.iterdir()] == [exporter.path.name])
+
+    def test_writes_periodically(self, tmp_path):
+        exporter = MetricsExporter(tmp_path / "metrics.prom", interval=0.01)
+        exporter.attach(_tracker(TaskStatus_e.WAIT))
+        for _ in range(100):
+            if exporter.path.exists():
+                break
+            time.sleep(0.01)
+        exporter.close()
+        assert(exporter.path.exists())
+
+    def test_close_unsubscribes(self, exporter):
+        exporter.attach(_tracker())
+        exporter.close()
+        assert(HOOKS.transition is None)
+        assert(HOOKS.action_end is None)
+
+    def test_close_stops_thread(self, exporter):
+        exporter.attach(_tracker())
+        thread = exporter._thread
+        exporter.close()
+        assert(not thread.is_alive())
+        assert(exporter._thread is None)
+
+    def test_failed_write_is_logged(self, tmp_path, caplog):
+        blocker = tmp_path / "blocker"
+        blocker.write_text("")
+        exporter = MetricsExporter(blocker / "metrics.prom", interval=60)
+        exporter.write()
+        assert("Failed to write" in caplog.text)
+
+@pytest.mark.usefixtures("hooks")
+class TestTracker_Metrics:
+
+    def test_clear_closes_exporter(self, tmp_path):
+        tracker = FSMTracker(metrics=tmp_path / "metrics.prom")
+        thread  = tracker.metrics._thread
+        assert(HOOKS.transition is not None)
+        tracker.clear()
+        assert(not thread.is_alive())
+        assert(HOOKS.transition is None)
+        assert(HOOKS.action_end is None)
+        assert(tracker.metrics.path.exists())
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import logging as logmod
+import pathlib as pl
+import types
+import warnings
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+import pytest
+from doot.workflow._interface import TaskStatus_e
+# ##-- end 3rd party imports
+
+from .. import observe as Observe  # noqa: N812
+from ..observe import HOOKS, Subscription
+from ..factory import FSMFactory
+from ..task import FSMTask
+
+logging = logmod.root
+
+factory = FSMFactory()
+
+@pytest.mark.usefixtures("hooks")
+class TestHooks:
+
+    def test_empty_slots_are_none(self):
+        for event in Observe.EVENTS:
+            assert(getattr(HOOKS, event) is None)
+
+    def test_single_subscriber_is_the_slot(self):
+        def sub(*args): pass
+        handle = Observe.subscribe(transition=sub)
+        assert(isinstance(handle, Subscription))
+        assert(HOOKS.transition is sub)
+        assert(HOOKS.action_end is None)
+
+    def test_many_subscribers_fan_out(self):
+        calls = []
+        Observe.subscribe(transition=lambda *xs: calls.append(1))
+        Observe.subscribe(transition=lambda *xs: calls.append(2))
+        HOOKS.transition(None, TaskStatus_e.INIT, TaskStatus_e.WAIT)
+        assert(calls == [1, 2])
+
+    def test_unsubscribe(self):
+        def sub(*args): pass
+        handle = Observe.subscribe(transition=sub, group_end=sub)
+        Observe.unsubscribe(handle)
+        assert(HOOKS.transition is None)
+        assert(HOOKS.group_end is None)
+
+    def test_subscription_context(self):
+        def sub(*args): pass
+        with Observe.subscribe(action_start=sub):
+            assert(HOOKS.action_start is sub)
+
+        assert(HOOKS.action_start is None)
+
+    def test_unknown_event_fails(self):
+        with pytest.raises(KeyError):
+            Observe.subscribe(blah=lambda *xs: None)
+
+        assert(HOOKS.transition is None)
+
+    def test_task_emits_transitions(self):
+        calls = []
+        Observe.subscribe(transition=lambda model, source, target: calls.append((model, source, target)))
+        task = FSMTask(factory.build({"name":"basic::simple"}))
+        task.on_enter_state(source=types.SimpleNamespace(value=TaskStatus_e.INIT),
+                            target=types.SimpleNamespace(value=TaskStatus_e.WAIT))
+        assert(calls == [(task, TaskStatus_e.INIT, TaskStatus_e.WAIT)])
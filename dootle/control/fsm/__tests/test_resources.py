@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import logging as logmod
+import pathlib as pl
+import warnings
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+import pytest
+# ##-- end 3rd party imports
+
+from ..factory import FSMFactory
+from ..resources import ResourceTokens
+from ..task import FSMTask
+
+logging = logmod.root
+
+factory = FSMFactory()
+
+def noop_action(*args, **kwargs) -> None:
+    return None
+
+def _task(name:str, resources:list|str, *, action:str|None=None) -> FSMTask:
+    return FSMTask(factory.build({"name": name, "resources": resources,
+                                  "actions": [{"do": noop_action, "resources": action or []}]}))
+
+class TestResourceTokens:
+
+    def test_ctor(self):
+        obj = ResourceTokens({"cpu": 2})
+        assert(bool(obj))
+        assert(not bool(ResourceTokens({})))
+
+    def test_limit_of(self):
+        obj = ResourceTokens({"disk": 2, "disk:/mnt/backup": 1})
+        assert(obj.limit_of("disk:/mnt/backup") == 1)
+        assert(obj.limit_of("disk:/mnt/other") == 2)  # noqa: PLR2004
+        assert(obj.limit_of("net") is None)
+
+    def test_empty_pool_gets_a_token(self):
+        assert(ResourceTokens({"cpu": 0}).limit_of("cpu") == 1)
+
+    def test_classes_of(self):
+        obj  = ResourceTokens({"disk": 1, "net": 1})
+        task = _task("basic::copy", ["disk:/mnt/backup", "cpu"], action="net")
+        # cpu has no pool, so isn't limited
+        assert(obj.classes_of(task) == ("disk:/mnt/backup", "net"))
+
+    def test_acquire_and_release(self):
+        obj     = ResourceTokens({"disk:/mnt/backup": 1})
+        first   = _task("basic::first", "disk:/mnt/backup")
+        second  = _task("basic::second", "disk:/mnt/backup")
+        assert(obj.acquire(first))
+        assert(not obj.acquire(second))
+        assert(obj.in_use("disk:/mnt/backup") == 1)
+        obj.release(first)
+        assert(obj.acquire(second))
+
+    def test_acquire_is_all_or_nothing(self):
+        obj     = ResourceTokens({"disk": 1, "net": 1})
+        first   = _task("basic::first", "net")
+        second  = _task("basic::second", ["disk:/mnt", "net"])
+        assert(obj.acquire(first))
+        assert(not obj.acquire(second))
+        assert(obj.in_use("disk:/mnt") == 0)
+
+    def test_unlimited(self):
+        obj = ResourceTokens({})
+        assert(all(obj.acquire(_task(f"basic::task.{x}", "cpu")) for x in range(10)))
+
+    def test_clear(self):
+        obj   = ResourceTokens({"net": 1})
+        first = _task("basic::first", "net")
+        obj.acquire(first)
+        obj.clear()
+        assert(obj.in_use("net") == 0)
@@ -84,6 +84,55 @@ class TestFSMRunner:
         runner                       = FSMRunner(tracker=tracker)
         runner.run_next_task()
 
+class TestFSMRunner_Concurrent:
+
+    def test_workers(self):
+        tracker = FSMTracker()
+        runner  = FSMRunner(tracker=tracker, workers=4)
+        assert(runner.workers == 4)  # noqa: PLR2004
+
+    def test_run_to_completion(self):
+        tracker  = FSMTracker()
+        names    = [tracker.queue(factory.build({"name":f"simple::basic.{x}"}), from_user=True) for x in range(5)]
+        tracker.build()
+        runner   = FSMRunner(tracker=tracker, workers=2)
+        for _ in range(50):
+            if not bool(tracker):
+                break
+            runner.run_next_task()
+
+        assert(not bool(runner._in_flight))
+        for name in names:
+            assert(tracker.get_status(target=name)[0] is TaskStatus_e.DEAD)
+
+    def test_resource_limited_run(self):
+        tracker  = FSMTracker()
+        names    = [tracker.queue(factory.build({"name":f"simple::basic.{x}", "resources":"disk:/mnt/backup"}), from_user=True) for x in range(3)]
+        tracker.build()
+        runner   = FSMRunner(tracker=tracker, workers=3, resources={"disk":1})
+        for _ in range(50):
+            if not bool(tracker):
+                break
+            runner.run_next_task()
+            assert(runner.resources.in_use("disk:/mnt/backup") <= 1)
+
+        for name in names:
+            assert(tracker.get_status(target=name)[0] is TaskStatus_e.DEAD)
+
+    def test_memory_limited_run(self):
+        tracker  = FSMTracker()
+        names    = [tracker.queue(factory.build({"name":f"simple::basic.{x}", "mem":"1G"}), from_user=True) for x in range(3)]
+        tracker.build()
+        runner   = FSMRunner(tracker=tracker, workers=3, memory_budget="1G")
+        for _ in range(50):
+            if not bool(tracker):
+                break
+            runner.run_next_task()
+            assert(len(runner._in_flight) <= 1)
+
+        for name in names:
+            assert(tracker.get_status(target=name)[0] is TaskStatus_e.DEAD)
+
     ##--|
     @pytest.mark.skip
     def test_todo(self):
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+
+"""
+# ruff: noqa: B011
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import logging as logmod
+import pathlib as pl
+import signal
+import time
+import types
+import warnings
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+import pytest
+from doot.workflow._interface import TaskStatus_e
+# ##-- end 3rd party imports
+
+from ..fsm_tracker import FSMTracker
+from ..observe import HOOKS
+from ..memory import rss
+from ..runner import FSMRunner
+from ..snapshot import SnapshotHandler
+from ..task import FSMTask
+
+logging = logmod.root
+
+handlers  : list[SnapshotHandler]  = []
+taken     : list[str]              = []
+
+def snapshot_action(spec, state) -> None:
+    """ Takes a snapshot from the worker thread, while the runner waits on its pool """
+    taken.extend("\n".join(x.lines()) for x in handlers)
+
+def _runner(*statuses:TaskStatus_e) -> types.SimpleNamespace:
+    """ A stand in runner, with a tracker holding machines in the given states """
+    now      = time.monotonic_ns()
+    models   = [types.SimpleNamespace(name=f"basic::task.{i}", _entered_ns=now) for i in range(len(statuses))]
+    machines = {x.name : types.SimpleNamespace(current_state_value=y, model=x) for x, y in zip(models, statuses, strict=True)}
+    tracker  = types.SimpleNamespace(machines=machines, tombstones={}, _blocked_at={"basic::task.0": now},
+                                     _dependency_states_of=lambda name: [("basic::dep", TaskStatus_e.RUNNING)])
+    return types.SimpleNamespace(tracker=tracker)
+
+class TestSnapshotHandler:
+
+    def test_ctor(self):
+        obj = SnapshotHandler(_runner())
+        assert(obj.sig is signal.SIGUSR1)
+
+    def test_rss(self):
+        current, peak = rss()
+        assert(0 < peak)
+        assert(current is None or 0 < current)
+
+    def test_lines(self):
+        obj   = SnapshotHandler(_runner(TaskStatus_e.WAIT, TaskStatus_e.RUNNING))
+        text  = "\n".join(obj.lines())
+        assert("WAIT       : 1" in text)
+        assert("basic::task.0 : " in text)
+        assert("basic::dep" in text)
+        assert("Running tasks (1)" in text)
+
+    def test_write(self, tmp_path):
+        obj   = SnapshotHandler(_runner(TaskStatus_e.WAIT))
+        path  = obj.write(tmp_path / "snapshot.txt")
+        assert(path.exists())
+        assert(path.read_text().startswith("Snapshot"))
+
+    def test_installs_and_restores_handler(self):
+        previous = signal.getsignal(signal.SIGUSR1)
+        with SnapshotHandler(_runner()) as obj:
+            assert(signal.getsignal(signal.SIGUSR1) == obj.handle)
+            assert(HOOKS.action_start is not None)
+
+        assert(signal.getsignal(signal.SIGUSR1) == previous)
+        assert(HOOKS.action_start is None)
+
+    def test_tracks_running_actions(self):
+        task   = types.SimpleNamespace(name="basic::task")
+        action = types.SimpleNamespace(do="basic:action")
+        with SnapshotHandler(_runner()) as obj:
+            HOOKS.action_start(task, action, "actions")
+            assert(any("basic:action : actions" in x for x in obj.lines()))
+            HOOKS.action_end(task, action, "actions", None, 0, 1)
+            assert(not bool(obj._running))
+
+class TestSnapshotHandler_Runner:
+
+    def test_lists_in_flight_tasks(self):
+        tracker  = FSMTracker()
+        runner   = FSMRunner(tracker=tracker, workers=2)
+        spec     = tracker._factory.build({"name":"simple::snap", "ctor":FSMTask, "actions":[{"do":snapshot_action}]})
+        name     = tracker.queue(spec, from_user=True)
+        tracker.build()
+        taken.clear()
+        handlers[:] = [SnapshotHandler(runner)]
+        for _ in range(50):
+            if not bool(tracker):
+                break
+            runner.run_next_task()
+
+        handlers.clear()
+        match taken:
+            case [text]:
+                assert("In flight tasks (1)" in text)
+                assert(f"{name} : READY : " in text)
+            case x:
+                assert(False), x
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import logging as logmod
+import pathlib as pl
+import warnings
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+import pytest
+# ##-- end 3rd party imports
+
+from ..state import StateOverlay
+
+logging = logmod.root
+
+class TestStateOverlay:
+
+    def test_ctor(self):
+        obj = StateOverlay({})
+        assert(isinstance(obj, StateOverlay))
+
+    def test_read_through(self):
+        base = {"a": 1}
+        obj  = StateOverlay(base)
+        assert(obj["a"] == 1)
+        assert(obj.read == {"a"})
+        assert(not bool(obj.written))
+
+    def test_write_does_not_touch_base(self):
+        base = {"a": 1}
+        obj  = StateOverlay(base)
+        obj["a"] = 2
+        obj["b"] = 3
+        assert(obj["a"] == 2)  # noqa: PLR2004
+        assert(base == {"a": 1})
+        assert(obj.written == {"a", "b"})
+        assert(len(obj) == 2)  # noqa: PLR2004
+
+    def test_delete(self):
+        base = {"a": 1, "b": 2}
+        obj  = StateOverlay(base)
+        del obj["a"]
+        assert("a" not in obj)
+        assert(list(obj) == ["b"])
+        assert(len(obj) == 1)
+        with pytest.raises(KeyError):
+            obj["a"]
+
+    def test_delete_missing(self):
+        obj = StateOverlay({})
+        with pytest.raises(KeyError):
+            del obj["a"]
+
+    def test_commit(self):
+        base = {"a": 1, "b": 2, "c": 3}
+        obj  = StateOverlay(base)
+        obj["a"] = 5
+        obj["d"] = 6
+        del obj["b"]
+        obj.commit()
+        assert(base == {"a": 5, "c": 3, "d": 6})
+
+    def test_local(self):
+        base = {"a": 1}
+        obj  = StateOverlay(base, {"a": 2})
+        assert(obj["a"] == 2)  # noqa: PLR2004
+        assert(dict(obj) == {"a": 2})
+
+    def test_untracked(self):
+        obj = StateOverlay({"a": 1}, track=False)
+        assert(obj["a"] == 1)
+        assert(obj.read is None)
+
+class TestStateOverlay_Layers:
+
+    def test_layered_priority(self):
+        obj = StateOverlay.layered({"a": 1}, None, {"a": 2, "b": 2})
+        assert(obj["a"] == 1)
+        assert(obj["b"] == 2)  # noqa: PLR2004
+
+    def test_layers_are_shared(self):
+        template  = {"a": 1, "b": 2}
+        first     = StateOverlay.layered({"item": 1}, template)
+        second    = StateOverlay.layered({"item": 2}, template)
+        first["a"] = 10
+        assert(second["a"] == 1)
+        assert(template == {"a": 1, "b": 2})
+        assert(first._base.maps[-1] is second._base.maps[-1])
+
+    def test_layered_delete_masks(self):
+        template  = {"a": 1}
+        obj       = StateOverlay.layered(template)
+        del obj["a"]
+        assert("a" not in obj)
+        assert(template == {"a": 1})
+
+    def test_frozen_is_a_snapshot(self):
+        template   = {"a": 1}
+        obj        = StateOverlay.layered(template)
+        obj["b"]   = 2
+        frozen     = obj.frozen()
+        obj["b"]   = 3
+        assert(frozen["b"] == 2)  # noqa: PLR2004
+        assert(frozen["a"] == 1)
@@ -20,10 +20,11 @@ import pytest
 
 
 ##--|
-from ..task import FSMTask
+from ..task import FSMTask, precompute_remote
 from ..factory import FSMFactory
 from doot.workflow import TaskSpec
-from doot.workflow._interface import Task_p, Task_i
+from doot.workflow._interface import Task_p, Task_i, TaskStatus_e
+from doot.workflow._interface import ActionResponse_e as ActRE
 ##--|
 
 # ##-- types
@@ -62,6 +63,16 @@ logging = logmod.getLogger(__name__)
 
 # Vars:
 factory = FSMFactory()
+
+def noop_action(*args, **kwargs) -> None:
+    return None
+
+def update_action(spec, state) -> dict:
+    return {"bloo": state['blah'] + 1}
+
+def append_action(spec, state) -> None:
+    state['items'].append(state['blah'])
+
 # Body:
 class TestFSMTask:
 
@@ -76,6 +87,137 @@ class TestFSMTask:
             case x:
                 assert(False), x
 
+    def test_cached_hash(self):
+        spec = factory.build({"name":"basic::simple"})
+        task = FSMTask(spec)
+        assert(hash(task) == hash(spec.name))
+        assert(task._readable == spec.name[:])
+
+    def test_eq(self):
+        spec   = factory.build({"name":"basic::simple"})
+        task   = FSMTask(spec)
+        other  = FSMTask(factory.build({"name":"basic::other"}))
+        assert(task == spec.name)
+        assert(task == spec.name[:])
+        assert(task == FSMTask(spec))
+        assert(task != other)
+        assert(task != 5)  # noqa: PLR2004
+
+    def test_state_durations(self):
+        spec = factory.build({"name":"basic::simple"})
+        task = FSMTask(spec)
+        match task.state_durations():
+            case [(TaskStatus_e.NAMED, int() as ns)]:
+                assert(0 <= ns)
+            case x:
+                assert(False), x
+
+    def test_state_durations_follow_history(self):
+        spec = factory.build({"name":"basic::simple"})
+        task = FSMTask(spec)
+        for state in [TaskStatus_e.NAMED, TaskStatus_e.DECLARED]:
+            task.on_exit_state(source=types.SimpleNamespace(value=state))
+        else:
+            task.status = TaskStatus_e.DEFINED
+
+        assert(len(task._state_times) == len(task._state_history))
+        assert([x for x, _ in task.state_durations()] == [TaskStatus_e.NAMED, TaskStatus_e.DECLARED, TaskStatus_e.DEFINED])
+        assert(all(0 <= y for _, y in task.state_durations()))
+
+    def test_precompute(self):
+        spec = factory.build({"name":"basic::simple", "actions":[{"do":noop_action}]})
+        task = FSMTask(spec)
+        task.precompute(phase=TaskStatus_e.READY)
+        assert(set(task._precomputed.keys()) == {"depends_on", "setup", "actions"})
+        match task._execute_action_group(group="actions"):
+            case 1, ActRE.SUCCESS:
+                assert("actions" not in task._precomputed)
+            case x:
+                assert(False), x
+
+    def test_action_state_is_recorded(self, caplog):
+        caplog.set_level(logmod.DEBUG, logger="dootle.control.fsm.task")
+        spec = factory.build({"name":"basic::simple", "actions":[{"do":update_action}]})
+        task = FSMTask(spec)
+        task._internal_state['blah'] = 5
+        task._execute_action_group(group="actions")
+        assert(task._internal_state['bloo'] == 6)  # noqa: PLR2004
+        match task.records:
+            case [(_, read, written)]:
+                assert("blah" in read)
+                assert("bloo" in written)
+            case x:
+                assert(False), x
+
+    def test_action_state_is_not_recorded(self, caplog):
+        caplog.set_level(logmod.INFO, logger="dootle.control.fsm.task")
+        spec = factory.build({"name":"basic::simple", "actions":[{"do":update_action}]})
+        task = FSMTask(spec)
+        task._internal_state['blah'] = 5
+        task._execute_action_group(group="actions")
+        assert(task._internal_state['bloo'] == 6)  # noqa: PLR2004
+        assert(not bool(task.records))
+
+    def test_action_state_not_recorded_for_subscribers(self, caplog, hooks):
+        caplog.set_level(logmod.INFO, logger="dootle.control.fsm.task")
+        spec = factory.build({"name":"basic::simple", "actions":[{"do":update_action}]})
+        task = FSMTask(spec)
+        task._internal_state['blah'] = 5
+        with hooks.subscribe(action_end=lambda *_: None):
+            task._execute_action_group(group="actions")
+        assert(not bool(task.records))
+
+    def test_action_state_recorded_when_asked(self, caplog, monkeypatch):
+        caplog.set_level(logmod.INFO, logger="dootle.control.fsm.task")
+        monkeypatch.setattr(FSMTask, "record_state", True)
+        spec = factory.build({"name":"basic::simple", "actions":[{"do":update_action}]})
+        task = FSMTask(spec)
+        task._internal_state['blah'] = 5
+        task._execute_action_group(group="actions")
+        match task.records:
+            case [(_, read, written)]:
+                assert("blah" in read)
+                assert("bloo" in written)
+            case x:
+                assert(False), x
+
+    def test_precompute_error_is_reraised(self):
+        spec = factory.build({"name":"basic::simple"})
+        task = FSMTask(spec)
+        task._precomputed["actions"] = ValueError("blah")
+        with pytest.raises(ValueError):
+            task._execute_action_group(group="actions")
+
+    def test_remote_roundtrip(self):
+        spec    = factory.build({"name":"basic::simple", "actions":[{"do":noop_action}]})
+        task    = FSMTask(spec)
+        task._internal_state['blah'] = 5
+        payload = task.remote_payload(phase=TaskStatus_e.READY)
+        assert(isinstance(payload, bytes))
+        precomputed, delta, removed, timings, grown = precompute_remote(payload)
+        assert(set(precomputed.keys()) == {"depends_on", "setup", "actions"})
+        assert("blah" not in delta)
+        assert(not bool(removed))
+        assert(TaskStatus_e.READY in timings)
+        task.merge_remote((precomputed, delta, removed, timings, grown))
+        assert(task._internal_state['blah'] == 5)  # noqa: PLR2004
+
+    def test_remote_in_place_change(self):
+        spec    = factory.build({"name":"basic::simple", "actions":[{"do":append_action}]})
+        task    = FSMTask(spec)
+        task._internal_state['blah']   = 5
+        task._internal_state['items']  = [1]
+        payload = task.remote_payload(phase=TaskStatus_e.READY)
+        _, delta, _, _, _ = precompute_remote(payload)
+        assert("blah" not in delta)
+        assert(delta['items'] == [1, 5])
+
+    def test_remote_payload_unpicklable(self):
+        spec = factory.build({"name":"basic::simple"})
+        task = FSMTask(spec)
+        task._internal_state['blah'] = lambda: 5
+        assert(task.remote_payload(phase=TaskStatus_e.READY) is None)
+
     ##--|
     @pytest.mark.skip
     def test_todo(self):
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import logging as logmod
+import pathlib as pl
+import warnings
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+import pytest
+from doot.workflow import TaskName
+from doot.workflow._interface import TaskStatus_e
+# ##-- end 3rd party imports
+
+from ..timings import StateTimes, Timing_d
+
+logging = logmod.root
+
+class _TimedTask:
+    """ A stand in with fixed state durations """
+
+    def __init__(self, name:str, durations:list) -> None:
+        self.name        = TaskName(name)
+        self._durations  = durations
+
+    def state_durations(self) -> list:
+        return self._durations
+
+class TestStateTimes:
+
+    def test_ctor(self):
+        obj = StateTimes()
+        assert(isinstance(obj, StateTimes))
+        assert(obj.by_state() == {})
+
+    def test_add(self):
+        obj = StateTimes()
+        obj.add(_TimedTask("basic::task", [(TaskStatus_e.WAIT, 10), (TaskStatus_e.RUNNING, 5)]))
+        assert(len(obj) == 1)
+        assert(obj.by_state()[TaskStatus_e.WAIT] == Timing_d(1, 10, 10))
+
+    def test_add_without_durations(self):
+        obj = StateTimes()
+        obj.add(object())
+        assert(len(obj) == 0)
+
+    def test_sums_per_template(self):
+        obj = StateTimes()
+        obj.add(_TimedTask("basic::task", [(TaskStatus_e.WAIT, 10)]))
+        obj.add(_TimedTask("basic::task", [(TaskStatus_e.WAIT, 30)]))
+        obj.add(_TimedTask("basic::other", [(TaskStatus_e.WAIT, 5)]))
+        assert(obj.by_template()["basic::task"][TaskStatus_e.WAIT] == Timing_d(2, 40, 30))
+        assert(obj.by_state()[TaskStatus_e.WAIT] == Timing_d(3, 45, 30))
+        assert(obj.by_state()[TaskStatus_e.WAIT].mean_ns == 15)  # noqa: PLR2004
+
+    def test_report(self):
+        obj = StateTimes()
+        obj.add(_TimedTask("basic::task", [(TaskStatus_e.WAIT, 10), (TaskStatus_e.RUNNING, 5)]))
+        lines = obj.report()
+        assert(any("WAIT" in x for x in lines))
+        assert(any("basic::task" in x for x in lines))
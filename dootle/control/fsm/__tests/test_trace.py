@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+
+"""
+# ruff: noqa: B011
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import asyncio
+import json
+import logging as logmod
+import pathlib as pl
+import types
+import warnings
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+import pytest
+from doot.workflow._interface import TaskStatus_e
+# ##-- end 3rd party imports
+
+from .. import trace as Trace  # noqa: N812
+from ..trace import TraceWriter
+from ..factory import FSMFactory
+from ..fsm_tracker import FSMTracker
+from ..observe import HOOKS
+from ..task import FSMTask
+
+logging = logmod.root
+
+factory = FSMFactory()
+
+def noop_action(*args, **kwargs) -> None:
+    return None
+
+async def async_noop(*args, **kwargs) -> None:
+    await asyncio.sleep(0.01)
+
+@pytest.mark.usefixtures("hooks")
+class TestTraceWriter:
+
+    @pytest.fixture(scope="function")
+    def writer(self, tmp_path):
+        return TraceWriter(tmp_path / "trace.json")
+
+    def read(self, path:pl.Path) -> list[dict]:
+        return json.loads(path.read_text())
+
+    def test_ctor(self, writer):
+        assert(isinstance(writer, TraceWriter))
+        assert(writer.path.exists())
+
+    def test_close_is_valid_json(self, writer):
+        writer.close()
+        match self.read(writer.path):
+            case [{"ph":"M", "name":"process_name"}]:
+                assert(True)
+            case x:
+                assert(False), x
+
+    def test_unclosed_is_a_prefix(self, writer):
+        writer.complete("blah", Trace.ACTION_CAT, 1_000, 3_000)
+        writer.flush()
+        text = writer.path.read_text()
+        assert(text.startswith("["))
+        assert(not text.rstrip().endswith("]"))
+        assert(json.loads(f"{text}]")[-1]["dur"] == 2)  # noqa: PLR2004
+
+    def test_complete_names_thread_track(self, writer):
+        writer.complete("blah", Trace.ACTION_CAT, 1_000, 2_000)
+        writer.close()
+        events = self.read(writer.path)
+        tracks = [x for x in events if x["name"] == "thread_name"]
+        assert(len(tracks) == 1)
+        assert(events[-1]["tid"] == tracks[0]["tid"])
+
+    def test_chunked(self, tmp_path):
+        writer = TraceWriter(tmp_path / "trace.json", flush_every=2)
+        writer.complete("blah", Trace.ACTION_CAT, 1_000, 2_000)
+        assert(not bool(writer._buffer))
+        writer.close()
+
+    def test_task(self, writer):
+        task = FSMTask(factory.build({"name":"basic::simple"}))
+        task.on_exit_state(source=types.SimpleNamespace(value=TaskStatus_e.NAMED))
+        task.status = TaskStatus_e.DECLARED
+        writer.task(task)
+        writer.close()
+        spans  = [x for x in self.read(writer.path) if x.get("cat") == Trace.TASK_CAT]
+        assert([(x["ph"], x["name"]) for x in spans] == [("b", task.name[:]),
+                                                        ("b", "NAMED"), ("e", "NAMED"),
+                                                        ("b", "DECLARED"), ("e", "DECLARED"),
+                                                        ("e", task.name[:])])
+
+    def test_attached_writer_records_groups(self, writer):
+        writer.attach()
+        task = FSMTask(factory.build({"name":"basic::simple", "actions":[{"do":noop_action}]}))
+        task._execute_action_group(group="actions")
+        writer.close()
+        cats = [x.get("cat") for x in self.read(writer.path)]
+        assert(Trace.GROUP_CAT in cats)
+        assert(Trace.ACTION_CAT in cats)
+
+    def test_concurrent_async_groups_are_spans(self, writer):
+        """ Overlapping coroutines on the loop's thread are async spans per task, not complete events """
+        writer.attach()
+        tasks = [FSMTask(factory.build({"name":f"basic::{x}", "actions":[{"do":async_noop}]})) for x in ("alpha", "beta")]
+
+        async def run() -> None:
+            await asyncio.gather(*(x._aexecute_action_group(group="actions") for x in tasks))
+
+        asyncio.run(run())
+        writer.close()
+        events = [x for x in self.read(writer.path) if x.get("cat") in {Trace.GROUP_CAT, Trace.ACTION_CAT}]
+        assert(not any(x["ph"] == "X" for x in events))
+        for task in tasks:
+            spans = [(x["ph"], x["cat"]) for x in events if x["id"] == f"{hash(task):x}"]
+            assert(sorted(spans) == [("b", Trace.ACTION_CAT), ("b", Trace.GROUP_CAT),
+                                     ("e", Trace.ACTION_CAT), ("e", Trace.GROUP_CAT)])
+
+    def test_detached_writer_records_nothing(self, writer):
+        with writer.attach():
+            pass
+        task = FSMTask(factory.build({"name":"basic::simple", "actions":[{"do":noop_action}]}))
+        task._execute_action_group(group="actions")
+        writer.close()
+        cats = [x.get("cat") for x in self.read(writer.path)]
+        assert(Trace.GROUP_CAT not in cats)
+
+@pytest.mark.usefixtures("hooks")
+class TestTracker_Trace:
+
+    def run(self, tracker:FSMTracker, name:str) -> None:
+        spec = tracker._factory.build({"name":name})
+        tracker.register(spec)
+        tracker.queue(spec.name, from_user=True)
+        tracker.build()
+        task = tracker.next_for()
+        tracker.machines[task.name](step=1, tracker=tracker)
+        tracker.machines[task.name](tracker=tracker)
+        tracker.clear()
+
+    def tasks_in(self, path:pl.Path) -> set[str]:
+        return {x["name"] for x in json.loads(path.read_text()) if x.get("cat") == Trace.TASK_CAT and x["ph"] == "b" and "::" in x["name"]}
+
+    def test_clear_detaches(self, tmp_path):
+        first = FSMTracker(trace=tmp_path / "first.json")
+        assert(HOOKS.transition is not None)
+        self.run(first, "basic::alpha")
+        assert(HOOKS.transition is None)
+        assert(HOOKS.group_end is None)
+
+    def test_trackers_in_a_row(self, tmp_path):
+        first   = FSMTracker(trace=tmp_path / "first.json")
+        self.run(first, "basic::alpha")
+        second  = FSMTracker(trace=tmp_path / "second.json")
+        self.run(second, "basic::beta")
+        match self.tasks_in(first.trace.path), self.tasks_in(second.trace.path):
+            case [alpha], [beta]:
+                assert(alpha.startswith("basic::alpha"))
+                assert(beta.startswith("basic::beta"))
+            case x:
+                assert(False), x
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import logging as logmod
+import pathlib as pl
+import warnings
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+import pytest
+from doot.workflow import TaskName
+# ##-- end 3rd party imports
+
+from ..waits import WaitTimes
+
+logging = logmod.root
+
+class TestWaitTimes:
+
+    def test_ctor(self):
+        obj = WaitTimes()
+        assert(isinstance(obj, WaitTimes))
+        assert(len(obj) == 0)
+        assert(obj.by_task() == [])
+
+    def test_add(self):
+        obj     = WaitTimes()
+        waiter  = TaskName("basic::waiter")
+        blocker = TaskName("basic::blocker")
+        obj.add(waiter, blocker, 10)
+        assert(len(obj) == 1)
+        assert(obj.last_blocker(waiter) == (blocker, 10))
+        assert(obj.by_task() == [(blocker, 10)])
+
+    def test_last_blocker_missing(self):
+        obj = WaitTimes()
+        assert(obj.last_blocker(TaskName("basic::waiter")) is None)
+
+    def test_last_blocker_replaced(self):
+        obj     = WaitTimes()
+        waiter  = TaskName("basic::waiter")
+        obj.add(waiter, TaskName("basic::first"), 10)
+        obj.add(waiter, TaskName("basic::second"), 5)
+        assert(obj.last_blocker(waiter) == (TaskName("basic::second"), 5))
+
+    def test_ranked(self):
+        obj = WaitTimes()
+        obj.add(TaskName("basic::a"), TaskName("basic::slow"), 10)
+        obj.add(TaskName("basic::b"), TaskName("basic::slow"), 30)
+        obj.add(TaskName("basic::c"), TaskName("basic::fast"), 5)
+        assert([x for x, _ in obj.by_task()] == [TaskName("basic::slow"), TaskName("basic::fast")])
+        assert(obj.by_task()[0][1] == 40)  # noqa: PLR2004
+
+    def test_report(self):
+        obj = WaitTimes()
+        obj.add(TaskName("basic::a"), TaskName("basic::slow"), 10_000_000)
+        lines = obj.report(top=5)
+        assert(lines[0].startswith("Top 5 Blocking Tasks"))
+        assert(any("waiters 1" in x for x in lines))
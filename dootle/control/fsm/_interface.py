@@ -28,6 +28,7 @@ import faulthandler
 # ##-- end stdlib imports
 
 from importlib.metadata import EntryPoint
+from typing import NamedTuple
 
 # ##-- types
 # isort: off
@@ -52,6 +53,7 @@ if TYPE_CHECKING:
     from collections.abc import Sequence, Mapping, MutableMapping, Hashable
 
     from doot.control.tracker._interface import WorkflowTracker_p
+    from doot.workflow._interface import TaskName_p, TaskStatus_e
     from statemachine import State
 
 ##--|
@@ -71,6 +73,12 @@ FAIL_GROUP      : Final[str]         = "on_fail"
 DEPENDS_GROUP   : Final[str]         = "depends_on"
 CLEANUP_GROUP   : Final[str]         = "cleanup"
 
+PROCESS_K       : Final[str]         = "process"
+RESOURCES_K     : Final[str]         = "resources"
+MEM_K           : Final[str]         = "mem"
+DURATION_K      : Final[str]         = "duration"
+DEFAULT_DURATION : Final[float]      = 1.0
+
 TASK_EP         : Final[EntryPoint]  = EntryPoint("task", group="doot.aliases.task", value="dootle.control.fsm.task:FSMTask")
 ALIASES_UPDATE  : Final[dict]        = {
     "task" : [TASK_EP],
@@ -119,6 +127,44 @@ class TaskModel_p(TaskModel_Callbacks_p, TaskModel_Conditions_p, Protocol):
     """
     pass
 
+class TrackerFlags_d(NamedTuple):
+    """ The optional features of an FSMTracker, by kwarg name.
+    see FSMTracker for what each enables, and fsm_tracker.configured_flags for their settings.
+    """
+    engine         : bool  = False
+    critical_path  : bool  = False
+    history        : bool  = False
+    checkpoint     : bool  = False
+    reclaim        : bool  = False
+    trace          : bool  = False
+    metrics        : bool  = False
+    adjacency      : bool  = False
+    wait_report    : bool  = False
+
+class Tombstone_d(NamedTuple):
+    """ What remains of a reclaimed task.
+    state_ns is the wall time spent in each state, from FSMTask.state_durations,
+    and cpu_ns the cpu time of any phases precomputed on a worker.
+    """
+    name      : TaskName_p
+    status    : TaskStatus_e
+    outcome   : Maybe[TaskStatus_e]
+    priority  : int
+    state_ns  : tuple[tuple[TaskStatus_e, int], ...] = ()
+    cpu_ns    : int                                   = 0
+
+@runtime_checkable
+class StateListener_p(Protocol):
+    """ A tracker which is told when its tasks enter a new state """
+
+    def notify_state(self, name:TaskName_p, status:TaskStatus_e) -> None: ...
+
+@runtime_checkable
+class SubgraphInserter_p(Protocol):
+    """ A tracker which can add new tasks to its network incrementally """
+
+    def insert_subgraph(self, names:Iterable, *, parent:Maybe[TaskName_p]=None) -> list[TaskName_p]: ...
+
 @runtime_checkable
 class ArtifactModel_p(Protocol):
     """ Describes the callbacks for an FSM of a task """
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+A compact, integer indexed, copy of a tracker network's edges,
+for the dependency queries the FSMTracker makes on every routing decision.
+
+Nodes are given dense integer ids as they are indexed.
+Each direction of adjacency is stored CSR style,
+as an offsets array into a flat array of neighbour ids,
+alongside a parallel array of each node's TaskStatus_e (as engine.STATE_IDX bytes).
+
+The networkx graph remains the source of truth, so the index is held alongside it.
+It adds memory to a run, rather than saving any:
+its id dict, name list and arrays are traded for scans that don't hash names or look up machines.
+See __tests/bench_adjacency.py for the added memory and the scan times.
+Nodes whose edges change after indexing are patched,
+and the arrays are rebuilt once enough patches accumulate.
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import logging as logmod
+from array import array
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+from doot.workflow._interface import TaskStatus_e
+
+# ##-- end 3rd party imports
+
+from .engine import STATE_IDX, STATES
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType, Never
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+ID_CODE         : Final[str]  = "Q"
+UNKNOWN         : Final[int]  = 255
+COMPACT_MIN     : Final[int]  = 1024
+COMPACT_RATIO   : Final[int]  = 8
+##--|
+
+class _Csr:
+    """ One direction of adjacency.
+    Row i's neighbours are targets[offsets[i]:offsets[i+1]],
+    unless the row has been patched since the last compaction.
+    """
+    __slots__ = ("_view", "offsets", "patched", "targets")
+    offsets  : array
+    targets  : array
+    patched  : dict[int, array]
+
+    def __init__(self) -> None:
+        self.offsets  = array(ID_CODE, [0])
+        self.targets  = array(ID_CODE)
+        self.patched  = {}
+        self._view    = memoryview(self.targets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def row(self, idx:int) -> Sequence[int]:
+        match self.patched.get(idx, None):
+            case None if idx < len(self):
+                return self._view[self.offsets[idx]:self.offsets[idx+1]]
+            case None:
+                return ()
+            case patch:
+                return patch
+
+    def set_row(self, idx:int, ids:Iterable[int]) -> None:
+        self.patched[idx] = array(ID_CODE, ids)
+
+    def compact(self, size:int) -> None:
+        """ Rebuild the flat arrays to include all patches, and rows up to size """
+        offsets  = array(ID_CODE, [0])
+        targets  = array(ID_CODE)
+        for idx in range(size):
+            targets.extend(self.row(idx))
+            offsets.append(len(targets))
+        else:
+            self.offsets  = offsets
+            self.targets  = targets
+            self.patched  = {}
+            self._view    = memoryview(self.targets)
+
+class AdjacencyIndex:
+    """ Integer node ids, CSR predecessor and successor arrays, and a parallel status array.
+
+    Statuses are kept up to date by the owner (the FSMTracker does so in notify_state).
+    Nodes without a tracked status (eg: artifacts) are UNKNOWN,
+    which the owner resolves itself.
+    """
+    __slots__ = ("_ids", "_indexed", "_names", "_pred", "_succ", "status")
+    _ids      : dict[Hashable, int]
+    _indexed  : bytearray
+    _names    : list[Hashable]
+    _pred     : _Csr
+    _succ     : _Csr
+    status    : array
+
+    def __init__(self) -> None:
+        self._ids      = {}
+        self._indexed  = bytearray()
+        self._names    = []
+        self._pred     = _Csr()
+        self._succ     = _Csr()
+        self.status    = array("B")
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, node:Hashable) -> bool:
+        """ Whether a node's edges have been indexed """
+        match self._ids.get(node, None):
+            case None:
+                return False
+            case idx:
+                return bool(self._indexed[idx])
+
+    def id_of(self, node:Hashable) -> int:
+        """ Get, or assign, the integer id of a node """
+        match self._ids.get(node, None):
+            case int() as idx:
+                return idx
+            case None:
+                idx = len(self._names)
+                self._ids[node] = idx
+                self._names.append(node)
+                self._indexed.append(0)
+                self.status.append(UNKNOWN)
+                return idx
+
+    def index(self, nodes:Iterable[Hashable], pred:Mapping, succ:Mapping, *, exclude:Maybe[Hashable]=None) -> list[Hashable]:
+        """ (Re)index the edges of nodes, from pred and succ mappings (eg: a networkx graph's)
+        Edges to exclude (eg: the root node) aren't indexed.
+        Returns the nodes which were given new ids, so the owner can set their statuses.
+        """
+        start = len(self._names)
+        for node in nodes:
+            if node == exclude:
+                continue
+            idx = self.id_of(node)
+            self._pred.set_row(idx, [self.id_of(x) for x in pred[node] if x != exclude])
+            self._succ.set_row(idx, [self.id_of(x) for x in succ[node] if x != exclude])
+            self._indexed[idx] = 1
+        else:
+            self._maybe_compact()
+            return self._names[start:]
+
+    def set_status(self, node:Hashable, status:TaskStatus_e) -> None:
+        """ Record the status of an indexed node. Unindexed nodes are ignored """
+        match self._ids.get(node, None):
+            case None:
+                pass
+            case idx:
+                self.status[idx] = STATE_IDX[status]
+
+    def preds(self, node:Hashable) -> list[Hashable]:
+        names = self._names
+        return [names[x] for x in self._pred.row(self._ids[node])]
+
+    def succs(self, node:Hashable) -> list[Hashable]:
+        names = self._names
+        return [names[x] for x in self._succ.row(self._ids[node])]
+
+    def pred_states(self, node:Hashable) -> list[tuple[Hashable, Maybe[TaskStatus_e]]]:
+        """ The predecessors of a node, and their statuses. UNKNOWN statuses are None """
+        return self._states(self._pred.row(self._ids[node]))
+
+    def succ_states(self, node:Hashable) -> list[tuple[Hashable, Maybe[TaskStatus_e]]]:
+        """ The successors of a node, and their statuses. UNKNOWN statuses are None """
+        return self._states(self._succ.row(self._ids[node]))
+
+    def _states(self, ids:Sequence[int]) -> list[tuple[Hashable, Maybe[TaskStatus_e]]]:
+        names, status = self._names, self.status
+        return [(names[x], None if status[x] == UNKNOWN else STATES[status[x]]) for x in ids]
+
+    def _maybe_compact(self) -> None:
+        limit = max(COMPACT_MIN, len(self._names) // COMPACT_RATIO)
+        for csr in (self._pred, self._succ):
+            if limit < len(csr.patched) or len(csr) == 0:
+                csr.compact(len(self._names))
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+An asyncio based workflow runner for doot,
+for overlapping many IO bound FSM tasks on a single event loop
+"""
+# mypy: disable-error-code="attr-defined"
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import asyncio
+import datetime
+import enum
+import functools as ftz
+import itertools as itz
+import logging as logmod
+import pathlib as pl
+import re
+import time
+import types
+from uuid import UUID, uuid1
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+from jgdv import Proto, Mixin
+
+# ##-- end 3rd party imports
+
+# ##-- 1st party imports
+import doot
+import doot.errors
+from doot.workflow._interface import TaskStatus_e
+
+# ##-- end 1st party imports
+
+from .runner import FSMRunner
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Never, Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+##--|
+from doot.workflow._interface import Task_p
+from doot.control.runner._interface import WorkflowRunner_p
+# isort: on
+# ##-- end types
+
+##-- logging
+logging           = logmod.getLogger(__name__)
+##-- end logging
+
+##--| Vars
+default_limit  : Final[int]  = doot.config.on_fail(64).commands.run.async_limit()
+##--|
+
+@Proto(WorkflowRunner_p, check=False)
+class AsyncFSMRunner(FSMRunner):
+    """ An FSMRunner which runs task action groups as coroutines on an event loop.
+
+    Async functions, and actions defining 'async __call__', are awaited,
+    plain actions are run in the loop's default executor.
+    This covers every group the runner hands to the loop: job expansions, fail groups (run ahead of the machine),
+    and the cleanup of tasks halted by an upstream failure.
+    (The plain FSMRunner fails a task with an async action, rather than run a loop per action)
+    Up to 'workers' tasks (default: settings.commands.run.async_limit) are in flight at once,
+    and TaskMachines are still only progressed between loop runs, on the main thread.
+
+    Activated by setting doot.toml:
+    settings.commands.run.runner = 'dootle.control.fsm.async_runner:AsyncFSMRunner'
+    """
+    _loop  : Maybe[asyncio.AbstractEventLoop]
+
+    def __init__(self, *args:Any, workers:Maybe[int]=None, **kwargs:Any) -> None:
+        kwargs.pop("processes", None)
+        super().__init__(*args, workers=workers or default_limit, **kwargs)
+        self.processes  = 0
+        self._loop      = None
+
+    @override
+    def run_next_task(self) -> None:
+        self._run_concurrent()
+
+    @override
+    def _submit(self, task:Task_p) -> None:
+        phase   = self.tracker.machines[task.name].current_state_value
+        future  = self._event_loop().create_task(task.aprecompute(phase=phase))
+        self._in_flight[future]  = task # type: ignore[index]
+        self._submitted[future]  = time.monotonic_ns() # type: ignore[index]
+
+    @override
+    def _harvest(self) -> None:
+        """ Run the loop until at least one in flight task has finished its actions,
+        then progress the machines of all finished tasks
+        """
+        done : set[asyncio.Task]
+        if not bool(self._in_flight):
+            return
+
+        waiting  = asyncio.wait(self._in_flight, return_when=asyncio.FIRST_COMPLETED) # type: ignore[arg-type]
+        done, _  = self._event_loop().run_until_complete(waiting)
+        for future in done:
+            task = self._in_flight.pop(future) # type: ignore[call-overload]
+            self._submitted.pop(future, None) # type: ignore[call-overload]
+            self._release(task)
+            self._run_task(lambda t=task: t)
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+
+        return self._loop
+
+    @override
+    def _shutdown_pool(self, *, cancel:bool=False) -> None:
+        if self._loop is None:
+            return
+
+        if cancel:
+            for future in self._in_flight:
+                future.cancel()
+            else:
+                pending = asyncio.gather(*self._in_flight, return_exceptions=True) # type: ignore[arg-type]
+                self._loop.run_until_complete(pending)
+
+        self._loop.run_until_complete(self._loop.shutdown_default_executor())
+        self._loop.close()
+        self._loop = None
+        self._in_flight.clear()
+        self._submitted.clear()
+        self.resources.clear()
+        self.memory.clear()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Checkpointing of an FSMTracker's run, as an append-only log.
+
+Rather than periodically snapshotting every machine,
+the tracker appends small records as they happen:
+- ("success", key, state)                   : a task reached SUCCESS, with the state its actions wrote
+- ("done", key)                             : a successful task reached DEAD
+- ("expand", key, specs)                    : a job's expansion, so it can be re-queued without re-running the job
+- ("postbox", box, subbox, start, values)   : values added to a postbox subbox since the last flush,
+                                              replacing those from 'start' on
+
+As instance names are regenerated each run, tasks are keyed by instance_key:
+their template name, and a digest of the instance's data (eg: its injected values).
+So instances of one template are told apart however their completion was ordered,
+while instances with the same data, being interchangeable, are matched by count.
+Reading the log back (see Checkpoint.read) gives the completed tasks by key,
+which a resumed tracker consumes as it instantiates tasks.
+
+As postbox subboxes are only appended to, or replaced when cleared,
+each flush only logs what changed, rather than the whole postbox.
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import hashlib
+import logging as logmod
+import pathlib as pl
+import pickle
+from collections import Counter, defaultdict
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+import doot
+from jgdv.structs.dkey import DKey
+
+# ##-- end 3rd party imports
+
+from dootle.actions.postbox import _DootPostBox
+from .history import history_key
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType, Never
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    import io
+    from doot.workflow._interface import TaskSpec_i
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+CHECKPOINT_FILE  : Final[str]  = "fsm_checkpoint.log"
+FLUSH_EVERY      : Final[int]  = doot.config.on_fail(100).commands.run.checkpoint_every()
+temp_key                       = DKey("temp!p", implicit=True)
+
+SUCCESS_R        : Final[str]  = "success"
+DONE_R           : Final[str]  = "done"
+EXPAND_R         : Final[str]  = "expand"
+POSTBOX_R        : Final[str]  = "postbox"
+KEY_DIGEST       : Final[int]  = 8
+##--|
+
+def default_path() -> pl.Path:
+    return temp_key.expand() / CHECKPOINT_FILE
+
+def instance_key(spec:TaskSpec_i) -> str:
+    """ The key a task instance is checkpointed by, stable across runs.
+    If the instance's data can't be pickled, it falls back to the template name alone.
+    """
+    base = history_key(spec.name)
+    try:
+        data = pickle.dumps(sorted(dict(spec.extra).items()))
+    except Exception as err:  # noqa: BLE001
+        logging.debug("Task Data can't be digested for a checkpoint key: %s : %s", spec.name, err)
+        return base
+    else:
+        return f"{base}#{hashlib.blake2b(data, digest_size=KEY_DIGEST).hexdigest()}"
+
+class Checkpoint:
+    """ The state recovered from a transition log """
+    succeeded   : defaultdict[str, list[Maybe[dict]]]
+    done        : Counter[str]
+    expansions  : defaultdict[str, list[list]]
+    postbox     : Maybe[dict[str, dict[str, list]]]
+
+    def __init__(self) -> None:
+        self.succeeded   = defaultdict(list)
+        self.done        = Counter()
+        self.expansions  = defaultdict(list)
+        self.postbox     = None
+
+    @staticmethod
+    def read(path:pl.Path) -> Checkpoint:
+        """ Read records until the end of the log.
+        A truncated final record (eg: from a crash mid write) is ignored.
+        """
+        result = Checkpoint()
+        if not path.exists():
+            return result
+
+        with path.open("rb") as fh:
+            while True:
+                try:
+                    record = pickle.load(fh)  # noqa: S301
+                except EOFError:
+                    break
+                except (pickle.UnpicklingError, AttributeError, ImportError, IndexError) as err:
+                    logging.warning("Checkpoint log ends with an unreadable record: %s", err)
+                    break
+
+                match record:
+                    case (str() as kind, str() as key, state) if kind == SUCCESS_R:
+                        result.succeeded[key].append(state)
+                    case (str() as kind, str() as key) if kind == DONE_R:
+                        result.done[key] += 1
+                    case (str() as kind, str() as key, list() as specs) if kind == EXPAND_R:
+                        result.expansions[key].append(specs)
+                    case (str() as kind, str() as box, str() as sub, int() as start, list() as vals) if kind == POSTBOX_R:
+                        result._apply_postbox(box, sub, start, vals)
+                    case x:
+                        logging.warning("Unknown Checkpoint record: %s", x)
+
+        return result
+
+    def consume(self, key:str) -> tuple[Maybe[str], Maybe[dict]]:
+        """ Claim a completed record for an instantiated task, by its instance_key.
+        Returns (DONE_R, None) if the task had finished,
+        (SUCCESS_R, state) if it had succeeded but not been torn down,
+        or (None, None) if it needs to run.
+        A success whose state couldn't be logged is claimed, but still needs to run.
+        """
+        if 0 < self.done[key]:
+            self.done[key] -= 1
+            if bool(self.succeeded[key]):
+                self.succeeded[key].pop(0)
+            return DONE_R, None
+        if bool(self.succeeded[key]):
+            match self.succeeded[key].pop(0):
+                case None:
+                    return None, None
+                case state:
+                    return SUCCESS_R, state
+        return None, None
+
+    def _apply_postbox(self, box:str, sub:str, start:int, vals:list) -> None:
+        if self.postbox is None:
+            self.postbox = {}
+        subboxes       = self.postbox.setdefault(box, {})
+        subboxes[sub]  = [*subboxes.get(sub, [])[:start], *vals]
+
+    def restore_postbox(self) -> None:
+        if self.postbox is None:
+            return
+        for box, subboxes in self.postbox.items():
+            for subbox, vals in subboxes.items():
+                _DootPostBox.boxes[box][subbox] = list(vals)
+
+class TransitionLog:
+    """ Appends checkpoint records to a file.
+
+    Records are pickled one after another into a buffered file,
+    which is flushed every 'flush_every' records.
+    Nothing already written is ever rewritten.
+
+    The postbox subboxes are tracked by identity and logged length,
+    so a flush only pickles the values added since the last.
+    """
+    _path        : pl.Path
+    _fh          : Maybe[io.BufferedWriter]
+    _count       : int
+    _flush_every : int
+    _logged      : dict[tuple[str, str], tuple[list, int]]
+
+    def __init__(self, path:Maybe[pl.Path]=None, *, append:bool=False, flush_every:Maybe[int]=None) -> None:
+        self._path         = path or default_path()
+        self._fh           = None
+        self._count        = 0
+        self._flush_every  = flush_every or FLUSH_EVERY
+        self._logged       = {}
+        if not append and self._path.exists():
+            self._path.unlink()
+
+    @property
+    def path(self) -> pl.Path:
+        return self._path
+
+    def success(self, key:str, state:Maybe[dict]=None) -> None:
+        """ Log a successful task by its instance_key, with the state a resumed run restores it with.
+        If the state can't be pickled, the task is logged without it, and will be re-run
+        """
+        try:
+            data = pickle.dumps((SUCCESS_R, key, state))
+        except Exception as err:  # noqa: BLE001
+            logging.info("Task State can't be checkpointed: %s : %s", key, err)
+            data = pickle.dumps((SUCCESS_R, key, None))
+
+        self._write(data)
+
+    def done(self, key:str) -> None:
+        self._append((DONE_R, key))
+
+    def expansion(self, key:str, specs:list) -> bool:
+        """ Log the specs a job, by its instance_key, expanded into. Returns False if they can't be pickled """
+        try:
+            data = pickle.dumps((EXPAND_R, key, list(specs)))
+        except Exception as err:  # noqa: BLE001
+            logging.info("Job Expansion can't be checkpointed: %s : %s", key, err)
+            return False
+        else:
+            self._write(data)
+            return True
+
+    def flush(self) -> None:
+        if self._fh is None:
+            return
+        for record in self._postbox_changes():
+            try:
+                self._fh.write(pickle.dumps(record))
+            except Exception as err:  # noqa: BLE001
+                logging.info("Postbox can't be checkpointed: %s : %s", record[1:3], err)
+        self._fh.flush()
+        self._count = 0
+
+    def _postbox_changes(self) -> list[tuple]:
+        """ Records of the values added to each subbox since the last flush.
+        A subbox which was replaced, or has vanished, is logged again from the start.
+        """
+        changes  : list[tuple]  = []
+        seen     : set          = set()
+        for box, subs in _DootPostBox.boxes.items():
+            for sub, vals in subs.items():
+                key = (box, sub)
+                seen.add(key)
+                match self._logged.get(key, None):
+                    case (list() as logged, int() as count) if logged is vals and count == len(vals):
+                        continue
+                    case (list() as logged, int() as count) if logged is vals and count < len(vals):
+                        start = count
+                    case _:
+                        start = 0
+                changes.append((POSTBOX_R, box, sub, start, vals[start:]))
+                self._logged[key] = (vals, len(vals))
+        else:
+            for key in self._logged.keys() - seen:
+                del self._logged[key]
+                changes.append((POSTBOX_R, *key, 0, []))
+            return changes
+
+    def close(self) -> None:
+        if self._fh is None:
+            return
+        self.flush()
+        self._fh.close()
+        self._fh = None
+
+    def _append(self, record:tuple) -> None:
+        self._write(pickle.dumps(record))
+
+    def _write(self, data:bytes) -> None:
+        if self._fh is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = self._path.open("ab")
+        self._fh.write(data)
+        self._count += 1
+        if self._flush_every <= self._count:
+            self.flush()
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+A table driven alternative to TaskMachine, for very large task graphs.
+
+Rather than a python-statemachine instance per task,
+a single TaskEngine holds every task's state in a compact array, indexed by task id,
+and progresses them using transition, condition, and callback tables
+which are compiled once per model class.
+
+The transitions and callback names are the same as TaskMachine's,
+so FSMTask's can be used with either.
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import datetime
+import enum
+import functools as ftz
+import inspect
+import itertools as itz
+import logging as logmod
+import pathlib as pl
+import re
+import time
+import types
+from array import array
+from uuid import UUID, uuid1
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+import doot
+import doot.errors
+from doot.workflow._interface import TaskStatus_e
+
+# ##-- end 3rd party imports
+
+from . import _interface as API # noqa: N812
+from .errors import FSMHalt, FSMSkip, FSMTransitionError
+from .machines import BASE_BREAK_STATES
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType, Never
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from doot.control.tracker._interface import WorkflowTracker_p
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+    type Transition = tuple[int, bool, Maybe[_Compiled]]
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+_S                                                  = TaskStatus_e
+STATES          : Final[tuple[TaskStatus_e, ...]]   = tuple(TaskStatus_e)
+STATE_IDX       : Final[dict[TaskStatus_e, int]]    = {x:i for i,x in enumerate(STATES)}
+
+# event -> [(sources, target, condition, internal)]
+# Mirrors the events of machines.TaskMachine
+TRANSITIONS     : Final[dict[str, list[tuple[tuple[TaskStatus_e, ...], TaskStatus_e, Maybe[str], bool]]]] = {
+    "setup" : [
+        ((_S.NAMED,), _S.DEAD, "spec_missing", False),
+        ((_S.DECLARED, _S.DEFINED, _S.INIT), _S.DISABLED, "should_disable", False),
+        ((_S.NAMED,), _S.DECLARED, None, False),
+        ((_S.DECLARED,), _S.DEFINED, None, False),
+        ((_S.DEFINED,), _S.INIT, None, False),
+    ],
+    "prepare" : [
+        ((_S.INIT,), _S.WAIT, None, False),
+        ((_S.WAIT,), _S.HALTED, "should_timeout", False),
+        ((_S.WAIT,), _S.WAIT, "should_wait", True),
+        ((_S.WAIT,), _S.READY, None, False),
+    ],
+    "run" : [
+        ((_S.READY,), _S.SKIPPED, "should_skip", False),
+        ((_S.READY,), _S.RUNNING, None, False),
+        ((_S.RUNNING,), _S.FAILED, "should_fail", False),
+        ((_S.RUNNING,), _S.HALTED, "should_halt", False),
+        ((_S.RUNNING,), _S.SUCCESS, None, False),
+    ],
+    "finish" : [
+        ((_S.SUCCESS, _S.FAILED, _S.HALTED, _S.SKIPPED), _S.TEARDOWN, None, False),
+        ((_S.TEARDOWN,), _S.TEARDOWN, "state_is_needed", True),
+        ((_S.TEARDOWN, _S.DISABLED), _S.DEAD, None, False),
+    ],
+    "skip" : [((_S.RUNNING,), _S.SKIPPED, None, False)],
+    "halt" : [((_S.RUNNING,), _S.HALTED, None, False)],
+    "fail" : [((_S.RUNNING,), _S.FAILED, None, False)],
+    "cancel" : [((_S.INIT, _S.WAIT), _S.HALTED, None, False)],
+}
+TRANSITIONS["progress"] = [*TRANSITIONS["setup"], *TRANSITIONS["prepare"], *TRANSITIONS["run"], *TRANSITIONS["finish"]]
+
+##--|
+
+class EngineState:
+    """ A shared, read only, stand in for a statemachine.State.
+    Passed to callbacks as 'source', 'target', and 'state'
+    """
+    __slots__ = ("id", "name", "value")
+    value : TaskStatus_e
+    name  : str
+    id    : str
+
+    def __init__(self, value:TaskStatus_e) -> None:
+        self.value  = value
+        self.name   = value.name
+        self.id     = value.name
+
+    @override
+    def __repr__(self) -> str:
+        return f"<EngineState: {self.name}>"
+
+STATE_REFS : Final[tuple[EngineState, ...]] = tuple(EngineState(x) for x in STATES)
+
+class _Compiled:
+    """ A model method, with the kwargs it accepts precomputed """
+    __slots__ = ("fn", "names", "var_kw")
+    fn      : Callable
+    names   : tuple[str, ...]
+    var_kw  : bool
+
+    def __init__(self, fn:Callable) -> None:
+        params       = list(inspect.signature(fn).parameters.values())[1:]
+        self.fn      = fn
+        self.var_kw  = any(x.kind is inspect.Parameter.VAR_KEYWORD for x in params)
+        self.names   = tuple(x.name for x in params if x.kind not in {inspect.Parameter.VAR_KEYWORD, inspect.Parameter.VAR_POSITIONAL})
+
+    def __call__(self, model:Any, kwargs:dict) -> Any:
+        if self.var_kw:
+            return self.fn(model, **kwargs)
+        return self.fn(model, **{x:kwargs[x] for x in self.names if x in kwargs})
+
+class _Table:
+    """ The transitions and callbacks of a model class,
+    indexed by event and state index
+    """
+    __slots__ = ("enters", "events", "exits")
+    events  : dict[str, tuple[tuple[Transition, ...], ...]]
+    exits   : tuple[tuple[_Compiled, ...], ...]
+    enters  : tuple[tuple[_Compiled, ...], ...]
+
+    def __init__(self, cls:type) -> None:
+        conds : dict[str, _Compiled] = {}
+        self.events = {}
+        for event, transitions in TRANSITIONS.items():
+            by_state : list[list[Transition]] = [[] for _ in STATES]
+            for sources, target, cond, internal in transitions:
+                match cond:
+                    case None:
+                        compiled = None
+                    case str() if cond in conds:
+                        compiled = conds[cond]
+                    case str():
+                        compiled = conds[cond] = self._compile(cls, cond, required=True)
+                for source in sources:
+                    by_state[STATE_IDX[source]].append((STATE_IDX[target], internal, compiled))
+            else:
+                self.events[event] = tuple(tuple(x) for x in by_state)
+
+        self.exits   = tuple(self._callbacks(cls, "on_exit_state", f"on_exit_{x.name}") for x in STATES)
+        self.enters  = tuple(self._callbacks(cls, "on_enter_state", f"on_enter_{x.name}") for x in STATES)
+
+    def _callbacks(self, cls:type, *names:str) -> tuple[_Compiled, ...]:
+        return tuple(x for x in (self._compile(cls, name) for name in names) if x is not None)
+
+    def _compile(self, cls:type, name:str, *, required:bool=False) -> Maybe[_Compiled]:
+        match getattr(cls, name, None):
+            case None if required:
+                msg = "A TaskEngine model is missing a condition"
+                raise TypeError(msg, cls, name)
+            case None:
+                return None
+            case x if callable(x):
+                return _Compiled(x)
+            case x:
+                raise TypeError(type(x), name)
+
+class TaskEngine:
+    """
+    Progresses the states of many task models, using compiled tables.
+
+    Each model added gets an integer id, and its state is one byte in an array.
+    Conditions and callbacks are looked up once per model class, not per task or transition.
+    TaskMachine's per transition logging is not performed.
+    """
+    __slots__ = ("_models", "_status", "_tables")
+    _status  : array
+    _models  : list[Any]
+    _tables  : dict[type, _Table]
+
+    def __init__(self) -> None:
+        self._status  = array("B")
+        self._models  = []
+        self._tables  = {}
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def add(self, model:API.TaskModel_p) -> int:
+        """ Add a model, in the initial NAMED state, returning its id """
+        if not isinstance(model, API.TaskModel_Conditions_p):
+            msg = "To run a TaskEngine, it requires an underlying model which implements dootle.control.fms._interface.TaskModel_Conditions_p"
+            raise TypeError(msg, type(model))
+        tid = len(self._models)
+        self._table(type(model))
+        self._models.append(model)
+        self._status.append(STATE_IDX[TaskStatus_e.NAMED])
+        model.status = TaskStatus_e.NAMED # type: ignore[attr-defined]
+        return tid
+
+    def machine(self, model:API.TaskModel_p) -> EngineMachine:
+        """ Add a model, returning a TaskMachine-like view of it """
+        return EngineMachine(self, self.add(model))
+
+    def model(self, tid:int) -> Any:
+        return self._models[tid]
+
+    def state(self, tid:int) -> TaskStatus_e:
+        return STATES[self._status[tid]]
+
+    def force(self, tid:int, status:TaskStatus_e) -> None:
+        """ Set a task's state, bypassing transitions and callbacks (eg: when resuming) """
+        self._status[tid]           = STATE_IDX[status]
+        self._models[tid].status    = status
+
+    def release(self, tid:int) -> None:
+        """ Drop the engine's reference to a finished task's model.
+        Its id and state byte remain.
+        """
+        self._models[tid] = None
+
+    def send(self, tid:int, event:str, **kwargs:Any) -> None:
+        """ Trigger an event for a task, taking the first transition whose condition passes """
+        model   = self._models[tid]
+        table   = self._table(type(model))
+        source  = self._status[tid]
+        kwargs.update(source=STATE_REFS[source], state=STATE_REFS[source], event=event)
+        for target, internal, cond in table.events[event][source]:
+            kwargs['target'] = STATE_REFS[target]
+            if cond is not None and not cond(model, kwargs):
+                continue
+            if internal:
+                return
+
+            for callback in table.exits[source]:
+                callback(model, kwargs)
+
+            self._status[tid]  = target
+            model.status       = STATES[target]
+            kwargs['state']    = STATE_REFS[target]
+            for callback in table.enters[target]:
+                callback(model, kwargs)
+
+            return
+        else:
+            raise FSMTransitionError("No Transition Allowed", event, STATES[source])
+
+    def run(self, tid:int, *, until:Maybe[TaskStatus_e|Iterable[TaskStatus_e]]=None, **kwargs:Any) -> TaskStatus_e:
+        """ The equivalent of TaskMachine.__call__ """
+        base_states  = set(BASE_BREAK_STATES)
+        match until:
+            case None | []:
+                pass
+            case TaskStatus_e() as x:
+                base_states.add(x)
+            case [*xs]:
+                base_states.update(xs)
+
+        current : Maybe[TaskStatus_e] = None
+        while current not in base_states:
+            try:
+                self.send(tid, "progress", **kwargs)
+            except FSMSkip:
+                self.send(tid, "skip", **kwargs)
+            except FSMHalt:
+                self.send(tid, "halt", **kwargs)
+            except FSMTransitionError:
+                raise
+            except doot.errors.DootError:
+                self.send(tid, "fail", **kwargs)
+
+            current = STATES[self._status[tid]]
+        else:
+            return current
+
+    def _table(self, cls:type) -> _Table:
+        match self._tables.get(cls, None):
+            case None:
+                table = self._tables[cls] = _Table(cls)
+                return table
+            case x:
+                return x
+
+class EngineMachine:
+    """ A view of one task in a TaskEngine, usable in place of a TaskMachine """
+    __slots__ = ("_engine", "tid")
+    _engine  : TaskEngine
+    tid      : int
+
+    def __init__(self, engine:TaskEngine, tid:int) -> None:
+        self._engine  = engine
+        self.tid      = tid
+
+    @override
+    def __repr__(self) -> str:
+        return f"<EngineMachine: {self.tid} : {self.current_state_value.name}>"
+
+    def __call__(self, *, until:Maybe[TaskStatus_e|Iterable[TaskStatus_e]]=None, **kwargs:Any) -> TaskStatus_e:
+        return self._engine.run(self.tid, until=until, **kwargs)
+
+    @property
+    def model(self) -> Any:
+        return self._engine.model(self.tid)
+
+    @property
+    def current_state_value(self) -> TaskStatus_e:
+        return self._engine.state(self.tid)
+
+    @current_state_value.setter
+    def current_state_value(self, value:TaskStatus_e) -> None:
+        self._engine.force(self.tid, value)
+
+    def run_until_init(self, tracker:WorkflowTracker_p, **kwargs:Any) -> None:
+        self(until=[TaskStatus_e.INIT], tracker=tracker, **kwargs)
+
+    def run_until_ready(self, tracker:WorkflowTracker_p, **kwargs:Any) -> None:
+        targets = [TaskStatus_e.READY,
+                   TaskStatus_e.WAIT,
+                   TaskStatus_e.TEARDOWN,
+                   ]
+        self(until=targets, tracker=tracker, **kwargs)
+
+    def run_until_dead(self, tracker:WorkflowTracker_p, **kwargs:Any) -> None:
+        self(tracker=tracker, **kwargs)
+
+    ##--| events
+
+    def progress(self, **kwargs:Any) -> None:
+        self._engine.send(self.tid, "progress", **kwargs)
+
+    def setup(self, **kwargs:Any) -> None:
+        self._engine.send(self.tid, "setup", **kwargs)
+
+    def prepare(self, **kwargs:Any) -> None:
+        self._engine.send(self.tid, "prepare", **kwargs)
+
+    def run(self, **kwargs:Any) -> None:
+        self._engine.send(self.tid, "run", **kwargs)
+
+    def finish(self, **kwargs:Any) -> None:
+        self._engine.send(self.tid, "finish", **kwargs)
+
+    def skip(self, **kwargs:Any) -> None:
+        self._engine.send(self.tid, "skip", **kwargs)
+
+    def halt(self, **kwargs:Any) -> None:
+        self._engine.send(self.tid, "halt", **kwargs)
+
+    def fail(self, **kwargs:Any) -> None:
+        self._engine.send(self.tid, "fail", **kwargs)
+
+    def cancel(self, **kwargs:Any) -> None:
+        self._engine.send(self.tid, "cancel", **kwargs)
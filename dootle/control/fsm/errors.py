@@ -7,7 +7,7 @@ from __future__ import annotations
 # Import:
 from typing import Final
 from jgdv.debugging import TraceBuilder
-from doot.errors import DootError
+from doot.errors import DootError, TrackingError
 
 ##--| Error Messages
 
@@ -19,3 +19,11 @@ class FSMSkip(DootError):
 
 class FSMHalt(DootError):
     pass
+
+class FSMDeadlock(TrackingError):
+    """ Tasks are blocked, but nothing that could release them is running or queued """
+    pass
+
+class FSMTransitionError(DootError):
+    """ No transition of an event is allowed from the current state """
+    pass
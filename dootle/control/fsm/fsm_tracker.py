@@ -13,6 +13,7 @@ from __future__ import annotations
 import datetime
 import enum
 import functools as ftz
+import heapq
 import itertools as itz
 import logging as logmod
 import pathlib as pl
@@ -44,9 +45,22 @@ from jgdv.structs.locator._interface import LocationMeta_e
 
 # ##-- end 3rd party imports
 
+from doot.control.tracker import _interface as TrAPI # noqa: N812
 from . import _interface as API  # noqa: N812
 from .machines import TaskMachine
+from .engine import EngineMachine, TaskEngine
 from .factory import FSMFactory
+from .scheduling import _CriticalPath_m
+from .adjacency import AdjacencyIndex
+from .timings import StateTimes
+from .waits import WaitTimes
+from .trace import TraceWriter
+from .observe import HOOKS
+from .metrics import MetricsExporter
+from .errors import FSMDeadlock
+from .history import RUN_PHASE, TEARDOWN_PHASE, DurationHistory
+from .checkpoint import DONE_R, SUCCESS_R, Checkpoint, TransitionLog, default_path, instance_key
+from .state import StateOverlay
 
 # ##-- types
 # isort: off
@@ -69,6 +83,7 @@ if TYPE_CHECKING:
    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
 
    import networkx as nx
+   from .observe import Subscription
    type Abstract[T]  = T
    type Concrete[T]  = T
    type Priority     = int
@@ -81,83 +96,634 @@ if TYPE_CHECKING:
 logging    = logmod.getLogger(__name__)
 ##-- end logging
 
+# Vars:
+# The settings.commands.run key of each TrackerFlags_d field, where it isn't the field's name
+FLAG_SETTINGS   : Final[dict[str, str]]           = {"engine": "table_engine"}
+# States a task downstream of a failure can be cancelled from
+CANCEL_STATES   : Final[frozenset[TaskStatus_e]]  = frozenset([TaskStatus_e.INIT, TaskStatus_e.WAIT])
+OUTCOME_STATES  : Final[frozenset[TaskStatus_e]]  = frozenset([
+    TaskStatus_e.SUCCESS, TaskStatus_e.FAILED, TaskStatus_e.HALTED, TaskStatus_e.SKIPPED, TaskStatus_e.DISABLED,
+])
+READY_STATES    : Final[frozenset[TaskStatus_e]]  = frozenset([
+    TaskStatus_e.READY, TaskStatus_e.RUNNING, TaskStatus_e.TEARDOWN,
+])
+# States after which a task no longer blocks its successors from being checked
+SETTLED_STATES  : Final[frozenset[TaskStatus_e]]  = frozenset([
+    *TrAPI.SUCCESS_STATUSES, TaskStatus_e.FAILED, TaskStatus_e.HALTED, TaskStatus_e.DEAD,
+])
 ##--|
 
-@Proto(WorkflowTracker_p)
-class FSMTracker(Tracker_abs):
+def configured_flags() -> API.TrackerFlags_d:
+    """ The tracker features enabled in settings.commands.run """
+    run = doot.config.on_fail(False).commands.run # noqa: FBT003
+    return API.TrackerFlags_d(*(bool(getattr(run, FLAG_SETTINGS.get(x, x))()) for x in API.TrackerFlags_d._fields))
+
+##--|
+
+@Proto(WorkflowTracker_p, API.StateListener_p)
+class FSMTracker(_CriticalPath_m, Tracker_abs):
     """
     Tracks tasks by their FSM state
 
+    Rather than re-checking waiting tasks until their dependencies finish,
+    each waiting task has a count of its unsettled dependencies.
+    As dependencies settle (see SETTLED_STATES), they notify the tracker,
+    and once a task's count reaches zero it is queued to be checked again.
+    Tasks in TEARDOWN whose state is still needed by injection targets are parked in '_parked',
+    separately from blocked tasks, until those targets settle.
+    READY tasks are held in a heap, ordered by priority.
+
+    The time each task spent in each state is summed into 'state_times' as it dies,
+    see StateTimes.report.
+
+    The time each blocked task waited is charged to the dependency that released it,
+    and recorded in 'wait_times'. see WaitTimes.report.
+
+    If tasks are still blocked once nothing is queued or READY,
+    and none of what they wait on is running, next_for raises FSMDeadlock,
+    naming the cycle of waiting tasks, or the dependencies nothing will progress.
+
+    When a task FAILS or HALTS, everything downstream of it that hasn't run
+    is cancelled (HALTED), and torn down, in one traversal on the next call of next_for,
+    rather than each waiting task timing out separately.
+
+    Optional features are enabled by their kwarg,
+    or else by the setting of the same name in settings.commands.run (see configured_flags).
+    Kwargs which take a path or an instance enable their feature with it:
+
+    - engine (setting: table_engine) : progress tasks with a shared TaskEngine, rather than a TaskMachine per task.
+    - critical_path : order READY tasks by their longest weighted path to a sink, rather than by priority.
+      see _CriticalPath_m.
+    - history : record task durations in a DurationHistory, which also provides the critical path's durations.
+    - checkpoint=True|path : append completed tasks, job expansions and the postbox to a TransitionLog.
+      Pass resume=True|path (or the run command's --resume arg) to restore from one.
+      Tasks are matched to the log by checkpoint.instance_key:
+      tasks that finished are set to DEAD without running,
+      tasks that succeeded but weren't torn down are set to TEARDOWN, with the state their actions wrote,
+      and finished jobs re-queue their logged expansion rather than running again.
+    - reclaim : drop DEAD tasks and their machines, once no successor or injection target can still use them.
+      They are replaced with a Tombstone_d in 'tombstones', which get_status still answers from.
+    - trace=True|path : write a Chrome trace of task lifetimes, see trace.TraceWriter.
+      'clear' unsubscribes the writer and closes the trace.
+    - metrics=True|path : periodically write a Prometheus textfile of run progress from a background thread,
+      see metrics.MetricsExporter.
+    - adjacency : answer dependency and successor queries from an AdjacencyIndex
+      (integer ids, CSR arrays, and a status array kept current by notify_state),
+      instead of the networkx graph and get_status. The index is built by 'build', and extended by 'insert_subgraph'.
+      The graph is kept, so the index adds to the tracker's memory.
+    - wait_report : log WaitTimes.report as the tracker is cleared.
+
     TODO modify default ctor's of specs to be FSMTask on register
 
     """
-    machines : dict[TaskName|TaskName_p, TaskMachine]
+    machines     : dict[TaskName|TaskName_p, TaskMachine|EngineMachine]
+    engine       : Maybe[TaskEngine]
+    history      : Maybe[DurationHistory]
+    checkpoint   : Maybe[TransitionLog]
+    _resume      : Maybe[Checkpoint]
+    _resumed     : list[tuple[TaskName_p, list]]
+    _succeeded   : dict[TaskName_p, str]
+    reclaim      : bool
+    wait_report  : bool
+    tombstones   : dict[TaskName_p, API.Tombstone_d]
+    _dead        : list[TaskName_p]
+    _unreclaimed : set[TaskName_p]
+    _halting     : list[TaskName_p]
+    state_times  : StateTimes
+    wait_times   : WaitTimes
+    _blocked_at  : dict[TaskName_p, int]
+    trace        : Maybe[TraceWriter]
+    _trace_sub   : Maybe[Subscription]
+    metrics      : Maybe[MetricsExporter]
+    adjacency    : Maybe[AdjacencyIndex]
+    _pending     : dict[TaskName_p, int]
+    _blocked_by  : defaultdict[TaskName_p, set[TaskName_p]]
+    _parked      : dict[TaskName_p, set[TaskName_p]]
+    _parked_on   : defaultdict[TaskName_p, set[TaskName_p]]
+    _ready       : list[tuple[float, int, TaskName_p]]
+    _ready_set   : set[TaskName_p]
+    _ready_count : Iterator[int]
 
-    def __init__(self, **kwargs:Any) -> None:
+    def __init__(self, *, engine:Maybe[bool|TaskEngine]=None, critical_path:Maybe[bool]=None, durations:Maybe[Mapping[str, float]]=None, history:Maybe[bool|DurationHistory]=None, checkpoint:Maybe[bool|pl.Path|TransitionLog]=None, resume:Maybe[bool|str|pl.Path]=None, reclaim:Maybe[bool]=None, adjacency:Maybe[bool]=None, trace:Maybe[bool|pl.Path|TraceWriter]=None, metrics:Maybe[bool|pl.Path|MetricsExporter]=None, wait_report:Maybe[bool]=None, **kwargs:Any) -> None:  # noqa: PLR0913
+        flags = configured_flags()
         kwargs.setdefault("factory", FSMFactory)
         super().__init__(**kwargs)
-        self.machines = {}
+        self.machines       = {}
+        self.critical_path  = flags.critical_path if critical_path is None else critical_path
+        match history:
+            case DurationHistory():
+                self.history = history
+            case None if flags.history:
+                self.history = DurationHistory()
+            case True:
+                self.history = DurationHistory()
+            case _:
+                self.history = None
+        self._resumed      = []
+        self._succeeded    = {}
+        self.reclaim       = flags.reclaim if reclaim is None else reclaim
+        self.wait_report   = flags.wait_report if wait_report is None else wait_report
+        self.tombstones    = {}
+        self._dead         = []
+        self._unreclaimed  = set()
+        self._halting      = []
+        self.state_times   = StateTimes()
+        self.wait_times    = WaitTimes()
+        self._blocked_at   = {}
+        match trace:
+            case TraceWriter():
+                self.trace = trace
+            case pl.Path():
+                self.trace = TraceWriter(trace)
+            case None if flags.trace:
+                self.trace = TraceWriter()
+            case True:
+                self.trace = TraceWriter()
+            case _:
+                self.trace = None
+        self._trace_sub = None
+        if self.trace is not None:
+            self._trace_sub = self.trace.attach()
+        match metrics:
+            case MetricsExporter():
+                self.metrics = metrics
+            case pl.Path():
+                self.metrics = MetricsExporter(metrics)
+            case None if flags.metrics:
+                self.metrics = MetricsExporter()
+            case True:
+                self.metrics = MetricsExporter()
+            case _:
+                self.metrics = None
+        if self.metrics is not None:
+            self.metrics.attach(self)
+        self.adjacency     = AdjacencyIndex() if (flags.adjacency if adjacency is None else adjacency) else None
+        self._init_checkpoint(checkpoint, resume, default=flags.checkpoint)
+        match durations:
+            case None if self.critical_path and self.history is not None:
+                self.durations = self.history.durations()
+            case None:
+                self.durations = {}
+            case x:
+                self.durations = x
+        self._ranks         = {}
+        match engine:
+            case TaskEngine():
+                self.engine = engine
+            case None if flags.engine:
+                self.engine = TaskEngine()
+            case True:
+                self.engine = TaskEngine()
+            case _:
+                self.engine = None
+        self._pending      = {}
+        self._blocked_by   = defaultdict(set)
+        self._parked       = {}
+        self._parked_on    = defaultdict(set)
+        self._ready        = []
+        self._ready_set    = set()
+        self._ready_count  = itz.count()
         # Update the aliases so the default ctor for tasks is an FSMTask
         doot.update_aliases(data=API.ALIASES_UPDATE)
 
+    def __bool__(self) -> bool:
+        # Blocked tasks keep the tracker going, so a stall is reported by next_for rather than ending the run
+        return bool(self._queue) or bool(self._ready_set) or bool(self._pending) or bool(self._parked)
+
     ##--| main logic
 
     def next_for(self, target:Maybe[str|TaskName]=None) -> Maybe[Task_p|TaskArtifact]:
         """ ask for the next task that can be performed
 
             Returns a Task or Artifact that needs to be executed or created
-            Returns None if it loops too many times trying to find a target,
-            or if theres nothing left in the queue
+            Returns None if nothing is ready.
+
+            Queued entries are each routed once,
+            either into the ready heap, or registered against their unsettled dependencies.
+
+        """
+        result  : Maybe[Task_p|TaskArtifact]
+        match self._next(1, target):
+            case [result]:
+                pass
+            case _:
+                result = None
+
+        return result
 
+    def next_batch(self, count:int, *, target:Maybe[str|TaskName]=None) -> list[Task_p|TaskArtifact]:
+        """ Get up to count tasks or artifacts, for filling a number of worker slots.
+
+        Validation, and draining the queue, are done once for the whole batch.
+        Artifacts come first, then tasks in the order next_for would have returned them.
         """
+        return self._next(count, target)
+
+    def _next(self, count:int, target:Maybe[str|TaskName]) -> list[Task_p|TaskArtifact]:
         focus   : TaskName_p|Artifact_i
-        count   : int
-        idx     : int
-        result  : Maybe[TaskMachine|Task_p|TaskArtifact]
-        logging.info("[Next.For] (Active: %s)", len(self._queue.active_set))
+        result  : list[Task_p|TaskArtifact]  = []
         assert(hasattr(self._registry, "specs"))
         if not self.is_valid:
             raise doot.errors.TrackingError("Network is in an invalid state")
 
+        if bool(self._halting):
+            self._halt_downstream()
+
+        if bool(self._dead):
+            self._reclaim_dead()
+
         if target and target not in self._queue.active_set:
             self.queue(target)
 
-        idx, count  = 0, API.MAX_LOOP
-        result = None
-        while (result is None) and bool(self._queue) and 0 < (count:=count-1) and (idx:=idx+1):
+        while bool(self._queue) and len(result) < count:
             focus  = self._queue.deque_entry()
-            logging.debug("[Next.For.%-3s]: %s", idx, focus)
             match focus:
+                case TaskName_p() as x if x in self.tombstones:
+                    continue
                 case TaskName_p() as x if x in self._registry.specs:
-                    # get and run the machine
-                    fsm   = self.machines[x]
-                    match fsm.current_state_value:
-                        case TaskStatus_e.READY | TaskStatus_e.TEARDOWN | TaskStatus_e.RUNNING:
-                            # Ready to be executed, pass to the runner
-                            result = cast("TaskMachine", fsm.model)
-                        case TaskStatus_e.DEAD:
-                            # is dead, nothing to do
-                            pass
-                        case TaskStatus_e.WAIT | TaskStatus_e.INIT:
-                            # not ready to execute yet
-                            fsm.run_until_ready(self) # type: ignore[arg-type]
-                            self.queue(x)
-                        case x:
-                            raise TypeError(type(x), x)
+                    self._route(x)
                 case TaskArtifact() as x:
-                    return x
+                    result.append(x)
                 case _:
                     continue
+
+        while bool(self._resumed):
+            parent, specs = self._resumed.pop()
+            self._insert_subgraph(specs, parent=parent, log=False)
+
+        while len(result) < count:
+            match self._pop_ready():
+                case None:
+                    break
+                case task:
+                    result.append(task)
+
+        if not bool(result) and (bool(self._pending) or bool(self._parked)) and not bool(self._queue):
+            self._check_progress()
+
+        return result
+
+    ##--| progress
+
+    def _check_progress(self) -> None:
+        """ With nothing queued or ready, check something can still release the blocked tasks.
+        One pass over what they are blocked on, and what parked tasks hold their state for:
+        if none of it is running (or ready to),
+        and no other task is running (which could yet queue more), the run can't progress.
+        """
+        stuck   : dict[TaskName_p|Artifact_i, set[TaskName_p]] = {}
+        unused  : dict[TaskName_p, set[TaskName_p]]            = {}
+        for into, holds in [(stuck, self._blocked_by), (unused, self._parked_on)]:
+            for blocker, waiters in holds.items():
+                if not bool(waiters):
+                    continue
+                match self.machines.get(blocker, None):
+                    case fsm if fsm is not None and fsm.current_state_value in READY_STATES and not self._is_held(blocker):
+                        return
+                    case fsm if fsm is not None and self._is_held(blocker):
+                        # Itself blocked or parked, so part of a chain
+                        pass
+                    case _:
+                        # Reclaimed, unbuilt, an artifact, or not blocked yet not queued
+                        into[blocker] = waiters
+
+        if any(fsm.current_state_value in READY_STATES and not self._is_held(x) for x, fsm in self.machines.items()):
+            return
+
+        found = self._find_wait_cycle()
+        lines = [f"[Deadlock] No task can progress, {len(self._pending)} are blocked, {len(self._parked)} are parked"]
+        if found is not None:
+            lines.append(f"Wait cycle: {' -> '.join(str(x) for x in found)}")
+        for blocker, waiters in stuck.items():
+            lines.append(f"Nothing progresses {blocker} ({self._describe(blocker)}), needed by: {', '.join(str(x) for x in waiters)}")
+        for target, parked in unused.items():
+            lines.append(f"Nothing progresses {target} ({self._describe(target)}), injected into by: {', '.join(str(x) for x in parked)}")
+
+        for line in lines:
+            logging.error(line)
+        raise FSMDeadlock("\n".join(lines), found, [*stuck, *unused])
+
+    def _is_held(self, name:TaskName_p|Artifact_i) -> bool:
+        """ Whether a task is blocked on its dependencies, or parked on its injection targets """
+        return name in self._pending or name in self._parked
+
+    def _find_wait_cycle(self) -> Maybe[list[TaskName_p]]:
+        """ Iterative DFS over the wait-for graph of blocked tasks (waiter -> what it is blocked on) """
+        waits_on : defaultdict[TaskName_p, list] = defaultdict(list)
+        for blocker, waiters in self._blocked_by.items():
+            for waiter in waiters:
+                waits_on[waiter].append(blocker)
+
+        done : set = set()
+        for source in list(waits_on):
+            if source in done:
+                continue
+            path   : list = [source]
+            onpath : set  = {source}
+            stack  : list = [iter(waits_on[source])]
+            while bool(stack):
+                match next(stack[-1], None):
+                    case None:
+                        stack.pop()
+                        node = path.pop()
+                        onpath.discard(node)
+                        done.add(node)
+                    case x if x in onpath:
+                        return [*path[path.index(x):], x]
+                    case x if x in done or x not in waits_on:
+                        pass
+                    case x:
+                        path.append(x)
+                        onpath.add(x)
+                        stack.append(iter(waits_on[x]))
         else:
-            logging.info("[Next.For] <- %s", result)
-            # wrap the result in an execution FSM
-            return result
+            return None
+
+    def _describe(self, node:TaskName_p|Artifact_i) -> str:
+        match self.machines.get(node, None):
+            case None if node in self.tombstones:
+                return "reclaimed"
+            case None if isinstance(node, TaskName_p) and node in self._registry.specs:
+                return "declared, not built"
+            case None:
+                return "no producer"
+            case fsm:
+                return f"{fsm.current_state_value.name}, not queued"
+
+    def notify_state(self, name:TaskName_p, status:TaskStatus_e) -> None:
+        """ Called by tasks as they enter a state.
+        Settled tasks release the tasks waiting on them.
+        """
+        waiter : TaskName_p
+        if self.adjacency is not None:
+            self.adjacency.set_status(name, status)
+        if self.history is not None:
+            self._record_history(name, status)
+        if self.checkpoint is not None:
+            self._record_checkpoint(name, status)
+        if status is TaskStatus_e.FAILED or status is TaskStatus_e.HALTED:
+            # Halted downstream from next_for
+            self._halting.append(name)
+        if status is TaskStatus_e.DEAD and name in self.machines:
+            self.state_times.add(self.machines[name].model)
+        if self.reclaim and status is TaskStatus_e.DEAD:
+            # Reclaimed from next_for, once the transition has finished
+            self._dead.append(name)
+        if status not in SETTLED_STATES:
+            return
+
+        self._unpark(name)
+        for waiter in self._blocked_by.pop(name, ()):
+            match self._pending.get(waiter, None):
+                case None:
+                    pass
+                case 1:
+                    del self._pending[waiter]
+                    self.wait_times.add(waiter, name, time.monotonic_ns() - self._blocked_at.pop(waiter))
+                    self.queue(waiter)
+                case int() as count:
+                    self._pending[waiter] = count - 1
+
+    def insert_subgraph(self, names:Iterable[TaskName_p|TaskSpec_i|DelayedSpec], *, parent:Maybe[TaskName_p]=None) -> list[TaskName_p]:
+        """ Queue and connect new tasks (eg: from a job expansion),
+        without rebuilding or revalidating the whole network.
+
+        Only the new nodes are expanded.
+        The region of the network they touch is checked for cycles and missing dependencies,
+        and waiting tasks that gained dependencies have their counts updated.
+        """
+        return self._insert_subgraph(names, parent=parent, log=True)
+
+    def _insert_subgraph(self, names:Iterable[TaskName_p|TaskSpec_i|DelayedSpec], *, parent:Maybe[TaskName_p], log:bool) -> list[TaskName_p]:
+        added   : list[TaskName_p]
+        region  : set[TaskName_p|Artifact_i]
+        names   = list(names)
+        if log and parent is not None and self.checkpoint is not None:
+            self.checkpoint.expansion(instance_key(self.machines[parent].model.spec), names)
+
+        added   = [x for x in (self.queue(y, parent=parent) for y in names) if x is not None]
+        if not bool(added):
+            return added
+
+        self._network.build_network(sources=added)
+        region = self._affected_region(added)
+        self._validate_region(region)
+        if self.adjacency is not None:
+            self._index_network(region)
+        self._block_on_new_edges(region)
+        if self.critical_path and not self._update_ranks(region).isdisjoint(self._ready_set):
+            # READY tasks were pushed with their old ranks
+            self._rekey_ready()
+        return added
+
+    def _init_checkpoint(self, checkpoint:Maybe[bool|pl.Path|TransitionLog], resume:Maybe[bool|str|pl.Path], *, default:bool) -> None:
+        path : Maybe[pl.Path] = None
+        if resume is None:
+            resume = doot.args.on_fail(None).cmd.args.resume()
+        match resume:
+            case None | False:
+                self._resume = None
+            case True:
+                path          = default_path()
+                self._resume  = Checkpoint.read(path)
+            case str() | pl.Path():
+                path          = pl.Path(resume)
+                self._resume  = Checkpoint.read(path)
+            case x:
+                raise TypeError(type(x))
+
+        resuming = self._resume is not None
+        match checkpoint:
+            case TransitionLog():
+                self.checkpoint = checkpoint
+            case pl.Path():
+                self.checkpoint = TransitionLog(checkpoint, append=resuming)
+            case True:
+                self.checkpoint = TransitionLog(path, append=resuming)
+            case None if default or resuming:
+                self.checkpoint = TransitionLog(path, append=resuming)
+            case _:
+                self.checkpoint = None
+
+        if self._resume is not None:
+            self._resume.restore_postbox()
+
+    def _record_checkpoint(self, name:TaskName_p, status:TaskStatus_e) -> None:
+        assert(self.checkpoint is not None)
+        match status:
+            case TaskStatus_e.SUCCESS:
+                key = self._succeeded[name] = instance_key(self.machines[name].model.spec)
+                self.checkpoint.success(key, state=self._written_state(name))
+            case TaskStatus_e.DEAD if name in self._succeeded:
+                self.checkpoint.done(self._succeeded.pop(name))
+            case _:
+                pass
+
+    def _written_state(self, name:TaskName_p) -> Maybe[dict]:
+        """ What a task's actions added to its state, for a resumed run to restore """
+        match getattr(self.machines[name].model, "_internal_state", None):
+            case StateOverlay() as state:
+                return state.changes()
+            case _:
+                return None
+
+    def _restore(self, name:TaskName_p, fsm:TaskMachine|EngineMachine) -> None:
+        """ Skip a newly instantiated task, if the resumed checkpoint says it completed.
+        A task which succeeded, but wasn't torn down, gets back the state its actions wrote,
+        so its successors and injection targets can still read it.
+        """
+        assert(self._resume is not None)
+        task        = fsm.model
+        key         = instance_key(task.spec)
+        is_job      = TaskMeta_e.JOB in task.spec.meta
+        expansions  = self._resume.expansions.get(key, [])
+        if is_job and not bool(expansions):
+            # Can't skip a job whose expansion wasn't logged
+            return
+
+        match self._resume.consume(key):
+            case x, _ if x == DONE_R:
+                fsm.current_state_value = TaskStatus_e.DEAD
+            case x, dict() as state if x == SUCCESS_R:
+                task._internal_state.update(state)
+                fsm.current_state_value = TaskStatus_e.TEARDOWN
+                # So its teardown is logged
+                self._succeeded[name] = key
+            case _:
+                return
+
+        logging.info("[Resume] Skipping: %s", name)
+        if self.adjacency is not None:
+            self.adjacency.set_status(name, fsm.current_state_value)
+        if is_job:
+            self._resumed.append((name, expansions.pop(0)))
+
+    def _halt_downstream(self) -> None:
+        """ Cancel everything reachable from failed or halted tasks, in one traversal.
+        Cancelled tasks without cleanup actions are then torn down,
+        others are left to the runner (which may need to await them), or parked until their state is no longer needed.
+        """
+        cancelled  : list[TaskName_p]  = []
+        queue      : list              = self._halting[:]
+        seen       : set               = set(queue)
+        self._halting.clear()
+        while bool(queue):
+            for succ in self._successors_of(queue.pop()):
+                if succ in seen or succ == self._root_node:
+                    continue
+                seen.add(succ)
+                queue.append(succ)
+                match self.machines.get(succ, None):
+                    case None:
+                        pass
+                    case fsm if fsm.current_state_value in CANCEL_STATES:
+                        fsm.cancel(tracker=self)
+                        cancelled.append(succ)
+                    case _:
+                        pass
+
+        logging.info("[Halt] Cancelled %s downstream tasks", len(cancelled))
+        for name in cancelled:
+            self._pending.pop(name, None)
+            self._blocked_at.pop(name, None)
+            fsm = self.machines[name]
+            fsm(tracker=self)
+            if fsm.current_state_value is TaskStatus_e.TEARDOWN and not bool(fsm.model.get_action_group(API.CLEANUP_GROUP)):
+                fsm(tracker=self)
+            if fsm.current_state_value is TaskStatus_e.TEARDOWN:
+                self._route(name)
+        else:
+            # Cancelled tasks have already been traversed
+            self._halting = [x for x in self._halting if x not in seen]
+
+    def _reclaim_dead(self) -> None:
+        """ Reclaim dead tasks that nothing else can use.
+        Reclaiming a task may free the dead tasks it depends on, so they are re-checked.
+        """
+        while bool(self._dead):
+            name = self._dead.pop()
+            if name not in self.machines:
+                continue
+            if not self._reclaimable(name):
+                self._unreclaimed.add(name)
+                continue
+
+            self._reclaim(name)
+            for pred in self._network.pred[name]:
+                if pred in self._unreclaimed:
+                    self._unreclaimed.remove(pred)
+                    self._dead.append(pred)
+
+    def _reclaimable(self, name:TaskName_p) -> bool:
+        """ A dead task is reclaimable once it has no pending injection targets,
+        and all its successor tasks are dead (so won't read its state)
+        """
+        if self.injections_pending(name):
+            return False
+
+        for succ in self._network.succ[name]:
+            match succ:
+                case TaskName_p() if succ == self._root_node:
+                    pass
+                case TaskName_p() if self.get_status(target=succ)[0] is not TaskStatus_e.DEAD:
+                    return False
+                case _:
+                    pass
+        else:
+            return True
+
+    def _reclaim(self, name:TaskName_p) -> None:
+        """ Replace a task and its machine with a tombstone.
+
+        The task's spec entry and network node are kept:
+        the node holds the edges that _reclaim_dead and _reclaimable walk for the task's neighbours,
+        and the spec entry is what the registry resolves the concrete name of later dependents through.
+        Only the task instance they refer to is dropped.
+        """
+        fsm       = self.machines.pop(name)
+        task      = fsm.model
+        outcome   = next((x for x in reversed(getattr(task, "_state_history", [])) if x in OUTCOME_STATES), None)
+        durations = tuple(task.state_durations()) if hasattr(task, "state_durations") else ()
+        cpu_ns    = sum(cpu for _, cpu in getattr(task, "_timings", {}).values())
+        self.tombstones[name] = API.Tombstone_d(name, fsm.current_state_value, outcome, task.priority, durations, cpu_ns)
+        self._ranks.pop(name, None)
+        match fsm:
+            case EngineMachine():
+                fsm._engine.release(fsm.tid)
+            case _:
+                pass
+
+        match self._registry.specs.get(name, None):
+            case TrAPI.SpecMeta_d() as meta:
+                meta.task = None
+            case _:
+                pass
+
+    def _record_history(self, name:TaskName_p, status:TaskStatus_e) -> None:
+        """ Time tasks into and out of RUNNING and TEARDOWN """
+        assert(self.history is not None)
+        timings : dict
+        match status:
+            case TaskStatus_e.RUNNING:
+                self.history.start(name, RUN_PHASE)
+            case TaskStatus_e.TEARDOWN:
+                self.history.start(name, TEARDOWN_PHASE)
+            case TaskStatus_e.SUCCESS | TaskStatus_e.FAILED | TaskStatus_e.HALTED | TaskStatus_e.SKIPPED:
+                timings = getattr(self.machines[name].model, "_timings", {})
+                self.history.stop(name, RUN_PHASE, status, precomputed=timings.get(TaskStatus_e.READY, None))
+                if 0 < (grown:=getattr(self.machines[name].model, "_mem_grow", 0)):
+                    self.history.record_memory(name, grown)
+            case TaskStatus_e.DEAD if name in self.machines:
+                timings = getattr(self.machines[name].model, "_timings", {})
+                self.history.stop(name, TEARDOWN_PHASE, status, precomputed=timings.get(TaskStatus_e.TEARDOWN, None))
+            case _:
+                pass
 
     @override
     def queue(self, name:str|TaskName_p|TaskSpec_i|Artifact_i, *, from_user:bool=False, status:Maybe[TaskStatus_e]=None, **kwargs:Any) -> Maybe[Concrete[TaskName_p|Artifact_i]]: # type: ignore[override]
         queued : TaskName_p
         match super().queue(name, from_user=from_user, status=status):
-            case TaskName_p() as queued if queued not in self.machines:
+            case TaskName_p() as queued if queued not in self.machines and queued not in self.tombstones:
                 logging.debug("[Next.For] Queue run")
                 # instantiate FSM task
                 self._instantiate(queued, task=True)
@@ -176,9 +742,11 @@ class FSMTracker(Tracker_abs):
         match super()._instantiate(target, *args, task=task, **kwargs):
             case TaskName_p() as result if task and result not in self.machines:
                 task_inst              = self._registry.specs[result].task
-                fsm                    = TaskMachine(task_inst)
+                fsm                    = self._machine_for(task_inst)
                 self.machines[result]  = fsm
                 fsm.run_until_init(self) # type: ignore[arg-type]
+                if self._resume is not None:
+                    self._restore(result, fsm)
                 return result
             case TaskName_p() as result:
                 return result
@@ -187,25 +755,308 @@ class FSMTracker(Tracker_abs):
             case x:
                 raise TypeError(type(x))
 
+    @override
+    def build(self, *args:Any, **kwargs:Any) -> None:
+        super().build(*args, **kwargs)
+        if self.adjacency is not None:
+            self._index_network(self._network.nodes)
+
+    @override
+    def clear(self, *args:Any, **kwargs:Any) -> None:
+        if self.metrics is not None:
+            # Stop the writer thread, with a final write, before the machines are cleared
+            self.metrics.close()
+        if self.wait_report and bool(self.wait_times):
+            for line in self.wait_times.report():
+                logging.info(line)
+        super().clear(*args, **kwargs)
+        self._pending.clear()
+        self._blocked_by.clear()
+        self._blocked_at.clear()
+        self._parked.clear()
+        self._parked_on.clear()
+        self._ready.clear()
+        self._ready_set.clear()
+        self._ranks.clear()
+        if self.history is not None:
+            self.history.flush()
+        if self.checkpoint is not None:
+            self.checkpoint.flush()
+        if self._trace_sub is not None:
+            HOOKS.unsubscribe(self._trace_sub)
+            self._trace_sub = None
+        if self.trace is not None:
+            self.trace.close()
+        self.tombstones.clear()
+        self._dead.clear()
+        self._unreclaimed.clear()
+        self._halting.clear()
+        if self.adjacency is not None:
+            self.adjacency = AdjacencyIndex()
+
+    ##--| ready queue
+
+    def _route(self, name:TaskName_p) -> None:
+        """ Move a dequeued task towards the ready heap, or register what it waits on """
+        fsm = self.machines[name]
+        match fsm.current_state_value:
+            case TaskStatus_e.DEAD:
+                # is dead, nothing to do
+                pass
+            case TaskStatus_e.WAIT | TaskStatus_e.INIT | TaskStatus_e.TEARDOWN if name in self._pending:
+                # Still blocked, will be queued again when released
+                pass
+            case TaskStatus_e.TEARDOWN if name in self._parked:
+                # Still needed, will be queued again when its targets settle
+                pass
+            case TaskStatus_e.TEARDOWN if self._park(name):
+                pass
+            case x if x in READY_STATES:
+                self._push_ready(name)
+            case TaskStatus_e.INIT:
+                fsm.run_until_ready(self) # type: ignore[arg-type]
+                self._route(name)
+            case TaskStatus_e.WAIT if 0 < self._block_on_dependencies(name):
+                pass
+            case TaskStatus_e.WAIT:
+                fsm.run_until_ready(self) # type: ignore[arg-type]
+                match fsm.current_state_value:
+                    case TaskStatus_e.WAIT:
+                        # Dependencies settled without succeeding, count down to a timeout
+                        self.queue(name)
+                    case _:
+                        self._route(name)
+            case x:
+                raise TypeError(type(x), x)
+
+    def _block_on_dependencies(self, name:TaskName_p) -> int:
+        """ Count the unsettled dependencies of a task, queuing them,
+        and registering the task to be released when they settle
+        """
+        count : int = 0
+        for dep, dep_state in self._dependency_states_of(name):
+            if dep_state in SETTLED_STATES:
+                continue
+            self.queue(dep)
+            if self.get_status(target=dep)[0] in SETTLED_STATES:
+                continue
+
+            self._blocked_by[dep].add(name)
+            count += 1
+        else:
+            if bool(count):
+                self._pending[name]     = count
+                self._blocked_at[name]  = time.monotonic_ns()
+            return count
+
+    def _park(self, name:TaskName_p) -> bool:
+        """ Park a torn down task on the injection targets which still need its state,
+        rather than cycling it through the runner until they have used it.
+        Parked tasks aren't blocked: their wait isn't charged to wait_times.
+        """
+        match self._unsettled_targets(name):
+            case set() as targets if bool(targets):
+                pass
+            case _:
+                return False
+
+        self._parked[name] = targets
+        for target in targets:
+            self._parked_on[target].add(name)
+        else:
+            return True
+
+    def _unpark(self, target:TaskName_p) -> None:
+        """ A settled injection target releases the tasks parked on it, once it was their last """
+        for parked in self._parked_on.pop(target, ()):
+            match self._parked.get(parked, None):
+                case None:
+                    pass
+                case targets:
+                    targets.discard(target)
+                    if not bool(targets):
+                        del self._parked[parked]
+                        self.queue(parked)
+
+    def injections_pending(self, name:TaskName_p) -> bool:
+        """ Whether any injection target could still use a task's state.
+        The registry's targets are only removed when the injection is applied,
+        so targets which have settled without applying it are ignored.
+        see FSMTask.state_is_needed
+        """
+        return bool(self._unsettled_targets(name))
+
+    def _unsettled_targets(self, name:TaskName_p) -> set[TaskName_p]:
+        """ A copy of a task's unsettled injection targets. The registry's set is left alone """
+        injs : set
+        match self._registry.specs.get(name, None):
+            case TrAPI.SpecMeta_d(injection_targets=set() as injs) if bool(injs):
+                return {x for x in injs if self.get_status(target=x)[0] not in SETTLED_STATES}
+            case _:
+                return set()
+
+    def _affected_region(self, added:list[TaskName_p]) -> set[TaskName_p|Artifact_i]:
+        """ The nodes connected to new nodes, stopping at nodes already tracked by a machine """
+        region  : set[TaskName_p|Artifact_i]  = set()
+        queue   : list[TaskName_p|Artifact_i] = list(added)
+        while bool(queue):
+            focus = queue.pop()
+            if focus in region or focus == self._root_node:
+                continue
+            region.add(focus)
+            if focus in self.machines and focus not in added:
+                # Boundary node, its other edges are unchanged
+                continue
+            queue += self._network.pred[focus]
+            queue += self._network.succ[focus]
+        else:
+            return region
+
+    def _validate_region(self, region:set[TaskName_p|Artifact_i]) -> None:
+        """ Check new nodes for missing specs, and for cycles through them """
+        for node in region:
+            match node:
+                case TaskName_p() if node not in self._registry.specs:
+                    raise doot.errors.TrackingError("Network has a missing dependency", node)
+                case _:
+                    pass
+
+        match self._find_cycle(region):
+            case None:
+                pass
+            case [*xs]:
+                raise doot.errors.TrackingError("Network isn't a DAG", xs)
+
+    def _find_cycle(self, sources:Iterable[TaskName_p|Artifact_i]) -> Maybe[list]:
+        """ Iterative DFS over successors, from the sources.
+        As the network was acyclic, any new cycle passes through a source.
+        """
+        done   : set  = set()
+        for source in sources:
+            if source in done:
+                continue
+            path   : list = [source]
+            onpath : set  = {source}
+            stack  : list = [iter(self._network.succ[source])]
+            while bool(stack):
+                match next(stack[-1], None):
+                    case None:
+                        stack.pop()
+                        node = path.pop()
+                        onpath.discard(node)
+                        done.add(node)
+                    case x if x in onpath:
+                        return [*path[path.index(x):], x]
+                    case x if x in done or x == self._root_node:
+                        pass
+                    case x:
+                        path.append(x)
+                        onpath.add(x)
+                        stack.append(iter(self._network.succ[x]))
+        else:
+            return None
+
+    def _block_on_new_edges(self, region:set[TaskName_p|Artifact_i]) -> None:
+        """ Waiting tasks which have gained unsettled dependencies are blocked on them as well """
+        for waiter in region:
+            if waiter not in self._pending:
+                continue
+            for dep, dep_state in self._dependency_states_of(waiter):
+                if dep_state in SETTLED_STATES or waiter in self._blocked_by.get(dep, ()):
+                    continue
+                self.queue(dep)
+                if self.get_status(target=dep)[0] in SETTLED_STATES:
+                    continue
+                self._blocked_by[dep].add(waiter)
+                self._pending[waiter] += 1
+
+    def _ready_key(self, name:TaskName_p) -> float:
+        match self.critical_path:
+            case True:
+                return -self.rank_of(name)
+            case False:
+                return -self.machines[name].model.priority # type: ignore[attr-defined]
+
+    def _push_ready(self, name:TaskName_p) -> None:
+        if name in self._ready_set:
+            return
+        heapq.heappush(self._ready, (self._ready_key(name), next(self._ready_count), name))
+        self._ready_set.add(name)
+
+    def _rekey_ready(self) -> None:
+        """ Rebuild the ready heap with current keys, keeping the order of ties """
+        self._ready = [(self._ready_key(name), count, name) for _, count, name in self._ready if name in self.machines]
+        heapq.heapify(self._ready)
+        self._ready_set = {name for _, _, name in self._ready}
+
+    def _pop_ready(self) -> Maybe[Task_p]:
+        while bool(self._ready):
+            _, _, name = heapq.heappop(self._ready)
+            self._ready_set.discard(name)
+            match self.machines.get(name, None):
+                case None:
+                    pass
+                case fsm if fsm.current_state_value in READY_STATES:
+                    return cast("Task_p", fsm.model)
+                case _:
+                    pass
+        else:
+            return None
+
     ##--| utils
 
     def get_status(self, *, target:Maybe[TaskName_p]=None) -> tuple[TaskStatus_e, Priority]:
         match self.machines.get(target, None): # type: ignore[arg-type]
             case None if target == self._root_node:
                 return TaskStatus_e.NAMED, self._declare_priority
+            case None if target in self.tombstones:
+                tomb = self.tombstones[target] # type: ignore[index]
+                return tomb.status, tomb.priority
             case None if target in self.specs:
                 return TaskStatus_e.DECLARED, self._declare_priority
-            case TaskMachine() as x:
-                return x.current_state_value, cast("TaskMachine", x.model).priority
+            case TaskMachine() | EngineMachine() as x:
+                return x.current_state_value, x.model.priority
             case x:
                 raise TypeError(type(x))
 
+    def _machine_for(self, task:Task_p) -> TaskMachine|EngineMachine:
+        match self.engine:
+            case None:
+                return TaskMachine(task)
+            case engine:
+                return engine.machine(task)
+
     def set_status(self, *args:Any) -> None:
         """ No-op as the FSM's control status """
         pass
 
     def _dependency_states_of(self, focus:TaskName_p) -> list[tuple]:
-        return [(x, self.get_status(target=x)[0]) for x in self._network.pred[focus] if x != self._root_node]
+        match self.adjacency:
+            case AdjacencyIndex() as index if focus in index:
+                return [(x, self.get_status(target=x)[0] if y is None else y) for x, y in index.pred_states(focus)]
+            case _:
+                return [(x, self.get_status(target=x)[0]) for x in self._network.pred[focus] if x != self._root_node]
 
     def _successor_states_of(self, focus:TaskName_p) -> list[tuple]:
-        return [(x, self.get_status(target=x)[0]) for x in self._network.succ[focus] if x != self._root_node]
+        match self.adjacency:
+            case AdjacencyIndex() as index if focus in index:
+                return [(x, self.get_status(target=x)[0] if y is None else y) for x, y in index.succ_states(focus)]
+            case _:
+                return [(x, self.get_status(target=x)[0]) for x in self._network.succ[focus] if x != self._root_node]
+
+    def _successors_of(self, focus:TaskName_p|Artifact_i) -> Iterable[TaskName_p|Artifact_i]:
+        match self.adjacency:
+            case AdjacencyIndex() as index if focus in index:
+                return index.succs(focus)
+            case _:
+                return self._network.succ[focus]
+
+    def _index_network(self, nodes:Iterable[TaskName_p|Artifact_i]) -> None:
+        """ Index the edges of nodes, and the statuses of any tasks new to the index """
+        assert(self.adjacency is not None)
+        for node in self.adjacency.index(nodes, self._network.pred, self._network.succ, exclude=self._root_node):
+            match node:
+                case TaskName_p() if node in self.machines or node in self.tombstones or node in self.specs:
+                    self.adjacency.set_status(node, self.get_status(target=node)[0])
+                case _:
+                    pass
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+A persistent store of how long tasks took, in the doot temp location.
+
+Timings are recorded by the FSMTracker as tasks enter and leave RUNNING and TEARDOWN,
+keyed by their template name (so the subtasks of a job share a history).
+Records are batched in memory, and written to sqlite in a single transaction per batch.
+
+Alongside durations, the memory table records how much the rss grew while a task's phases ran
+(see memory.MemoryBudget), as peak_rss is the whole process' peak.
+
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import logging as logmod
+import pathlib as pl
+import resource
+import sqlite3
+import time
+import weakref
+from contextlib import closing
+from typing import NamedTuple
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+import doot
+from jgdv.structs.dkey import DKey
+
+# ##-- end 3rd party imports
+
+from doot.workflow._interface import TaskName_p, TaskStatus_e
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType, Never
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+HISTORY_FILE    : Final[str]  = "fsm_history.sqlite"
+BATCH_SIZE      : Final[int]  = doot.config.on_fail(64).commands.run.history_batch()
+temp_key                      = DKey("temp!p", implicit=True)
+
+CREATE_TABLE    : Final[str]  = """
+CREATE TABLE IF NOT EXISTS durations (
+    task      TEXT NOT NULL,
+    phase     TEXT NOT NULL,
+    status    TEXT NOT NULL,
+    wall_ns   INTEGER NOT NULL,
+    cpu_ns    INTEGER NOT NULL,
+    peak_rss  INTEGER NOT NULL,
+    finished  REAL NOT NULL
+)
+"""
+CREATE_INDEX    : Final[str]  = "CREATE INDEX IF NOT EXISTS durations_task ON durations (task, phase)"
+INSERT          : Final[str]  = "INSERT INTO durations VALUES (?, ?, ?, ?, ?, ?, ?)"
+SELECT_MEANS    : Final[str]  = "SELECT task, AVG(wall_ns) FROM durations WHERE phase = ? AND status = ? GROUP BY task"
+SELECT_LAST     : Final[str]  = "SELECT * FROM durations WHERE task = ? AND phase = ? ORDER BY finished DESC LIMIT 1"
+
+CREATE_MEMORY   : Final[str]  = """
+CREATE TABLE IF NOT EXISTS memory (
+    task      TEXT NOT NULL,
+    grown     INTEGER NOT NULL,
+    finished  REAL NOT NULL
+)
+"""
+INSERT_MEMORY   : Final[str]  = "INSERT INTO memory VALUES (?, ?, ?)"
+SELECT_MEMORY   : Final[str]  = "SELECT task, MAX(grown) FROM memory GROUP BY task"
+
+RUN_PHASE       : Final[str]  = "run"
+TEARDOWN_PHASE  : Final[str]  = "teardown"
+##--|
+
+class Duration_d(NamedTuple):
+    """ One timed phase of a task """
+    task      : str
+    phase     : str
+    status    : str
+    wall_ns   : int
+    cpu_ns    : int
+    peak_rss  : int
+    finished  : float
+
+def history_key(name:TaskName_p) -> str:
+    """ Histories are kept by template name, so subtasks share them """
+    return name.de_uniq()[:]
+
+def _write(path:pl.Path, records:list[Duration_d], memory:list[tuple[str, int, float]]) -> None:
+    """ Write a batch of records in one transaction. Used by flush, and on finalization """
+    if not (bool(records) or bool(memory)):
+        return
+    with closing(sqlite3.connect(path)) as conn, conn:
+        conn.execute(CREATE_TABLE)
+        conn.execute(CREATE_INDEX)
+        conn.execute(CREATE_MEMORY)
+        conn.executemany(INSERT, records)
+        conn.executemany(INSERT_MEMORY, memory)
+    records.clear()
+    memory.clear()
+
+##--|
+
+class DurationHistory:
+    """
+    Records the wall time, cpu time, and peak rss of task phases.
+
+    wall time is from perf_counter_ns.
+    cpu time is the cpu time of the thread the phase ran on,
+    and peak rss is the process' peak, in KiB, when the phase ended.
+
+    Phases which were precomputed on a worker (see runner.FSMRunner)
+    report their own timings with 'precomputed', which replaces the main thread's.
+    """
+    _path      : pl.Path
+    _batch     : int
+    _pending   : list[Duration_d]
+    _memory    : list[tuple[str, int, float]]
+    _started   : dict[tuple[TaskName_p, str], tuple[int, int]]
+
+    def __init__(self, path:Maybe[pl.Path]=None, *, batch:Maybe[int]=None) -> None:
+        self._path     = path or (temp_key.expand() / HISTORY_FILE)
+        self._batch    = batch or BATCH_SIZE
+        self._pending  = []
+        self._memory   = []
+        self._started  = {}
+        # Write remaining records when collected, or on exit
+        weakref.finalize(self, _write, self._path, self._pending, self._memory)
+
+    @property
+    def path(self) -> pl.Path:
+        return self._path
+
+    ##--| recording
+
+    def start(self, name:TaskName_p, phase:str) -> None:
+        self._started[name, phase] = (time.perf_counter_ns(), time.thread_time_ns())
+
+    def stop(self, name:TaskName_p, phase:str, status:TaskStatus_e, *, precomputed:Maybe[tuple[int, int]]=None) -> None:
+        match self._started.pop((name, phase), None):
+            case None:
+                return
+            case _ if precomputed is not None:
+                wall, cpu = precomputed
+            case (wall_start, cpu_start):
+                wall  = time.perf_counter_ns() - wall_start
+                cpu   = time.thread_time_ns() - cpu_start
+
+        self._pending.append(Duration_d(history_key(name),
+                                        phase,
+                                        status.name,
+                                        wall,
+                                        cpu,
+                                        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                                        time.time()))
+        if self._batch <= len(self._pending):
+            self.flush()
+
+    def record_memory(self, name:TaskName_p, grown:int) -> None:
+        """ Record the bytes a task's rss grew by while it ran. Written with the next batch """
+        self._memory.append((history_key(name), grown, time.time()))
+
+    def flush(self) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        _write(self._path, self._pending, self._memory)
+
+    ##--| querying
+
+    def durations(self, *, phase:str=RUN_PHASE) -> dict[str, float]:
+        """ The mean wall time, in seconds, of successful phases, by template name """
+        if not self._path.exists():
+            return {}
+        with closing(sqlite3.connect(self._path)) as conn, conn:
+            conn.execute(CREATE_TABLE)
+            rows = conn.execute(SELECT_MEANS, (phase, TaskStatus_e.SUCCESS.name)).fetchall()
+
+        return {task:mean / 1e9 for task, mean in rows}
+
+    def last(self, name:TaskName_p|str, *, phase:str=RUN_PHASE) -> Maybe[Duration_d]:
+        """ The most recent record of a task """
+        match name:
+            case TaskName_p():
+                key = history_key(name)
+            case str():
+                key = name
+        if not self._path.exists():
+            return None
+        with closing(sqlite3.connect(self._path)) as conn, conn:
+            conn.execute(CREATE_TABLE)
+            match conn.execute(SELECT_LAST, (key, phase)).fetchone():
+                case None:
+                    return None
+                case row:
+                    return Duration_d(*row)
+
+    def memory(self) -> dict[str, int]:
+        """ The most each template's rss has grown by, in bytes """
+        if not self._path.exists():
+            return {}
+        with closing(sqlite3.connect(self._path)) as conn, conn:
+            conn.execute(CREATE_MEMORY)
+            rows = conn.execute(SELECT_MEMORY).fetchall()
+
+        return dict(rows)
@@ -69,6 +69,9 @@ BASE_BREAK_STATES : Final[list[TaskStatus_e]] = [TaskStatus_e.TEARDOWN, TaskStat
 class TaskMachine(StateMachine):
     """
       A Statemachine controlling the tracking of task states
+
+      Transitions aren't logged, subscribe to them with observe.subscribe(transition=...)
+      (eg: observe.log_transition)
     """
     # States
     # TODO use taskstatus methods for initial and final
@@ -114,6 +117,8 @@ class TaskMachine(StateMachine):
     skip = _.RUNNING.to(_.SKIPPED)
     halt = _.RUNNING.to(_.HALTED)
     fail = _.RUNNING.to(_.FAILED)
+    # Halt a task which hasn't run, as it's downstream of a failure
+    cancel = _.HALTED.from_(_.INIT, _.WAIT)
 
     # Composite Events
     progress = (setup | prepare | run | finish)
@@ -126,7 +131,6 @@ class TaskMachine(StateMachine):
 
     def __call__(self, *, until:Maybe[TaskStatus_e|Iterable[TaskStatus_e]]=None, **kwargs:Any) -> Any:
         """ A unified method for running a task to completion """
-        logging.info("Calling util: %s", until)
         base_states = BASE_BREAK_STATES[:]
         match until:
             case None | []:
@@ -166,9 +170,6 @@ class TaskMachine(StateMachine):
     def run_until_dead(self, tracker:WorkflowTracker_p, **kwargs) -> None:
         self(tracker=tracker, **kwargs)
 
-    def before_transition(self, source:Any, event:Any, target:Any) -> None:
-        logging.info("[FSM.Task]: %s -> %s -> %s", source, event, target)
-
 class ArtifactMachine(StateMachine):
     """
       A statemachine of artifact
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Admission of tasks against a memory budget.
+
+Each task's memory is estimated from, in order:
+- its declared 'mem' extra (eg: mem = "4G"),
+- the most its template's RSS has been seen to grow while running (this run, or recorded in the DurationHistory),
+- or 0, when nothing is known yet.
+
+Growth is measured on the worker around each precompute (see task._Precompute_m).
+With concurrent tasks it includes what the others allocated at the same time,
+so it over-estimates, which is the safe direction.
+
+The FSMRunner admits a READY task only while the estimates of admitted tasks, plus its own, fit the budget
+(settings.commands.run.memory_budget, or the runner's 'memory_budget' kwarg, eg: "16G").
+Deferred tasks go back to the tracker, so smaller ones fill in behind them.
+A task is always admitted when nothing else is, so tasks larger than the budget still run, alone,
+and a deferred task runs at the latest once the tasks admitted ahead of it have finished.
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import logging as logmod
+import os
+import pathlib as pl
+import re
+import resource
+
+# ##-- end stdlib imports
+
+from . import _interface as API  # noqa: N812
+from .history import history_key
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType, Never
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from doot.workflow._interface import Task_p, TaskName_p
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+SIZE_RE      : Final[re.Pattern]      = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*$", re.IGNORECASE)
+SIZE_UNITS   : Final[dict[str, int]]  = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+##--|
+
+def parse_size(value:Maybe[int|float|str]) -> Maybe[int]:
+    """ A size in bytes, from bytes or a string with a unit (eg: '512M', '4G', '2GiB') """
+    match value:
+        case None:
+            return None
+        case int() | float():
+            return int(value)
+        case str() if (found:=SIZE_RE.match(value)) is not None:
+            return int(float(found[1]) * SIZE_UNITS[found[2].upper()])
+        case x:
+            raise ValueError("Unrecognised memory size", x)
+
+def rss() -> tuple[Maybe[int], int]:
+    """ The current (where /proc is available) and peak resident set size, in bytes """
+    current  : Maybe[int]
+    peak     : int  = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    try:
+        pages    = int(pl.Path("/proc/self/statm").read_text().split()[1])
+        current  = pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        current = None
+
+    return current, peak
+
+def rss_sample() -> tuple[int, int]:
+    """ The current rss (or the peak, if it can't be read) and the peak, for rss_growth """
+    current, peak = rss()
+    return (peak if current is None else current), peak
+
+def rss_growth(before:tuple[int, int]) -> int:
+    """ How much the rss grew since an rss_sample.
+    If the process' peak rose in the meantime, the growth is to the new peak.
+    """
+    start, start_peak  = before
+    current, peak      = rss_sample()
+    if start_peak < peak:
+        return max(0, peak - start)
+
+    return max(0, current - start)
+
+##--|
+
+class MemoryBudget:
+    """ The estimated memory of admitted tasks, against a budget. Only used from the runner's main thread.
+    With no budget, everything is admitted.
+    """
+    __slots__ = ("_admitted", "_used", "budget", "estimates")
+    budget      : Maybe[int]
+    estimates   : dict[str, int]
+    _admitted   : dict[TaskName_p, int]
+    _used       : int
+
+    def __init__(self, budget:Maybe[int|str], *, estimates:Maybe[Mapping[str, int]]=None) -> None:
+        self.budget      = parse_size(budget)
+        self.estimates   = dict(estimates or {})
+        self._admitted   = {}
+        self._used       = 0
+
+    def __bool__(self) -> bool:
+        return self.budget is not None
+
+    @property
+    def used(self) -> int:
+        return self._used
+
+    def estimate(self, task:Task_p) -> int:
+        """ The declared 'mem' of a task, or the most its template has grown by """
+        match parse_size(task.spec.extra.get(API.MEM_K, None)):
+            case int() as declared:
+                return declared
+            case None:
+                return self.estimates.get(history_key(task.name), 0)
+
+    def admit(self, task:Task_p) -> bool:
+        """ Admit a task if its estimate fits in what remains of the budget """
+        if self.budget is None or task.name in self._admitted:
+            return True
+
+        needed = self.estimate(task)
+        if bool(self._admitted) and self.budget < self._used + needed:
+            logging.debug("[Memory] Deferring: %s (%s of %s bytes used, needs %s)", task.name, self._used, self.budget, needed)
+            return False
+
+        self._admitted[task.name]  = needed
+        self._used                += needed
+        return True
+
+    def release(self, task:Task_p) -> None:
+        """ Return a task's estimate to the budget, and learn from the growth measured while it ran """
+        self._used -= self._admitted.pop(task.name, 0)
+        match getattr(task, "_mem_grow", 0):
+            case int() as grown if 0 < grown:
+                key = history_key(task.name)
+                self.estimates[key] = max(grown, self.estimates.get(key, 0))
+            case _:
+                pass
+
+    def clear(self) -> None:
+        self._admitted.clear()
+        self._used = 0
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Opt-in export of run progress, for node_exporter's textfile collector.
+
+The collector reads the Prometheus text exposition format (version 0.0.4),
+not OpenMetrics, which is for scrape endpoints.
+So there is no '# EOF' or '# UNIT' line, and counters are typed by their '_total' name.
+
+A background thread rewrites the file every interval (commands.run.metrics_interval, in seconds),
+writing to a temporary file beside it and renaming it into place,
+so the collector never reads a partial file.
+
+Metrics:
+- doot_tasks{state}                       : tasks (and reclaimed tombstones) per TaskStatus_e
+- doot_queue_active, doot_queue_ready     : queue depth, as the tracker's active set and READY heap
+- doot_tasks_completed_total              : tasks that have died
+- doot_tasks_per_second                   : the rate of completion since the last write
+- doot_action_seconds{group}              : a histogram of action latencies
+- doot_postbox_boxes, doot_postbox_values : the postbox's size
+
+Task counts are taken from the tracker by the writer thread.
+Completions and action latencies are collected through observe.HOOKS.
+
+Enable with FSMTracker(metrics=True|path), or commands.run.metrics.
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import logging as logmod
+import os
+import pathlib as pl
+import threading
+import time
+from bisect import bisect_left
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+import doot
+from doot.workflow._interface import TaskStatus_e
+from jgdv.structs.dkey import DKey
+
+# ##-- end 3rd party imports
+
+from dootle.actions.postbox import _DootPostBox
+from .observe import HOOKS, Subscription
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType, Never
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+METRICS_FILE  : Final[str]                = "fsm_metrics.prom"
+INTERVAL      : Final[float]              = doot.config.on_fail(15.0).commands.run.metrics_interval()
+BUCKETS       : Final[tuple[float, ...]]  = (0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+NS_S          : Final[float]              = 1e9
+PREFIX        : Final[str]                = "doot"
+temp_key                                  = DKey("temp!p", implicit=True)
+##--|
+
+class _Histogram:
+    """ Cumulative counts per bucket bound, the last bucket being +Inf """
+    __slots__ = ("counts", "sum")
+    counts  : list[int]
+    sum     : float
+
+    def __init__(self) -> None:
+        self.counts  = [0] * (len(BUCKETS) + 1)
+        self.sum     = 0.0
+
+    def observe(self, secs:float) -> None:
+        self.counts[bisect_left(BUCKETS, secs)] += 1
+        self.sum += secs
+
+    def cumulative(self) -> list[int]:
+        total, result = 0, []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        else:
+            return result
+
+class MetricsExporter:
+    """ Collects run progress, and periodically writes it as a Prometheus textfile.
+
+    'attach' a tracker to start the writer thread, and 'close' to stop it with a final write.
+    """
+    _completed     : int
+    _histograms    : dict[str, _Histogram]
+    _last          : tuple[float, int]
+    _lock          : threading.Lock
+    _stop          : threading.Event
+    _subscription  : Maybe[Subscription]
+    _thread        : Maybe[threading.Thread]
+    _write_lock    : threading.Lock
+    _tracker       : Maybe[Any]
+    interval       : float
+    path           : pl.Path
+
+    def __init__(self, path:Maybe[pl.Path]=None, *, interval:Maybe[float]=None) -> None:
+        self.path           = path or (temp_key.expand() / METRICS_FILE)
+        self.interval       = interval or INTERVAL
+        self._completed     = 0
+        self._histograms    = {}
+        self._last          = (time.monotonic(), 0)
+        self._lock          = threading.Lock()
+        self._stop          = threading.Event()
+        self._subscription  = None
+        self._thread        = None
+        self._tracker       = None
+        self._write_lock    = threading.Lock()
+
+    ##--| lifecycle
+
+    def attach(self, tracker:Any) -> None:
+        """ Subscribe to task completions and action ends, and start the writer thread """
+        self._tracker       = tracker
+        self._subscription  = HOOKS.subscribe(transition=self._on_transition, action_end=self._on_action)
+        if self._thread is not None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="doot-metrics", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """ Stop the writer thread, unsubscribe, and write a final snapshot """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._subscription is not None:
+            HOOKS.unsubscribe(self._subscription)
+            self._subscription = None
+        self.write()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    ##--| subscribers
+
+    def _on_transition(self, model:Any, source:TaskStatus_e, target:TaskStatus_e) -> None:  # noqa: ARG002
+        if target is TaskStatus_e.DEAD:
+            with self._lock:
+                self._completed += 1
+
+    def _on_action(self, model:Any, action:Any, group:Maybe[str], result:Any, start_ns:int, end_ns:int) -> None:  # noqa: ARG002, PLR0913
+        with self._lock:
+            match self._histograms.get(group or "", None):
+                case None:
+                    hist = self._histograms[group or ""] = _Histogram()
+                case hist:
+                    pass
+            hist.observe((end_ns - start_ns) / NS_S)
+
+    ##--| writing
+
+    def write(self) -> None:
+        """ Render, then atomically replace, the metrics file.
+        The writer thread and the tracker both write, so writes are serialised.
+        A failed write is logged rather than raised.
+        """
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        with self._write_lock:
+            try:
+                tmp.write_text(self.render())
+                tmp.replace(self.path)
+            except OSError as err:
+                logging.warning("[Metrics] Failed to write %s : %s", self.path, err)
+
+    def render(self) -> str:
+        """ The current metrics, in the Prometheus text exposition format """
+        now = time.monotonic()
+        with self._lock:
+            completed   = self._completed
+            histograms  = {name : (hist.cumulative(), hist.sum) for name, hist in self._histograms.items()}
+        last_time, last_completed  = self._last
+        self._last                 = (now, completed)
+        rate                       = (completed - last_completed) / (now - last_time) if now > last_time else 0.0
+
+        lines = [
+            f"# HELP {PREFIX}_tasks Tasks per state.",
+            f"# TYPE {PREFIX}_tasks gauge",
+            *(f'{PREFIX}_tasks{{state="{status.name}"}} {count}' for status, count in self._task_counts().items()),
+            *self._gauge("queue_active", "Tasks in the tracker's active queue.", self._queue_depth()),
+            *self._gauge("queue_ready", "READY tasks waiting for a runner.", len(getattr(self._tracker, "_ready_set", ()))),
+            f"# HELP {PREFIX}_tasks_completed_total Tasks that have died.",
+            f"# TYPE {PREFIX}_tasks_completed_total counter",
+            f"{PREFIX}_tasks_completed_total {completed}",
+            *self._gauge("tasks_per_second", "Tasks completed per second, since the last write.", round(rate, 3)),
+            f"# HELP {PREFIX}_action_seconds Action latencies in seconds, per action group.",
+            f"# TYPE {PREFIX}_action_seconds histogram",
+        ]
+        for group, (counts, total) in sorted(histograms.items()):
+            for bound, count in zip([*BUCKETS, "+Inf"], counts, strict=True):
+                lines.append(f'{PREFIX}_action_seconds_bucket{{group="{group}",le="{bound}"}} {count}')
+            else:
+                lines.append(f'{PREFIX}_action_seconds_count{{group="{group}"}} {counts[-1]}')
+                lines.append(f'{PREFIX}_action_seconds_sum{{group="{group}"}} {total}')
+
+        boxes, values = self._postbox_size()
+        lines += self._gauge("postbox_boxes", "Postboxes in use.", boxes)
+        lines += self._gauge("postbox_values", "Values held across all postboxes.", values)
+        return "\n".join([*lines, ""])
+
+    ##--| collection
+
+    def _gauge(self, name:str, help:str, value:float) -> list[str]:  # noqa: A002
+        return [f"# HELP {PREFIX}_{name} {help}", f"# TYPE {PREFIX}_{name} gauge", f"{PREFIX}_{name} {value}"]
+
+    def _task_counts(self) -> dict[TaskStatus_e, int]:
+        """ Counts of the tracker's machines by state. Copies before iterating, as the main thread may be adding to them """
+        counts : dict[TaskStatus_e, int] = dict.fromkeys(TaskStatus_e, 0)
+        if self._tracker is None:
+            return counts
+        for machine in list(self._tracker.machines.values()):
+            counts[machine.current_state_value] += 1
+        for tomb in list(self._tracker.tombstones.values()):
+            counts[tomb.status] += 1
+        else:
+            return counts
+
+    def _queue_depth(self) -> int:
+        match getattr(self._tracker, "_queue", None):
+            case None:
+                return 0
+            case queue:
+                return len(queue.active_set)
+
+    def _postbox_size(self) -> tuple[int, int]:
+        boxes  = list(_DootPostBox.boxes.values())
+        values = sum(len(vals) for subboxes in boxes for vals in list(subboxes.values()))
+        return len(boxes), values
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Subscriptions to the events of FSM tasks, for tracing, metrics, and reporting.
+
+Events:
+- transition    : (model, source:TaskStatus_e, target:TaskStatus_e)
+- action_start  : (model, action:ActionSpec, group:Maybe[str])
+- action_end    : (model, action, group, result, start_ns, end_ns)
+- group_end     : (model, group:str, count:int, result:ActRE, start_ns, end_ns)
+
+Each event is a slot of HOOKS, which is None while it has no subscribers,
+so emitting is a single attribute check::
+
+    if (hook:=HOOKS.transition) is not None:
+        hook(model, source, target)
+
+With one subscriber the slot is the subscriber itself, with more it is a fan-out.
+Timestamps are time.monotonic_ns, and are only taken when the event has subscribers.
+Subscribers are called on whichever thread emitted the event.
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import logging as logmod
+import threading
+
+# ##-- end stdlib imports
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType, Never
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from doot.workflow._interface import TaskStatus_e
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+EVENTS : Final[tuple[str, ...]] = ("transition", "action_start", "action_end", "group_end")
+##--|
+
+def _fan_out(subscribers:tuple[Callable, ...]) -> Callable:
+    def dispatch(*args:Any) -> None:
+        for sub in subscribers:
+            sub(*args)
+
+    return dispatch
+
+def log_transition(model:Any, source:TaskStatus_e, target:TaskStatus_e) -> None:
+    """ A transition subscriber which logs, as TaskMachine used to on every transition """
+    logging.info("[FSM.Task]: %s : %s -> %s", model.name, source, target)
+
+##--|
+
+class Subscription:
+    """ A handle on a set of subscribed callbacks, for unsubscribing them """
+    __slots__ = ("callbacks",)
+    callbacks : dict[str, Callable]
+
+    def __init__(self, callbacks:dict[str, Callable]) -> None:
+        self.callbacks = callbacks
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc:Any) -> None:
+        HOOKS.unsubscribe(self)
+
+class _Hooks:
+    """ The dispatch slots for each event. Use 'subscribe' to fill them """
+    __slots__ = ("_lock", "_subscribers", "action_end", "action_start", "group_end", "transition")
+    transition    : Maybe[Callable]
+    action_start  : Maybe[Callable]
+    action_end    : Maybe[Callable]
+    group_end     : Maybe[Callable]
+
+    def __init__(self) -> None:
+        self._lock         = threading.Lock()
+        self._subscribers  = {x:() for x in EVENTS}
+        for event in EVENTS:
+            setattr(self, event, None)
+
+    def subscribe(self, **callbacks:Callable) -> Subscription:
+        """ Subscribe callbacks by event name, eg: subscribe(transition=fn) """
+        match [x for x in callbacks if x not in EVENTS]:
+            case []:
+                pass
+            case [*xs]:
+                raise KeyError("Unknown FSM events", xs)
+
+        with self._lock:
+            for event, callback in callbacks.items():
+                self._subscribers[event] = (*self._subscribers[event], callback)
+                self._rebuild(event)
+        return Subscription(callbacks)
+
+    def unsubscribe(self, sub:Subscription) -> None:
+        with self._lock:
+            for event, callback in sub.callbacks.items():
+                self._subscribers[event] = tuple(x for x in self._subscribers[event] if x is not callback)
+                self._rebuild(event)
+            else:
+                sub.callbacks = {}
+
+    def clear(self) -> None:
+        """ Remove all subscribers """
+        with self._lock:
+            for event in EVENTS:
+                self._subscribers[event] = ()
+                self._rebuild(event)
+
+    def _rebuild(self, event:str) -> None:
+        match self._subscribers[event]:
+            case ():
+                setattr(self, event, None)
+            case (single,):
+                setattr(self, event, single)
+            case subs:
+                setattr(self, event, _fan_out(subs))
+
+##--|
+HOOKS       = _Hooks()
+subscribe   = HOOKS.subscribe
+unsubscribe = HOOKS.unsubscribe
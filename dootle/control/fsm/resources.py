@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Counted tokens per resource class, limiting how many tasks using a resource run at once.
+
+Tasks declare the classes they use in their spec's extra data,
+and actions in their kwargs, as a string or list of strings::
+
+    [[tasks.backup]]
+    name       = "usb"
+    resources  = ["disk:/mnt/backup"]
+    actions    = [{do="dootle.actions.backup:MultiBackupAction", resources="io"}]
+
+Pool sizes are set per class in doot.toml::
+
+    [settings.commands.run.resources]
+    cpu                = 8
+    "disk:/mnt/backup" = 1
+    disk               = 2   # each other 'disk:...' class gets 2 tokens
+    net                = 4
+
+A class without a size of its own uses the size set for its prefix (the part before the first ':'),
+as a separate pool per class. Classes without either are unlimited.
+
+The FSMRunner admits a READY task to a worker only when it can take a token of every class it uses,
+and returns them once the task's actions have finished.
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import logging as logmod
+from collections import Counter
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+import doot
+from doot.workflow import ActionSpec
+
+# ##-- end 3rd party imports
+
+from . import _interface as API  # noqa: N812
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType, Never
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from doot.workflow._interface import Task_p, TaskName_p
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+CLASS_SEP   : Final[str]             = ":"
+GROUPS      : Final[tuple[str, ...]] = (API.SETUP_GROUP, API.ACTION_GROUP, API.FAIL_GROUP, API.CLEANUP_GROUP)
+##--|
+
+def _as_classes(value:Any) -> list[str]:
+    match value:
+        case None:
+            return []
+        case str():
+            return [value]
+        case list() | tuple() | set() | frozenset():
+            return [str(x) for x in value]
+        case x:
+            raise TypeError("Resource classes should be a string or list of strings", x)
+
+def configured_limits() -> dict[str, int]:
+    """ The pool sizes of settings.commands.run.resources """
+    return {str(x) : int(y) for x, y in dict(doot.config.on_fail({}).commands.run.resources()).items()}
+
+##--|
+
+class ResourceTokens:
+    """ Pools of tokens per resource class. Only used from the runner's main thread """
+    __slots__ = ("_classes", "_held", "_holding", "limits")
+    limits    : dict[str, int]
+    _classes  : dict[TaskName_p, tuple[str, ...]]
+    _held     : Counter[str]
+    _holding  : dict[TaskName_p, tuple[str, ...]]
+
+    def __init__(self, limits:Mapping[str, int]) -> None:
+        # A pool with no tokens could never admit anything
+        self.limits    = {x : max(1, y) for x, y in limits.items()}
+        self._classes  = {}
+        self._held     = Counter()
+        self._holding  = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.limits)
+
+    def limit_of(self, cls:str) -> Maybe[int]:
+        """ The size of a class's pool, from the class, then its prefix. None if unlimited """
+        match self.limits.get(cls, None):
+            case int() as x:
+                return x
+            case None:
+                return self.limits.get(cls.partition(CLASS_SEP)[0], None)
+
+    def classes_of(self, task:Task_p) -> tuple[str, ...]:
+        """ The limited classes used by a task's spec, and the actions of its groups """
+        match self._classes.get(task.name, None):
+            case tuple() as found:
+                return found
+            case None:
+                pass
+
+        classes = _as_classes(task.spec.extra.get(API.RESOURCES_K, None))
+        for group in GROUPS:
+            for action in getattr(task.spec, group, None) or []:
+                match action:
+                    case ActionSpec():
+                        classes += _as_classes(action.kwargs.get(API.RESOURCES_K, None))
+                    case _:
+                        pass
+
+        found = self._classes[task.name] = tuple(sorted(x for x in set(classes) if self.limit_of(x) is not None))
+        return found
+
+    def acquire(self, task:Task_p) -> bool:
+        """ Take a token of each class the task uses, or none of them if any are exhausted """
+        if not bool(self.limits) or task.name in self._holding:
+            return True
+
+        classes = self.classes_of(task)
+        if any(self.limit_of(x) <= self._held[x] for x in classes):
+            return False
+
+        self._held.update(classes)
+        self._holding[task.name] = classes
+        return True
+
+    def release(self, task:Task_p) -> None:
+        """ Return the tokens a task holds """
+        self._held.subtract(self._holding.pop(task.name, ()))
+
+    def in_use(self, cls:str) -> int:
+        return self._held[cls]
+
+    def clear(self) -> None:
+        """ Return all tokens, eg: when the runner's pool is shut down """
+        self._held.clear()
+        self._holding.clear()
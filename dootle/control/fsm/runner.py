@@ -16,6 +16,8 @@ import pathlib as pl
 import re
 import time
 import types
+import concurrent.futures as cf
+import multiprocessing as mp
 from collections import defaultdict
 from contextlib import nullcontext
 from uuid import UUID, uuid1
@@ -30,7 +32,13 @@ from doot.control.runner import DootRunner
 # ##-- end 3rd party imports
 
 from doot.workflow._interface import TaskStatus_e
-from .task import FSMTask
+from . import _interface as API  # noqa: N812
+from .task import FSMTask, precompute_remote
+from .snapshot import SnapshotHandler
+from .errors import FSMDeadlock
+from .resources import ResourceTokens, configured_limits
+from .memory import MemoryBudget
+from .history import DurationHistory
 
 # ##-- 1st party imports
 import doot
@@ -74,26 +82,92 @@ logging           = logmod.getLogger(__name__)
 ##-- end logging
 
 ##--| Vars
-skip_msg    : Final[str]                 = doot.constants.printer.skip_by_condition_msg
-max_steps   : Final[int]                 = doot.config.on_fail(100_000).commands.run.max_steps()
+skip_msg         : Final[str]                 = doot.constants.printer.skip_by_condition_msg
+max_steps        : Final[int]                 = doot.config.on_fail(100_000).commands.run.max_steps()
+default_workers  : Final[int]                 = doot.config.on_fail(1).commands.run.workers()
+default_procs    : Final[int]                 = doot.config.on_fail(0).commands.run.processes()
+use_snapshot     : Final[bool]                = doot.config.on_fail(False).commands.run.snapshot() # noqa: FBT003
+default_memory   : Final[Maybe[int|str]]      = doot.config.on_fail(None).commands.run.memory_budget()
 
-RUN_STATES  : Final[list[TaskStatus_e]]  = [
+RUN_STATES       : Final[list[TaskStatus_e]]  = [
     TaskStatus_e.READY, TaskStatus_e.RUNNING, TaskStatus_e.TEARDOWN,
 ]
 ##--|
 
 @Proto(WorkflowRunner_p, check=False)
 class FSMRunner(DootRunner):
-    """ Doot Runner which accepts FSM wrapped Tasks/Jobs/Artifacts """
+    """ Doot Runner which accepts FSM wrapped Tasks/Jobs/Artifacts
+
+    With more than one worker (settings.commands.run.workers, or the 'workers' kwarg),
+    multiple READY tasks are kept in flight at once.
+    Their action groups are run on a thread pool,
+    while the tracker and TaskMachines are only progressed on the main thread.
+
+    With processes (settings.commands.run.processes, or the 'processes' kwarg),
+    tasks which set 'process=true' in their spec are run on a pre-forked process pool instead.
+    Only the group results and changed state are sent back.
+    Tasks whose spec or state can't be pickled are run on the thread pool.
+
+    Tasks declaring resource classes (eg: 'cpu', 'disk:/mnt/backup')
+    are only submitted once a token of each is free,
+    from pools sized by settings.commands.run.resources, or the 'resources' kwarg.
+    Tasks waiting for tokens go back to the tracker, keeping their priority.
+    see resources.ResourceTokens.
+
+    With a memory budget (settings.commands.run.memory_budget, or the 'memory_budget' kwarg, eg: "16G"),
+    tasks are only submitted while the estimated memory of those in flight fits it,
+    see memory.MemoryBudget.
+
+    With snapshot=True (or settings.commands.run.snapshot),
+    a snapshot of the run is written to the temp location on SIGUSR1, see snapshot.SnapshotHandler.
+    """
+    workers     : int
+    processes   : int
+    snapshot    : bool
+    resources   : ResourceTokens
+    memory      : MemoryBudget
+    _pool       : Maybe[cf.Executor]
+    _procs      : Maybe[cf.Executor]
+    _in_flight  : dict[cf.Future, Task_p]
+    _submitted  : dict[cf.Future, int]
+    _remote     : set[cf.Future]
+
+    def __init__(self, *args:Any, workers:Maybe[int]=None, processes:Maybe[int]=None, snapshot:Maybe[bool]=None, resources:Maybe[Mapping[str, int]]=None, memory_budget:Maybe[int|str]=None, **kwargs:Any) -> None:  # noqa: PLR0913
+        super().__init__(*args, **kwargs)
+        self.resources   = ResourceTokens(configured_limits() if resources is None else resources)
+        self.memory      = MemoryBudget(default_memory if memory_budget is None else memory_budget,
+                                        estimates=self._memory_history())
+        self.snapshot    = use_snapshot if snapshot is None else snapshot
+        self.processes   = max(0, processes or default_procs)
+        self.workers     = max(1, workers or default_workers)
+        if self.processes and self.workers == 1:
+            # Processes are only used by the concurrent loop
+            self.workers = 1 + self.processes
+        self._pool       = None
+        self._procs      = None
+        self._in_flight  = {}
+        self._submitted  = {}
+        self._remote     = set()
+
+    def __call__(self, *args:Any, **kwargs:Any) -> Any:
+        with SnapshotHandler(self) if self.snapshot else nullcontext():
+            return super().__call__(*args, **kwargs)
 
     def run_next_task(self) -> None:
         """
           Get the next task from the tracker, expand/run it,
           and handle the result/failure
         """
+        match self.workers:
+            case 1:
+                self._run_task(self.tracker.next_for)
+            case _:
+                self._run_concurrent()
+
+    def _run_task(self, source:Callable[[], Maybe[Task_p|TaskArtifact]]) -> None:
         task = None
         try:
-            match (task:=self.tracker.next_for()):
+            match (task:=source()):
                 case None:
                     pass
                 case Task_p() as task:
@@ -110,17 +184,220 @@ class FSMRunner(DootRunner):
         except doot.errors.TaskError as err:
             err.task = task
             self.handle_failure(err)
+        except FSMDeadlock:
+            self._abort()
+            raise
         except doot.errors.DootError as err:
             self.handle_failure(err)
         except Exception as err:
-            doot.report.wf.fail()
-            self.tracker.clear()
+            self._abort()
             raise
         else:
             self.handle_task_success(task)
             self.sleep_after(task)
             self.large_step += 1
 
+    ##--| concurrent
+
+    def _run_concurrent(self) -> None:
+        """ Fill the worker pool with READY tasks,
+        then progress the machines of any that have finished their actions.
+
+        Doesn't return while tasks are in flight and the tracker has nothing queued,
+        so the outer loop only ends once everything is done.
+        """
+        inline = self._fill_pool()
+        for task in inline:
+            self._run_task(lambda t=task: t)
+
+        if not bool(inline):
+            self._harvest()
+
+        while bool(self._in_flight) and not bool(self.tracker):
+            self._harvest()
+
+        if not (bool(self._in_flight) or bool(self.tracker)):
+            self._shutdown_pool()
+
+    def _fill_pool(self) -> list[Task_p]:
+        """ Submit READY tasks to the pool until it is full.
+        Returns tasks which need progressing, but have no actions to hand to a worker.
+
+        Tasks are taken from the tracker in batches of the free worker slots.
+        If a batch can't be handled, its remaining tasks are re-queued.
+        As are tasks which couldn't get their resource tokens or memory, once the pool is full.
+        """
+        inline    : list[Task_p]                = []
+        batch     : list[Task_p|TaskArtifact]   = []
+        deferred  : list[Task_p]                = []
+        task                                    = None
+        try:
+            while len(self._in_flight) < self.workers:
+                batch = self.tracker.next_batch(self.workers - len(self._in_flight))
+                if not bool(batch):
+                    break
+                while bool(batch):
+                    match (task:=batch.pop(0)):
+                        case TaskArtifact():
+                            self._notify_artifact(task)
+                        case Task_p() if task in self._in_flight.values():
+                            pass
+                        case Task_p() as task if not self._needs_worker(task):
+                            inline.append(task)
+                        case Task_p() as task if not self._admit(task):
+                            deferred.append(task)
+                        case Task_p() as task:
+                            self._submit(task)
+                        case x:
+                            doot.report.gen.error("Unknown Value provided to runner: %s", x)
+        except doot.errors.TaskError as err:
+            err.task = task
+            self._requeue(batch)
+            self.handle_failure(err)
+        except FSMDeadlock:
+            self._abort()
+            raise
+        except doot.errors.DootError as err:
+            self._requeue(batch)
+            self.handle_failure(err)
+        except Exception:
+            self._abort()
+            raise
+
+        self._requeue(deferred)
+        return inline
+
+    def _abort(self) -> None:
+        """ Stop everything, before an error which can't be handled is raised """
+        doot.report.wf.fail()
+        self._shutdown_pool(cancel=True)
+        self.tracker.clear()
+
+    def _requeue(self, batch:list[Task_p|TaskArtifact]) -> None:
+        """ Return unhandled tasks of a batch to the tracker """
+        for x in batch:
+            match x:
+                case Task_p():
+                    self.tracker.queue(x.name)
+                case _:
+                    self.tracker.queue(x)
+
+    def _memory_history(self) -> Maybe[dict[str, int]]:
+        """ The recorded growth of templates, if the tracker keeps a history """
+        match getattr(self.tracker, "history", None):
+            case DurationHistory() as history:
+                return history.memory()
+            case _:
+                return None
+
+    def _admit(self, task:Task_p) -> bool:
+        """ Take a task's resource tokens, then its share of the memory budget, or neither """
+        if not self.resources.acquire(task):
+            return False
+        if not self.memory.admit(task):
+            self.resources.release(task)
+            return False
+
+        return True
+
+    def _release(self, task:Task_p) -> None:
+        self.resources.release(task)
+        self.memory.release(task)
+
+    def _needs_worker(self, task:Task_p) -> bool:
+        match self.tracker.machines[task.name].current_state_value:
+            case TaskStatus_e.READY:
+                return True
+            case TaskStatus_e.TEARDOWN:
+                return not task.state_is_needed(tracker=self.tracker)
+            case _:
+                return False
+
+    def _submit(self, task:Task_p) -> None:
+        """ Hand a task's groups to a process worker if it asks for one, and can be pickled,
+        otherwise to a thread worker
+        """
+        future  : cf.Future
+        phase   = self.tracker.machines[task.name].current_state_value
+        try:
+            match task.spec.extra.get(API.PROCESS_K, False):
+                case True if self.processes and (payload:=task.remote_payload(phase=phase)) is not None:
+                    future = self._executor(remote=True).submit(precompute_remote, payload)
+                    self._remote.add(future)
+                case _:
+                    future = self._executor().submit(task.precompute, phase=phase)
+        except Exception:
+            self._release(task)
+            raise
+
+        self._in_flight[future]  = task
+        self._submitted[future]  = time.monotonic_ns()
+
+    def _harvest(self) -> None:
+        """ Wait for at least one in flight task to finish its actions,
+        then progress the machines of all finished tasks on this thread
+        """
+        done : set[cf.Future]
+        if not bool(self._in_flight):
+            return
+
+        done, _ = cf.wait(self._in_flight, return_when=cf.FIRST_COMPLETED)
+        for future in done:
+            task = self._in_flight.pop(future)
+            self._submitted.pop(future, None)
+            if future in self._remote:
+                self._remote.discard(future)
+                self._merge_remote(task, future)
+
+            # After merging, so the growth measured on a process worker is learnt
+            self._release(task)
+            self._run_task(lambda t=task: t)
+
+    def _merge_remote(self, task:Task_p, future:cf.Future) -> None:
+        """ Apply a process worker's results to the local task.
+        If the worker couldn't return them, the task fails instead of re-running its actions.
+        """
+        try:
+            task.merge_remote(future.result())
+        except Exception as err:  # noqa: BLE001
+            failure = doot.errors.TaskError("Task %s: Process execution failed: %s", task.name[:], err, task=task.spec)
+            match self.tracker.machines[task.name].current_state_value:
+                case TaskStatus_e.READY:
+                    # Fail once running, not while checking dependencies
+                    task._precomputed[API.DEPENDS_GROUP]  = (0, ActRE.SUCCESS)
+                    task._precomputed[API.SETUP_GROUP]    = failure
+                case _:
+                    task._precomputed[API.CLEANUP_GROUP]  = failure
+
+    def _executor(self, *, remote:bool=False) -> cf.Executor:
+        if self.processes and self._procs is None:
+            # Fork the process workers before any threads exist
+            self._procs = cf.ProcessPoolExecutor(max_workers=self.processes, mp_context=mp.get_context("fork"))
+            self._procs.submit(int).result()
+
+        if remote:
+            assert(self._procs is not None)
+            return self._procs
+
+        if self._pool is None:
+            self._pool = cf.ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="fsm-runner")
+
+        return self._pool
+
+    def _shutdown_pool(self, *, cancel:bool=False) -> None:
+        for pool in [self._pool, self._procs]:
+            if pool is None:
+                continue
+            pool.shutdown(wait=not cancel, cancel_futures=cancel)
+        else:
+            self._pool   = None
+            self._procs  = None
+            self._in_flight.clear()
+            self._submitted.clear()
+            self._remote.clear()
+            self.resources.clear()
+            self.memory.clear()
+
     def handle_task_success[T:Maybe[Task_p|TaskArtifact]](self, task:T) -> None:
         # progress the teardown
         pass
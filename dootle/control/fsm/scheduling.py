@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Scheduling mixins for the FSMTracker.
+
+_CriticalPath_m ranks tasks by their longest weighted path to a sink of the network,
+so the tasks blocking the most downstream work are dispatched first.
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import logging as logmod
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+from doot.workflow._interface import TaskName_p
+
+# ##-- end 3rd party imports
+
+from . import _interface as API # noqa: N812
+from .history import history_key
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType, Never
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+
+# Body:
+
+class _CriticalPath_m:
+    """
+    Ranks nodes by: their duration + the max rank of their successors.
+
+    Durations come from, in order:
+    the 'durations' mapping (eg: historical timings, keyed by abstract task name),
+    the spec's declared 'duration',
+    or API.DEFAULT_DURATION.
+
+    Ranks are memoized, and updated incrementally (see _update_ranks) when the network grows.
+    """
+    critical_path  : bool
+    durations      : Mapping[str, float]
+    _ranks         : dict[Any, float]
+
+    def rank_of(self, name:Any) -> float:
+        """ The longest weighted path from a node to a sink, computed on demand """
+        if name in self._ranks:
+            return self._ranks[name]
+
+        stack   : list[tuple[Any, bool]]  = [(name, False)]
+        while bool(stack):
+            focus, expanded = stack.pop()
+            if focus in self._ranks:
+                continue
+            if expanded:
+                self._ranks[focus] = self._rank_from_succ(focus)
+                continue
+
+            stack.append((focus, True))
+            stack += [(x, False) for x in self._network.succ[focus] if x not in self._ranks and x != self._root_node]
+        else:
+            return self._ranks[name]
+
+    def duration_of(self, name:Any) -> float:
+        match name:
+            case TaskName_p() if (key:=history_key(name)) in self.durations:
+                return float(self.durations[key])
+            case TaskName_p() if name in self.machines:
+                return float(self.machines[name].model.spec.extra.get(API.DURATION_K, API.DEFAULT_DURATION))
+            case TaskName_p():
+                return API.DEFAULT_DURATION
+            case _: # Artifacts
+                return 0.0
+
+    def _rank_from_succ(self, name:Any) -> float:
+        succ = [self._ranks.get(x, 0.0) for x in self._network.succ[name] if x != self._root_node]
+        return self.duration_of(name) + max(succ, default=0.0)
+
+    def _update_ranks(self, region:Iterable[Any]) -> set[Any]:
+        """ Recompute the ranks of a changed region of the network,
+        propagating changes upstream only while ranks change.
+        Returns the nodes whose rank changed.
+        """
+        changed   : set[Any]  = set()
+        region    = list(region)
+        previous  = {x:self._ranks.pop(x) for x in region if x in self._ranks}
+        queue     = region[:]
+        while bool(queue):
+            focus  = queue.pop()
+            if focus == self._root_node:
+                continue
+            old    = previous.pop(focus, None) if focus in previous else self._ranks.pop(focus, None)
+            new    = self.rank_of(focus)
+            if old is not None and old == new:
+                continue
+            changed.add(focus)
+            queue += (x for x in self._network.pred[focus] if x in self._ranks)
+        else:
+            return changed
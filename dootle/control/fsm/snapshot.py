@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+On demand snapshots of a running FSMRunner, written on SIGUSR1 (kill -USR1 <pid>).
+
+Each snapshot is a text file in the temp location, listing:
+- the RSS (and peak RSS) of the process
+- tasks per TaskStatus_e
+- the longest waiting blocked tasks, and the unsettled dependencies they wait on
+- tasks in flight on the runner's workers, with their state and the time since they were submitted
+- RUNNING tasks, and the actions currently executing on each thread, with their elapsed times
+- the number of values in each postbox
+
+The snapshot is taken inside the signal handler, on the main thread,
+between two bytecodes of whatever the runner was doing.
+So it only reads, copying the tracker's dicts before iterating them,
+and the run continues once it is written.
+
+Enable with FSMRunner(snapshot=True), or commands.run.snapshot.
+Like jgdv's SignalHandler, SnapshotHandler is a context manager,
+installed for the duration of the runner's loop.
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import datetime
+import logging as logmod
+import os
+import pathlib as pl
+import signal
+import threading
+import time
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+from doot.workflow._interface import TaskStatus_e
+from jgdv.structs.dkey import DKey
+
+# ##-- end 3rd party imports
+
+from dootle.actions.postbox import _DootPostBox
+from .fsm_tracker import SETTLED_STATES
+from .memory import rss
+from .observe import HOOKS, Subscription
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType, Never
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from types import FrameType, TracebackType
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+SNAPSHOT_FILE  : Final[str]  = "fsm_snapshot_{pid}_{stamp}.txt"
+TOP            : Final[int]  = 20
+NS_MS          : Final[int]  = 1_000_000
+MIB            : Final[int]  = 1024 * 1024
+temp_key                     = DKey("temp!p", implicit=True)
+##--|
+
+class SnapshotHandler:
+    """ Writes a snapshot of a runner's state each time the process receives 'sig' (default SIGUSR1).
+
+    Tracks the actions in flight on each thread, through observe.HOOKS, while installed.
+    """
+    _previous      : Any
+    _running       : dict[int, tuple[str, str, Maybe[str], int]]
+    _subscription  : Maybe[Subscription]
+    runner         : Any
+    sig            : signal.Signals
+
+    def __init__(self, runner:Any, *, sig:signal.Signals=signal.SIGUSR1) -> None:
+        self.runner         = runner
+        self.sig            = sig
+        self._previous      = None
+        self._running       = {}
+        self._subscription  = None
+
+    def __enter__(self) -> Self:
+        if threading.current_thread() is not threading.main_thread():
+            logging.debug("[Snapshot] Not on the main thread, no handler installed")
+            return self
+
+        logging.debug("[Snapshot] Installing Snapshot Handler for: %s", signal.strsignal(self.sig))
+        self._subscription  = HOOKS.subscribe(action_start=self._on_action_start, action_end=self._on_action_end)
+        self._previous      = signal.signal(self.sig, self.handle)
+        return self
+
+    def __exit__(self, etype:Maybe[type], err:Maybe[Exception], tb:Maybe[TracebackType]) -> bool:
+        if self._subscription is None:
+            return False
+
+        signal.signal(self.sig, self._previous or signal.SIG_DFL)
+        HOOKS.unsubscribe(self._subscription)
+        self._subscription = None
+        self._running.clear()
+        return False
+
+    def handle(self, signum:int, frame:Maybe[FrameType]) -> None:  # noqa: ARG002
+        try:
+            path = self.write()
+        except Exception:
+            # Never let a snapshot stop the run
+            logging.exception("[Snapshot] Failed")
+        else:
+            logging.warning("[Snapshot] Written to: %s", path)
+
+    ##--| subscribers
+
+    def _on_action_start(self, model:Any, action:Any, group:Maybe[str]) -> None:
+        self._running[threading.get_ident()] = (model.name[:], str(action.do), group, time.monotonic_ns())
+
+    def _on_action_end(self, model:Any, action:Any, group:Maybe[str], result:Any, start_ns:int, end_ns:int) -> None:  # noqa: ARG002, PLR0913
+        self._running.pop(threading.get_ident(), None)
+
+    ##--| snapshot
+
+    def write(self, path:Maybe[pl.Path]=None) -> pl.Path:
+        """ Write a snapshot, returning where it was written """
+        stamp  = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")  # noqa: DTZ005
+        path   = path or (temp_key.expand() / SNAPSHOT_FILE.format(pid=os.getpid(), stamp=stamp))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("\n".join(self.lines()) + "\n")
+        return path
+
+    def lines(self) -> list[str]:
+        """ The snapshot, as lines of text """
+        now      = time.monotonic_ns()
+        tracker  = self.runner.tracker
+        current, peak = rss()
+        lines    = [
+            f"Snapshot : {datetime.datetime.now().isoformat()} : pid {os.getpid()}",  # noqa: DTZ005
+            f"RSS      : {'?' if current is None else f'{current / MIB:.1f}'} MiB (peak {peak / MIB:.1f} MiB)",
+            "",
+        ]
+        lines += self._tasks(tracker)
+        lines += self._waiting(tracker, now)
+        lines += self._active(tracker, now)
+        lines += self._postbox()
+        return lines
+
+    def _tasks(self, tracker:Any) -> list[str]:
+        counts    : dict[TaskStatus_e, int]  = dict.fromkeys(TaskStatus_e, 0)
+        machines  : list                     = list(tracker.machines.values())
+        for machine in machines:
+            counts[machine.current_state_value] += 1
+        for tomb in list(getattr(tracker, "tombstones", {}).values()):
+            counts[tomb.status] += 1
+
+        lines = ["Tasks per state:"]
+        lines += [f"  {status.name:<10} : {count}" for status, count in counts.items() if bool(count)]
+        lines.append("")
+        return lines
+
+    def _waiting(self, tracker:Any, now:int) -> list[str]:
+        blocked  = sorted(list(getattr(tracker, "_blocked_at", {}).items()), key=lambda x: x[1])
+        lines    = [f"Longest waiting blocked tasks ({len(blocked)} blocked) : ms : waiting on"]
+        for name, since in blocked[:TOP]:
+            deps = [str(dep) for dep, state in tracker._dependency_states_of(name) if state not in SETTLED_STATES]
+            lines.append(f"  {name} : {(now - since) / NS_MS:.1f} : {', '.join(deps) or '-'}")
+        else:
+            lines.append("")
+            return lines
+
+    def _active(self, tracker:Any, now:int) -> list[str]:
+        # Concurrent runners submit READY tasks, which stay READY until harvested
+        submitted  = getattr(self.runner, "_submitted", {})
+        flight     = sorted([(task, submitted.get(future, now)) for future, task in list(getattr(self.runner, "_in_flight", {}).items())],
+                            key=lambda x: x[1])
+        lines      = [f"In flight tasks ({len(flight)}) : state : ms since submitted"]
+        for task, since in flight[:TOP]:
+            match tracker.machines.get(task.name, None):
+                case None:
+                    state = "-"
+                case machine:
+                    state = machine.current_state_value.name
+            lines.append(f"  {task.name} : {state} : {(now - since) / NS_MS:.1f}")
+
+        running = [machine.model for machine in list(tracker.machines.values())
+                   if machine.current_state_value is TaskStatus_e.RUNNING]
+        lines.append(f"Running tasks ({len(running)}) : ms in RUNNING")
+        for task in sorted(running, key=lambda x: getattr(x, "_entered_ns", now))[:TOP]:
+            lines.append(f"  {task.name} : {(now - getattr(task, '_entered_ns', now)) / NS_MS:.1f}")
+
+        actions = sorted(list(self._running.values()), key=lambda x: x[3])
+        lines.append(f"Running actions ({len(actions)}) : task : action : group : ms elapsed")
+        for task, action, group, start in actions:
+            lines.append(f"  {task} : {action} : {group} : {(now - start) / NS_MS:.1f}")
+        else:
+            lines.append("")
+            return lines
+
+    def _postbox(self) -> list[str]:
+        boxes = list(_DootPostBox.boxes.items())
+        lines = [f"Postbox ({len(boxes)} boxes) : values"]
+        for box, subboxes in sorted(boxes):
+            lines.append(f"  {box} : {sum(len(vals) for vals in list(subboxes.values()))}")
+        else:
+            return lines
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+State structures for FSMTask's.
+
+StateOverlay is a copy-on-write view over a base mapping.
+It is used twice:
+- As a task's internal state, where the base is a ChainMap of shared, read only, layers
+  (eg: the spec's extra data, and a parent's state), and only what is unique to the task is written.
+- Given to each action in place of a copy of the task's state.
+  Only the keys an action changes are held by the overlay,
+  and only those are committed back to the task.
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import logging as logmod
+from collections import ChainMap
+from collections.abc import MutableMapping
+
+# ##-- end stdlib imports
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType, Never
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, Hashable
+
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+
+# Body:
+
+class StateOverlay(MutableMapping):
+    """
+    A copy-on-write layer over a base mapping.
+
+    Reads fall through to the base, unless the key was written or deleted in the overlay.
+    Writes and deletes are held locally, until commit() applies just them to the base.
+    Keys read are recorded (unless track=False), for debugging which state an action used.
+    """
+    __slots__ = ("_base", "_deleted", "_written", "read")
+    _base     : Mapping
+    _written  : dict
+    _deleted  : set
+    read      : Maybe[set]
+
+    def __init__(self, base:Mapping, local:Maybe[dict]=None, *, track:bool=True) -> None:
+        self._base     = base
+        self._written  = local or {}
+        self._deleted  = set()
+        self.read      = set() if track else None
+
+    @classmethod
+    def layered(cls, *layers:Maybe[Mapping]) -> StateOverlay:
+        """ Build an untracked overlay over shared layers, the first having the highest priority.
+        Layers are referenced, not copied.
+        """
+        return cls(ChainMap(*(x for x in layers if bool(x))), track=False)
+
+    @override
+    def __repr__(self) -> str:
+        return f"<StateOverlay: written={list(self._written)} deleted={list(self._deleted)} base={len(self._base)}>"
+
+    @override
+    def __getitem__(self, key:str) -> Any:
+        if self.read is not None:
+            self.read.add(key)
+        if key in self._written:
+            return self._written[key]
+        if key in self._deleted:
+            raise KeyError(key)
+        return self._base[key]
+
+    @override
+    def __setitem__(self, key:str, value:Any) -> None:
+        self._written[key] = value
+        self._deleted.discard(key)
+
+    @override
+    def __delitem__(self, key:str) -> None:
+        if key not in self:
+            raise KeyError(key)
+        self._written.pop(key, None)
+        if key in self._base:
+            self._deleted.add(key)
+
+    @override
+    def __contains__(self, key:object) -> bool:
+        if key in self._written:
+            return True
+        if key in self._deleted:
+            return False
+        return key in self._base
+
+    @override
+    def __iter__(self) -> Iterator[str]:
+        yield from self._written
+        for key in self._base:
+            if key in self._written or key in self._deleted:
+                continue
+            yield key
+
+    @override
+    def __len__(self) -> int:
+        added = sum(1 for x in self._written if x not in self._base)
+        return len(self._base) + added - len(self._deleted)
+
+    @property
+    def written(self) -> set[str]:
+        """ The keys set or deleted in the overlay """
+        return self._written.keys() | self._deleted
+
+    def changes(self) -> dict:
+        """ A copy of the values written in the overlay (eg: what a task's actions added to its state) """
+        return dict(self._written)
+
+    def commit(self) -> None:
+        """ Apply just the changed keys to the base mapping """
+        assert(isinstance(self._base, MutableMapping))
+        self._base.update(self._written)
+        for key in self._deleted:
+            self._base.pop(key, None)
+
+    def frozen(self) -> Mapping:
+        """ A snapshot of the overlay, to be used as another's layer.
+        Only the written keys are copied, the base is shared.
+        """
+        if bool(self._deleted):
+            return dict(self)
+        return ChainMap(dict(self._written), self._base)
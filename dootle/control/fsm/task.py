@@ -7,6 +7,7 @@ An FSM b acked Task and job
 from __future__ import annotations
 
 # ##-- stdlib imports
+import asyncio
 import atexit#  for @atexit.register
 import collections
 import contextlib
@@ -15,13 +16,17 @@ import enum
 import faulthandler
 import functools as ftz
 import hashlib
+import importlib
+import inspect
 import itertools as itz
 import logging as logmod
 import pathlib as pl
+import pickle
 import re
+import sys
 import time
 import types
-from collections import ChainMap
+from array import array
 from copy import deepcopy
 from uuid import UUID, uuid1
 from weakref import ref
@@ -44,6 +49,9 @@ from jgdv import Maybe, Mixin, Proto
 
 from doot.control.tracker import _interface as TrAPI # noqa: N812
 from . import _interface as API  # noqa: N812
+from .state import StateOverlay
+from .observe import HOOKS
+from .memory import rss_growth, rss_sample
 from .errors import FSMHalt, FSMSkip
 
 # ##-- types
@@ -82,6 +90,9 @@ logging = logmod.getLogger(__name__)
 skip_msg           : Final[str]  = doot.constants.printer.skip_by_condition_msg
 STATE_TASK_NAME_K  : Final[str]  = doot.constants.patterns.STATE_TASK_NAME_K
 ACTION_STEP_K      : Final[str]  = "_action_step"
+RECORD_STATE       : Final[bool] = doot.config.on_fail(False).commands.run.record_state() # noqa: FBT003
+
+_REMOTE_CTORS      : dict[str, type]  = {}
 # Body:
 
 class _Predicates_m:
@@ -159,6 +170,8 @@ class _Predicates_m:
     def state_is_needed(self, *, tracker:WorkflowTracker_p) -> bool:
         """ delays exit from teardown _internal_state until it is safe to do so """
         injs : set
+        if (pending:=getattr(tracker, "injections_pending", None)) is not None:
+            return pending(self.name)
         match tracker.specs[self.name]:
             case TrAPI.SpecMeta_d(injection_targets=set() as injs) if bool(injs):
                 return True
@@ -166,14 +179,38 @@ class _Predicates_m:
                 return False
 
 class _Callbacks_m:
-    _internal_state           : dict
+    _internal_state           : MutableMapping
     name            : TaskName_p
     spec            : TaskSpec
     _state_history  : list
+    _state_times    : array
+    _entered_ns     : int
+    status          : TaskStatus_e
 
     def on_exit_state(self, *, source:Any) -> None:
-        """ Keep track of the progression of the task """
+        """ Keep track of the progression of the task,
+        and when (in monotonic ns) it entered each state of its history
+        """
+        now = time.monotonic_ns()
         self._state_history.append(source.value)
+        self._state_times.append(self._entered_ns)
+        self._entered_ns = now
+
+    def state_durations(self) -> list[tuple[TaskStatus_e, int]]:
+        """ The states the task has passed through, with the ns spent in each.
+        The current state is included, up to now.
+        """
+        starts  = [*self._state_times, self._entered_ns]
+        ends    = [*starts[1:], time.monotonic_ns()]
+        return [(x, end - start) for x, start, end in zip([*self._state_history, self.status], starts, ends, strict=True)]
+
+    def on_enter_state(self, *, source:Any, target:Any, tracker:Maybe[WorkflowTracker_p]=None) -> None:
+        """ Let the tracker, and any transition subscribers, react to the task's progression """
+        if (hook:=HOOKS.transition) is not None:
+            hook(self, source.value, target.value)
+        # Not a runtime Protocol check, as this runs on every transition
+        if (notify:=getattr(tracker, "notify_state", None)) is not None:
+            notify(self.name, target.value)
 
     ##--| Standard Callbacks
 
@@ -181,47 +218,35 @@ class _Callbacks_m:
         """
         initialise _internal_state,
         possibly run injections?
+
+        The state is built from layers, which are shared rather than copied.
+        From highest priority: late injections, the task name and step, the spec's extra data,
+        parent data, cli params, then any state the task already had.
+        Writes go to a private layer, see StateOverlay.
         """
-        _task : Task_p
+        _task    : Task_p
+        layered  : StateOverlay
         assert(hasattr(self, "param_specs"))
         ##--|
-        internal_state = dict()
-        ##--| Get parent data (for cleanup tasks
-        match self._get_parent_data(tracker, parent):
-            case None:
-                pass
-            case dict() as pdata:
-                internal_state.update(pdata)
-        ##--| apply CLI params
-        match self._get_cli_data(tracker):
-            case None:
-                pass
-            case dict() as cdata:
-                # Apply CLI passed params, but only as the default
-                # So if override values have been injected, they are preferred
-                for x,y in cdata.items():
-                    internal_state.setdefault(x, y)
-
-        internal_state |= self._get_spec_data()
-
-        ##--| apply late injections
-        match self._get_inject_data(tracker):
-            case None:
-                pass
-            case dict() as idata:
-                internal_state.update(idata)
+        existing = {k:v for k,v in self._internal_state.items() if k != CLI_K}
+        # Apply CLI passed params, but only as the default
+        # So if override values have been injected, they are preferred
+        layered  = StateOverlay.layered(self._get_inject_data(tracker),
+                                        self._get_spec_data(),
+                                        self.spec.extra,
+                                        self._get_parent_data(tracker, parent),
+                                        self._get_cli_data(tracker),
+                                        existing)
 
         ##--| validate
         match self.spec.extra.get(MUST_INJECT_K, None):
             case None:
                 pass
-            case [*xs] if bool(missing:=[x for x in xs if x not in internal_state]):
+            case [*xs] if bool(missing:=[x for x in xs if x not in layered]):
                 raise doot.errors.TrackingError("Task did not receive required injections", self.spec.name, xs, self._internal_state.keys())
 
-        if CLI_K in self._internal_state:
-            del self._internal_state[CLI_K]
         ##--| Apply the state
-        self._internal_state |= internal_state
+        self._internal_state = layered
 
         ##--| build late actions
         self.prepare_actions() # type: ignore[attr-defined]
@@ -258,8 +283,10 @@ class _Callbacks_m:
             case x:
                 raise TypeError(type(x))
 
-        # Task is torn down, clear the _internal_state to remove its memory footprint
-        self._internal_state.clear()
+        # Task is torn down, drop the _internal_state and records to remove their memory footprint.
+        # (Replaced rather than cleared, as its layers may be shared)
+        self._internal_state = {}
+        self.records.clear()
 
     ##--| Branched callbacks
 
@@ -267,7 +294,7 @@ class _Callbacks_m:
         pass
 
     def on_enter_FAILED(self, *, tracker:WorkflowTracker_p) -> None:  # noqa: N802
-        # Propagate failure to upstream tasks (as HALTs?)
+        # Tasks downstream are halted in bulk by the tracker, see FSMTracker.notify_state
         ##--|
         # Perform fail actions
         match self._execute_action_group(group=API.FAIL_GROUP): # type: ignore[attr-defined]
@@ -277,23 +304,24 @@ class _Callbacks_m:
                 raise TypeError(type(x))
 
     def on_enter_HALTED(self, *, tracker:WorkflowTracker_p) -> None:  # noqa: N802
-        # Propagate halt to other upstream tasks
-        for _, _ in tracker._successor_states_of(self.name):
-            pass
-        else:
-            pass
+        # Tasks downstream are halted in bulk by the tracker, see FSMTracker.notify_state
+        pass
 
     def on_enter_SKIPPED(self) -> None:  # noqa: N802
         pass
 
     ##--| internal
 
-    def _get_parent_data(self, tracker:WorkflowTracker_p, parent:Maybe[TaskName_p]) -> Maybe[dict]:
+    def _get_parent_data(self, tracker:WorkflowTracker_p, parent:Maybe[TaskName_p]) -> Maybe[Mapping]:
         _task : Task_p
         match tracker.specs.get(parent, None):
             case TrAPI.SpecMeta_d(task=Task_p() as _task):
                 logging.info("Applying Parent State")
-                return _task.internal_state
+                match _task.internal_state:
+                    case StateOverlay() as pstate:
+                        return pstate.frozen()
+                    case pstate:
+                        return dict(pstate)
             case _:
                 return None
 
@@ -304,12 +332,11 @@ class _Callbacks_m:
         return cli_args
 
     def _get_spec_data(self) -> dict:
-        data = dict(self.spec.extra)
-        data |= {
+        """ The per task values that override the spec's extra data """
+        return {
             STATE_TASK_NAME_K  : self.spec.name,
             ACTION_STEP_K      : 0,
         }
-        return data
 
     def _get_inject_data(self, tracker:WorkflowTracker_p) -> Maybe[dict]:
         match tracker.specs[self.spec.name]:
@@ -322,22 +349,209 @@ class _Callbacks_m:
             case _:
                 return None
 
+class _Precompute_m:
+    """
+    Lets a runner execute a task's action groups ahead of its TaskMachine,
+    (eg: on a worker thread), while the machine itself is progressed on the main thread.
+
+    Results are stored by group name, and are returned by _execute_action_group
+    instead of running the group again.
+    Exceptions are stored and re-raised at the same point,
+    so the machine handles them as it would in a serial run.
+    As a DootError fails the task, the fail group is then run ahead of the machine as well.
+    """
+    _precomputed : dict[str, tuple|BaseException]
+    _timings     : dict[TaskStatus_e, tuple[int, int]]
+    _mem_grow    : int
+
+    def __init_subclass__(cls, **kwargs:Any) -> None:
+        # Register the class, so a process worker can rebuild instances of it
+        super().__init_subclass__(**kwargs)
+        _REMOTE_CTORS[f"{cls.__module__}:{cls.__qualname__}"] = cls
+
+    def precompute(self, *, phase:TaskStatus_e) -> None:
+        """ Run the action groups the machine will need when progressing from 'phase' """
+        group    : str
+        fn       : Callable
+        lock     : bool
+        outcome  : Any  = None
+        steps    = self._precompute_steps(phase)
+        with contextlib.suppress(StopIteration):
+            while True:
+                group, fn, lock = steps.send(outcome)
+                try:
+                    outcome = fn(group=group, lock_state=lock)
+                except Exception as err:  # noqa: BLE001
+                    outcome = err
+
+    async def aprecompute(self, *, phase:TaskStatus_e) -> None:
+        """ The async equivalent of precompute.
+        Groups with a coroutine equivalent (see _async_step) are run with their async actions awaited,
+        any others are run in the loop's executor.
+        The phase's timings include the steps of other tasks interleaved on the loop.
+        """
+        group    : str
+        fn       : Callable
+        lock     : bool
+        outcome  : Any  = None
+        loop     = asyncio.get_running_loop()
+        steps    = self._precompute_steps(phase)
+        with contextlib.suppress(StopIteration):
+            while True:
+                group, fn, lock = steps.send(outcome)
+                try:
+                    match self._async_step(fn):
+                        case None:
+                            outcome = await loop.run_in_executor(None, ftz.partial(fn, group=group, lock_state=lock))
+                        case afn:
+                            outcome = await afn(group=group, lock_state=lock)
+                except Exception as err:  # noqa: BLE001
+                    outcome = err
+
+    def _async_step(self, fn:Callable) -> Maybe[Callable]:
+        """ The coroutine equivalent of a step of the plan, if it has one """
+        if fn == self._execute_action_group: # type: ignore[attr-defined]
+            return self._aexecute_action_group # type: ignore[attr-defined,no-any-return]
+        return None
+
+    def _precompute_steps(self, phase:TaskStatus_e) -> Generator[tuple[str, Callable, bool], Any, None]:
+        """ The plan of a phase, and its bookkeeping, shared by precompute and aprecompute.
+        Yields each group to run, and is sent its result, or the error it raised.
+        """
+        group   : str
+        fn      : Callable
+        lock    : bool
+        wall    : int  = time.perf_counter_ns()
+        cpu     : int  = time.thread_time_ns()
+        mem     : tuple[int, int] = rss_sample()
+        try:
+            for group, fn, lock in self._precompute_plan(phase):
+                result = yield group, fn, lock
+                self._precomputed[group] = result
+                match group, result:
+                    case API.SETUP_GROUP | API.ACTION_GROUP, doot.errors.DootError():
+                        # The machine will fail the task, so its fail group is run here as well
+                        self._precomputed[API.FAIL_GROUP] = yield API.FAIL_GROUP, self._execute_action_group, False # type: ignore[attr-defined]
+                        return
+                    case _, BaseException():
+                        return
+                    case API.DEPENDS_GROUP, (_, ActRE.SKIP | ActRE.FAIL):
+                        return
+                    case API.SETUP_GROUP, (_, ActRE.SKIP | ActRE.SKIP_TASK):
+                        return
+                    case _:
+                        pass
+        finally:
+            # Timed on the worker, as the phase's time on the main thread is just collecting results
+            self._timings[phase] = (time.perf_counter_ns() - wall, time.thread_time_ns() - cpu)
+            # For memory budgets, see memory.MemoryBudget
+            self._mem_grow = max(self._mem_grow, rss_growth(mem))
+
+    def _precompute_plan(self, phase:TaskStatus_e) -> list[tuple[str, Callable, bool]]:
+        match phase:
+            case TaskStatus_e.READY:
+                return [
+                    (API.DEPENDS_GROUP, self._execute_action_group, True),  # type: ignore[attr-defined]
+                    (API.SETUP_GROUP,   self._execute_action_group, False), # type: ignore[attr-defined]
+                    (API.ACTION_GROUP,  self._execute_action_group, False), # type: ignore[attr-defined]
+                ]
+            case TaskStatus_e.TEARDOWN:
+                return [(API.CLEANUP_GROUP, self._execute_action_group, False)] # type: ignore[attr-defined]
+            case _:
+                return []
+
+    def remote_payload(self, *, phase:TaskStatus_e) -> Maybe[bytes]:
+        """ Pickle what a process worker needs to run this task's groups.
+        Returns None if the spec or state can't be pickled
+        """
+        cls  = type(self)
+        key  = f"{cls.__module__}:{cls.__qualname__}"
+        try:
+            return pickle.dumps((key, self.spec, dict(self._internal_state), phase)) # type: ignore[attr-defined]
+        except Exception as err:  # noqa: BLE001
+            logging.debug("Task can't be sent to a process, running locally: %s : %s", self.spec.name[:], err) # type: ignore[attr-defined]
+            return None
+
+    def merge_remote(self, result:tuple[dict, dict, set, dict, int]) -> None:
+        """ Apply the group results, state delta, timings and memory growth returned by precompute_remote """
+        precomputed, delta, removed, timings, grown = result
+        self._precomputed.update(precomputed)
+        self._timings.update(timings)
+        self._mem_grow = max(self._mem_grow, grown)
+        self._internal_state.update(delta) # type: ignore[attr-defined]
+        for key in removed:
+            self._internal_state.pop(key, None) # type: ignore[attr-defined]
+
+    def _pop_precomputed(self, group:str) -> Maybe[tuple]:
+        """ Get the stored result of a group, re-raising any stored error """
+        match self._precomputed.pop(group, None):
+            case None:
+                return None
+            case BaseException() as err:
+                raise err
+            case x:
+                return x
+
+def _is_async(fun:Any) -> bool:
+    """ Whether an action's callable is a coroutine function, or an instance with an 'async __call__' """
+    return inspect.iscoroutinefunction(fun) or inspect.iscoroutinefunction(getattr(type(fun), "__call__", None))
+
+def precompute_remote(payload:bytes) -> tuple[dict, dict, set, dict, int]:
+    """ The process worker side of _Precompute_m.remote_payload.
+
+    Rebuilds the task, runs its groups,
+    and returns the group results, with only the keys of the state that changed.
+    Values are compared by their pickled form, so changes made in place (eg: appending to a list) are returned.
+    """
+    # Subscribers belong to the parent process (eg: its trace file)
+    HOOKS.clear()
+    key, spec, state, phase      = pickle.loads(payload)  # noqa: S301
+    importlib.import_module(key.split(":")[0])
+    task                         = _REMOTE_CTORS[key](spec)
+    before                       = {k:pickle.dumps(v) for k,v in state.items()}
+    task._internal_state.update(state)
+    task.prepare_actions()
+    task.precompute(phase=phase)
+    delta    = {k:v for k,v in task._internal_state.items() if before.get(k, None) != pickle.dumps(v)}
+    removed  = state.keys() - task._internal_state.keys()
+    return task._precomputed, delta, removed, task._timings, task._mem_grow
+
 ##--|
 
 @Proto(Task_i, API.TaskModel_p)
-@Mixin(_Predicates_m, _Callbacks_m, _TaskActionPrep_m)
+@Mixin(_Predicates_m, _Callbacks_m, _Precompute_m, _TaskActionPrep_m)
 class FSMTask:
     """
     The implementation of a task, as the domain model for a TaskMachine
+
+    Its hash and readable name are computed once,
+    as tasks are constantly hashed and compared as keys of the tracker's dicts and network.
+    Comparing to the readable name, or to the spec's name object, is an identity check.
+
+    The keys each action reads and writes are added to the task's records
+    when debugging, or when record_state is set (from commands.run.record_state).
+
+    Per task overhead is measured by __tests/bench_task.py, which reports the machine it ran on.
+    Besides the spec it shares with the registry, each task holds:
+    an instance dict (jgdv's Mixin builds an unslotted subclass), its state dict,
+    state history list and times array, records list, and precomputed and timings dicts.
     """
     _default_flags   : ClassVar[set]  = set()
+    record_state     : ClassVar[bool] = RECORD_STATE
     step             : int
     spec             : TaskSpec
     status           : TaskStatus_e
     priority         : int
     records          : list[Any]
-    _internal_state  : dict
+    _internal_state  : MutableMapping
     _state_history   : list[TaskStatus_e]
+    _state_times     : array
+    _entered_ns      : int
+    _precomputed     : dict[str, tuple|BaseException]
+    _timings         : dict[TaskStatus_e, tuple[int, int]]
+    _mem_grow        : int
+    _hash            : int
+    _readable        : str
 
     def __init__(self, spec:TaskSpec):
         self.step        = -1
@@ -347,7 +561,14 @@ class FSMTask:
         self.status          = TaskStatus_e.NAMED
         self._internal_state           = {}
         self._state_history  = []
+        self._state_times    = array("q")
+        self._entered_ns     = time.monotonic_ns()
         self.records         = []
+        self._precomputed    = {}
+        self._timings        = {}
+        self._mem_grow       = 0
+        self._hash           = hash(spec.name)
+        self._readable       = sys.intern(spec.name[:])
         assert(self.priority > 0)
 
     @property
@@ -355,34 +576,31 @@ class FSMTask:
         return self.spec.name
 
     @property
-    def internal_state(self) -> dict:
+    def internal_state(self) -> MutableMapping:
         return self._internal_state
     ##--| dunders
 
     @override
     def __repr__(self) -> str:
         cls  = self.__class__.__qualname__
-        return f"<{cls}: {self.spec.name[:]}>"
+        return f"<{cls}: {self._readable}>"
 
     @override
     def __hash__(self) -> int:
-        return hash(self.spec.name)
+        return self._hash
 
     @override
     def __eq__(self, other:object) -> bool:
-        result : bool = False
+        if other is self or other is self._readable or other is self.spec.name:
+            return True
+
         match other:
             case str() | TaskName():
-                full      = self.spec.name
-                readable  = self.spec.name[:]
-                result    = other in {full, readable}
-                return result
+                return other == self.spec.name or other == self._readable
             case Task_p():
-                result = self.spec.name == other.spec.name
+                return self.spec.name == other.spec.name
             case _:
-                pass
-
-        return result
+                return False
 
     ##--| internal
 
@@ -390,6 +608,47 @@ class FSMTask:
         """ Execute a group of actions, possibly queue any task specs they produced,
         and return a count of the actions run + the result
         """
+        count   : int
+        action  : ActionSpec
+        result  : Any  = None
+        match self._pop_precomputed(group):
+            case None:
+                pass
+            case x:
+                return x
+
+        steps = self._action_steps(group)
+        try:
+            while True:
+                count, action = steps.send(result)
+                result = self._execute_action(count, action, group=group, lock_state=lock_state)
+        except StopIteration as done:
+            return done.value
+
+    async def _aexecute_action_group(self, *, group:str, lock_state:bool=False) -> tuple[int, ActRE]:
+        """ The async equivalent of _execute_action_group """
+        count   : int
+        action  : ActionSpec
+        result  : Any  = None
+        match self._pop_precomputed(group):
+            case None:
+                pass
+            case x:
+                return x
+
+        steps = self._action_steps(group)
+        try:
+            while True:
+                count, action = steps.send(result)
+                result = await self._aexecute_action(count, action, group=group, lock_state=lock_state)
+        except StopIteration as done:
+            return done.value
+
+    def _action_steps(self, group:str) -> Generator[tuple[int, ActionSpec], Any, tuple[int, ActRE]]:
+        """ The loop over a group's actions, shared by _execute_action_group and _aexecute_action_group.
+        Yields each action to run with its count, and is sent the action's result.
+        Returns the count of actions run + the group's result.
+        """
         x               : Any
         actions         : list[ActionSpec]
         group_result    : ActRE = ActRE.SUCCESS
@@ -403,6 +662,8 @@ class FSMTask:
             case x:
                 raise TypeError(type(x))
 
+        group_hook  = HOOKS.group_end
+        start       = time.monotonic_ns() if group_hook is not None else 0
         for action in actions:
             match action:
                 case ActionSpec():
@@ -410,7 +671,7 @@ class FSMTask:
                 case _: # Ignore relationspecs
                     continue
 
-            match self._execute_action(executed_count, action, group=group, lock_state=lock_state):
+            match (yield executed_count, action):
                 case True | None:
                     continue
                 case False:
@@ -426,6 +687,8 @@ class FSMTask:
             executed_count += 1
 
         ##--|
+        if group_hook is not None:
+            group_hook(self, group, executed_count, group_result, start, time.monotonic_ns())
         return executed_count, group_result
 
     def _execute_action(self, count:int, action:ActionSpec, *, group:Maybe[str]=None, lock_state:bool=False) -> ActRE|bool|list[TaskSpec]:
@@ -434,11 +697,63 @@ class FSMTask:
           returns either a list of specs to (potentially) queue,
           or an ActRE describing the action result.
 
+          Async actions can't be run here, they are awaited by _aexecute_action.
+        """
+        result  : Maybe[bool|ActRE|dict|list]
+        _internal_state   : StateOverlay
+        assert(callable(action))
+        _internal_state = self._prepare_action_state(count, action, group=group)
+        if (start_hook:=HOOKS.action_start) is not None:
+            start_hook(self, action, group)
+        end_hook  = HOOKS.action_end
+        start     = time.monotonic_ns() if end_hook is not None else 0
+        match (result:=action(_internal_state)):
+            case x if inspect.isawaitable(x):
+                if inspect.iscoroutine(x):
+                    x.close()
+                raise doot.errors.TaskError("Task %s: Action %s is async, and needs the AsyncFSMRunner", self.spec.name[:], action.do, task=self.spec)
+            case _:
+                pass
+
+        if end_hook is not None:
+            end_hook(self, action, group, result, start, time.monotonic_ns())
+
+        return self._handle_action_result(action, _internal_state, result, lock_state=lock_state)
+
+    async def _aexecute_action(self, count:int, action:ActionSpec, *, group:Maybe[str]=None, lock_state:bool=False) -> ActRE|bool|list[TaskSpec]:
+        """ Run the given action of a specific task, in the running event loop.
+
+          Async actions are awaited,
+          plain callables are run in the loop's default executor.
         """
         result  : Maybe[bool|ActRE|dict|list]
-        _internal_state   : ChainMap
+        _internal_state   : StateOverlay
         assert(callable(action))
-        _internal_state = ChainMap({ACTION_STEP_K : count}, self._internal_state)
+        loop             = asyncio.get_running_loop()
+        _internal_state  = self._prepare_action_state(count, action, group=group)
+        if (start_hook:=HOOKS.action_start) is not None:
+            start_hook(self, action, group)
+        end_hook  = HOOKS.action_end
+        start     = time.monotonic_ns() if end_hook is not None else 0
+        match action.fun:
+            case fun if _is_async(fun):
+                result = await action(_internal_state)
+            case _:
+                result = await loop.run_in_executor(None, action, _internal_state)
+
+        match result:
+            case x if inspect.isawaitable(x):
+                # eg: a sync wrapper around an async function
+                result = await x
+            case _:
+                pass
+
+        if end_hook is not None:
+            end_hook(self, action, group, result, start, time.monotonic_ns())
+
+        return self._handle_action_result(action, _internal_state, result, lock_state=lock_state)
+
+    def _prepare_action_state(self, count:int, action:ActionSpec, *, group:Maybe[str]=None) -> StateOverlay:
         match group:
             case str():
                 doot.report.wf.act(f"Action: {self.step}.{group}.{count}", action.do)
@@ -447,7 +762,16 @@ class FSMTask:
 
         logging.debug("Action Executing for Task: %s", self.spec.name[:])
         logging.debug("Action State: %s.%s: args=%s kwargs=%s. _internal_state(size)=%s", self.step, count, action.args, dict(action.kwargs), len(self._internal_state.keys()))
-        match (result:=action(_internal_state)):
+        # Reads are only tracked for the records, when debugging or asked for
+        track = self.record_state or logging.isEnabledFor(logmod.DEBUG)
+        return StateOverlay(self._internal_state, {ACTION_STEP_K : count}, track=track)
+
+    def _handle_action_result(self, action:ActionSpec, _internal_state:StateOverlay, result:Any, *, lock_state:bool=False) -> ActRE|bool|list[TaskSpec]:
+        """ Convert the result of an action,
+        committing just the keys it changed to the task's state, unless the state is locked.
+        If the overlay tracked its reads, the keys read and written are added to the task's records.
+        """
+        match result:
             case None | True:
                 result = ActRE.SUCCESS
             case False | ActRE.FAIL:
@@ -467,8 +791,11 @@ class FSMTask:
             case True:
                 pass
             case False:
-                self._internal_state |= _internal_state
+                _internal_state.commit()
 
+        if _internal_state.read is not None:
+            self.records.append((action.do, frozenset(_internal_state.read), frozenset(_internal_state.written - {ACTION_STEP_K})))
+            logging.debug("Action State Access: %s : read=%s written=%s", action.do, *self.records[-1][1:])
         return result
 
     def get_action_group(self, group_name:str) -> list[ActionSpec]:
@@ -510,8 +837,10 @@ class FSMJob(FSMTask):
             case x:
                 raise TypeError(type(x))
 
-        match self._execute_expansion_group(group=API.ACTION_GROUP):
-            case int() as count, [*xs]: # Queue new subtasks
+        match self._execute_expansion_group(group=API.ACTION_GROUP), tracker:
+            case (int(), [*xs]), API.SubgraphInserter_p(): # Add new subtasks to the network
+                tracker.insert_subgraph(xs, parent=self.spec.name)
+            case (int(), [*xs]), _: # Queue new subtasks
                 for x in xs:
                     tracker.queue(x, parent=self.spec.name)
                 else:
@@ -519,10 +848,63 @@ class FSMJob(FSMTask):
             case x:
                 raise TypeError(type(x))
 
-    def _execute_expansion_group(self, *, group:str) -> tuple[int, list[TaskSpec]]:
+    @override
+    def _precompute_plan(self, phase:TaskStatus_e) -> list[tuple[str, Callable, bool]]:
+        match phase:
+            case TaskStatus_e.READY:
+                return [
+                    (API.DEPENDS_GROUP, self._execute_action_group, True),
+                    (API.SETUP_GROUP,   self._execute_action_group, False),
+                    (API.ACTION_GROUP,  self._execute_expansion_group, False),
+                ]
+            case _:
+                return super()._precompute_plan(phase)
+
+    def _execute_expansion_group(self, *, group:str, lock_state:bool=False) -> tuple[int, list[TaskSpec]]:  # noqa: ARG002
         """ Execute a group of actions, possibly queue any task specs they produced,
         and return a count of the actions run + the result
         """
+        count   : int
+        action  : ActionSpec
+        result  : Any  = None
+        match self._pop_precomputed(group):
+            case None:
+                pass
+            case x:
+                return x
+
+        steps = self._expansion_steps(group)
+        try:
+            while True:
+                count, action = steps.send(result)
+                result = self._execute_action(count, action, group=group, lock_state=False)
+        except StopIteration as done:
+            return done.value
+
+    async def _aexecute_expansion_group(self, *, group:str, lock_state:bool=False) -> tuple[int, list[TaskSpec]]:  # noqa: ARG002
+        """ The async equivalent of _execute_expansion_group """
+        count   : int
+        action  : ActionSpec
+        result  : Any  = None
+        match self._pop_precomputed(group):
+            case None:
+                pass
+            case x:
+                return x
+
+        steps = self._expansion_steps(group)
+        try:
+            while True:
+                count, action = steps.send(result)
+                result = await self._aexecute_action(count, action, group=group, lock_state=False)
+        except StopIteration as done:
+            return done.value
+
+    def _expansion_steps(self, group:str) -> Generator[tuple[int, ActionSpec], Any, tuple[int, list[TaskSpec]]]:
+        """ The loop over a job's expansion actions,
+        shared by _execute_expansion_group and _aexecute_expansion_group.
+        Yields each action to run with its count, and is sent the action's result.
+        """
         actions         : list[ActionSpec]
         to_queue        : list[TaskSpec]  = []
         executed_count  : int             = 0
@@ -542,7 +924,7 @@ class FSMJob(FSMTask):
                 case _:
                     continue
 
-            match self._execute_action(executed_count, action, group=group, lock_state=False):
+            match (yield executed_count, action):
                 case True | None:
                     continue
                 case list() as result:
@@ -559,3 +941,9 @@ class FSMJob(FSMTask):
 
         ##--|
         return executed_count, to_queue
+
+    @override
+    def _async_step(self, fn:Callable) -> Maybe[Callable]:
+        if fn == self._execute_expansion_group:
+            return self._aexecute_expansion_group
+        return super()._async_step(fn)
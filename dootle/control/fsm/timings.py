@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Where tasks spent their time, per state, summed across tasks.
+
+FSMTask's record when they entered each state of their _state_history (see FSMTask.state_durations).
+The FSMTracker adds each task to its StateTimes as it dies,
+keyed by template name (so the subtasks of a job are summed together).
+
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import logging as logmod
+from typing import NamedTuple
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+from doot.workflow._interface import TaskStatus_e
+
+# ##-- end 3rd party imports
+
+from .history import history_key
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType, Never
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from doot.workflow._interface import Task_p
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+COUNT_I  : Final[int]  = 0
+TOTAL_I  : Final[int]  = 1
+MAX_I    : Final[int]  = 2
+NS_MS    : Final[int]  = 1_000_000
+##--|
+
+class Timing_d(NamedTuple):
+    """ The time spent in a state, over count visits """
+    count     : int
+    total_ns  : int
+    max_ns    : int
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.count if self.count else 0.0
+
+class StateTimes:
+    """ Sums of the ns tasks spent in each state, per template """
+    __slots__ = ("_templates",)
+    _templates : dict[str, dict[TaskStatus_e, list[int]]]
+
+    def __init__(self) -> None:
+        self._templates = {}
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def add(self, task:Task_p) -> None:
+        """ Add the state durations of a task """
+        states  : dict[TaskStatus_e, list[int]]
+        match getattr(task, "state_durations", None):
+            case None:
+                return
+            case durations:
+                pass
+
+        states = self._templates.setdefault(history_key(task.name), {})
+        for status, ns in durations():
+            match states.get(status, None):
+                case None:
+                    states[status] = [1, ns, ns]
+                case entry:
+                    entry[COUNT_I] += 1
+                    entry[TOTAL_I] += ns
+                    entry[MAX_I]    = max(entry[MAX_I], ns)
+
+    def by_template(self) -> dict[str, dict[TaskStatus_e, Timing_d]]:
+        return {name : {status : Timing_d(*entry) for status, entry in states.items()}
+                for name, states in self._templates.items()}
+
+    def by_state(self) -> dict[TaskStatus_e, Timing_d]:
+        """ Time per state, across all templates """
+        result : dict[TaskStatus_e, list[int]] = {}
+        for states in self._templates.values():
+            for status, (count, total, most) in states.items():
+                match result.get(status, None):
+                    case None:
+                        result[status] = [count, total, most]
+                    case entry:
+                        entry[COUNT_I] += count
+                        entry[TOTAL_I] += total
+                        entry[MAX_I]    = max(entry[MAX_I], most)
+        else:
+            return {status : Timing_d(*result[status]) for status in TaskStatus_e if status in result}
+
+    def report(self, *, top:int=10) -> list[str]:
+        """ Lines summarising time per state, then the templates with the most time outside RUNNING """
+        lines  : list[str]  = ["State Times (ms):"]
+        for status, timing in self.by_state().items():
+            lines.append(f"  {status.name:<10} : total {timing.total_ns / NS_MS:>12.1f} "
+                         f": mean {timing.mean_ns / NS_MS:>10.3f} "
+                         f": max {timing.max_ns / NS_MS:>10.1f} "
+                         f": n {timing.count}")
+
+        def _waiting(item:tuple[str, dict]) -> int:
+            return sum(entry[TOTAL_I] for status, entry in item[1].items() if status is not TaskStatus_e.RUNNING)
+
+        lines.append(f"Top {top} Templates by time outside RUNNING (ms):")
+        for name, states in sorted(self._templates.items(), key=_waiting, reverse=True)[:top]:
+            parts = ", ".join(f"{status.name}={entry[TOTAL_I] / NS_MS:.1f}"
+                              for status, entry in sorted(states.items(), key=lambda x: x[1][TOTAL_I], reverse=True))
+            lines.append(f"  {name} : {parts}")
+        else:
+            return lines
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Opt-in export of task lifetimes as Chrome trace-event JSON,
+viewable in Perfetto (ui.perfetto.dev) or chrome://tracing.
+
+Each task is an async span from its creation to its death,
+with nested spans for each state it passed through (see FSMTask.state_durations).
+Action groups, and the actions within them, are complete events
+on the track of the thread (main or worker) that ran them.
+Groups and actions which end in a coroutine (ie: under the AsyncFSMRunner)
+would overlap on the event loop's thread, so are instead async spans,
+with the id of their task.
+
+Events are buffered, and written in chunks, as the streaming form of the format
+(a json array, which viewers accept without its closing bracket if a run is killed).
+All timestamps are time.monotonic_ns, converted to the format's microseconds.
+
+Enable with FSMTracker(trace=True|path), or commands.run.trace,
+which attaches the writer to the observe.HOOKS events.
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import asyncio
+import json
+import logging as logmod
+import os
+import pathlib as pl
+import threading
+import time
+import weakref
+
+# ##-- end stdlib imports
+
+# ##-- 3rd party imports
+import doot
+from doot.workflow._interface import TaskStatus_e
+from jgdv.structs.dkey import DKey
+
+# ##-- end 3rd party imports
+
+from .observe import HOOKS, Subscription
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType, Never
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from doot.workflow._interface import Task_p
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+TRACE_FILE   : Final[str]  = "fsm_trace.json"
+FLUSH_EVERY  : Final[int]  = doot.config.on_fail(10_000).commands.run.trace_batch()
+NS_US        : Final[int]  = 1_000
+TASK_CAT     : Final[str]  = "task"
+GROUP_CAT    : Final[str]  = "group"
+ACTION_CAT   : Final[str]  = "action"
+temp_key                   = DKey("temp!p", implicit=True)
+##--|
+
+def _in_coroutine() -> bool:
+    """ Whether the caller is running in a coroutine, on an event loop """
+    try:
+        return asyncio.current_task() is not None
+    except RuntimeError:
+        return False
+
+class _Sink:
+    """ The open trace file. Separate from the writer so it can be closed on finalization """
+    __slots__ = ("fh", "started")
+
+    def __init__(self, path:pl.Path) -> None:
+        self.fh       = path.open("w")
+        self.started  = False
+        self.fh.write("[\n")
+
+    def write(self, events:list[dict]) -> None:
+        """ Write and clear a chunk of events """
+        if self.fh.closed or not bool(events):
+            return
+        chunk, events[:] = events[:], []
+        text = ",\n".join(json.dumps(x, separators=(",", ":")) for x in chunk)
+        self.fh.write(f",\n{text}" if self.started else text)
+        self.fh.flush()
+        self.started = True
+
+    def close(self, events:list[dict]) -> None:
+        if self.fh.closed:
+            return
+        self.write(events)
+        self.fh.write("\n]\n")
+        self.fh.close()
+
+##--|
+
+class TraceWriter:
+    """ Buffers trace events, and appends them to the trace file in chunks.
+
+    Events can be added from any thread.
+    Each thread is given its own track, named after the thread.
+    """
+    _buffer       : list[dict]
+    _flush_every  : int
+    _lock         : threading.Lock
+    _pid          : int
+    _sink         : _Sink
+    _tracks       : dict[int, int]
+    path          : pl.Path
+
+    def __init__(self, path:Maybe[pl.Path]=None, *, flush_every:Maybe[int]=None) -> None:
+        self.path          = path or (temp_key.expand() / TRACE_FILE)
+        self._flush_every  = flush_every or FLUSH_EVERY
+        self._buffer       = []
+        self._lock         = threading.Lock()
+        self._pid          = os.getpid()
+        self._tracks       = {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._sink         = _Sink(self.path)
+        self._buffer.append({"ph": "M", "name": "process_name", "pid": self._pid, "args": {"name": "doot"}})
+        # Write remaining events when collected, or on exit
+        weakref.finalize(self, self._sink.close, self._buffer)
+
+    ##--| events
+
+    def complete(self, name:str, cat:str, start_ns:int, end_ns:int, *, args:Maybe[dict]=None) -> None:
+        """ A span on the current thread's track """
+        event = {"ph": "X", "name": name, "cat": cat, "pid": self._pid, "tid": self._track(),
+                 "ts": start_ns / NS_US, "dur": (end_ns - start_ns) / NS_US}
+        if args:
+            event["args"] = args
+        self._add(event)
+
+    def span(self, task:Task_p, name:str, cat:str, start_ns:int, end_ns:int, *, args:Maybe[dict]=None) -> None:  # noqa: PLR0913
+        """ An async span, on the track of the task's id, as a task's spans don't overlap """
+        ident  = f"{hash(task):x}"
+        begin  = {"ph": "b", "name": name, "cat": cat, "id": ident, "pid": self._pid, "tid": 0, "ts": start_ns / NS_US}
+        if args:
+            begin["args"] = args
+        self._add(begin, {"ph": "e", "name": name, "cat": cat, "id": ident, "pid": self._pid, "tid": 0, "ts": end_ns / NS_US})
+
+    def task(self, task:Task_p) -> None:
+        """ Add a task's lifetime, and the states it passed through, as nested async spans """
+        durations  : list
+        match getattr(task, "state_durations", None):
+            case None:
+                return
+            case x:
+                durations = x()
+
+        if not bool(durations):
+            return
+
+        ident   = f"{hash(task):x}"
+        name    = task.name[:]
+        start   = task._state_times[0] if bool(task._state_times) else task._entered_ns
+        events  = [{"ph": "b", "name": name, "cat": TASK_CAT, "id": ident, "pid": self._pid, "tid": 0, "ts": start / NS_US}]
+        now     = start
+        for status, ns in durations:
+            events.append({"ph": "b", "name": status.name, "cat": TASK_CAT, "id": ident, "pid": self._pid, "tid": 0, "ts": now / NS_US})
+            now += ns
+            events.append({"ph": "e", "name": status.name, "cat": TASK_CAT, "id": ident, "pid": self._pid, "tid": 0, "ts": now / NS_US})
+        else:
+            events.append({"ph": "e", "name": name, "cat": TASK_CAT, "id": ident, "pid": self._pid, "tid": 0, "ts": now / NS_US})
+
+        self._add(*events)
+
+    ##--| subscribers
+
+    def attach(self) -> Subscription:
+        """ Subscribe to task deaths, and action and group ends """
+        return HOOKS.subscribe(transition=self._on_transition, action_end=self._on_action, group_end=self._on_group)
+
+    def _on_transition(self, model:Any, source:TaskStatus_e, target:TaskStatus_e) -> None:  # noqa: ARG002
+        if target is TaskStatus_e.DEAD:
+            self.task(model)
+
+    def _on_action(self, model:Any, action:Any, group:Maybe[str], result:Any, start_ns:int, end_ns:int) -> None:  # noqa: ARG002, PLR0913
+        if _in_coroutine():
+            self.span(model, str(action.do), ACTION_CAT, start_ns, end_ns)
+        else:
+            self.complete(str(action.do), ACTION_CAT, start_ns, end_ns)
+
+    def _on_group(self, model:Any, group:str, count:int, result:Any, start_ns:int, end_ns:int) -> None:  # noqa: PLR0913
+        name  = f"{model.name[:]}.{group}"
+        args  = {"count": count, "result": result.name}
+        if _in_coroutine():
+            self.span(model, name, GROUP_CAT, start_ns, end_ns, args=args)
+        else:
+            self.complete(name, GROUP_CAT, start_ns, end_ns, args=args)
+
+    ##--| writing
+
+    def flush(self) -> None:
+        with self._lock:
+            self._sink.write(self._buffer)
+
+    def close(self) -> None:
+        with self._lock:
+            self._sink.close(self._buffer)
+
+    def _add(self, *events:dict) -> None:
+        with self._lock:
+            self._buffer += events
+            if self._flush_every <= len(self._buffer):
+                self._sink.write(self._buffer)
+
+    def _track(self) -> int:
+        """ The track id of the current thread, naming the track on first use """
+        ident = threading.get_ident()
+        match self._tracks.get(ident, None):
+            case int() as track:
+                return track
+            case None:
+                with self._lock:
+                    track = self._tracks[ident] = len(self._tracks) + 1
+                    self._buffer.append({"ph": "M", "name": "thread_name", "pid": self._pid, "tid": track,
+                                         "args": {"name": threading.current_thread().name}})
+                return track
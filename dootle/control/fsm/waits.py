@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Which dependencies tasks waited on, and for how long.
+
+When the FSMTracker blocks a WAITing task on its unsettled dependencies, it notes the time.
+The dependency whose settling releases the task (the last one it waited on)
+is charged with the whole wait, as finishing it sooner would have released the task sooner.
+
+Summed per blocking task, and per blocking template (see history.history_key),
+this ranks what the rest of the run spent the most time waiting behind.
+"""
+# Imports:
+from __future__ import annotations
+
+# ##-- stdlib imports
+import logging as logmod
+from collections import Counter
+
+# ##-- end stdlib imports
+
+from .history import history_key
+
+# ##-- types
+# isort: off
+import abc
+import collections.abc
+from typing import TYPE_CHECKING, cast, assert_type, assert_never
+from typing import Generic, NewType, Never
+# Protocols:
+from typing import Protocol, runtime_checkable
+# Typing Decorators:
+from typing import no_type_check, final, override, overload
+
+if TYPE_CHECKING:
+    from doot.workflow._interface import TaskName_p
+    from jgdv import Maybe
+    from typing import Final
+    from typing import ClassVar, Any, LiteralString
+    from typing import Self, Literal
+    from typing import TypeGuard
+    from collections.abc import Iterable, Iterator, Callable, Generator
+    from collections.abc import Sequence, Mapping, MutableMapping, Hashable
+
+##--|
+
+# isort: on
+# ##-- end types
+
+##-- logging
+logging = logmod.getLogger(__name__)
+##-- end logging
+
+# Vars:
+NS_MS : Final[int] = 1_000_000
+##--|
+
+class WaitTimes:
+    """ The last dependency each task waited on, and the ns of waiting charged to each blocker """
+    __slots__ = ("_by_task", "_by_template", "_waiters", "last")
+    last          : dict[TaskName_p, tuple[TaskName_p, int]]
+    _by_task      : Counter[TaskName_p]
+    _by_template  : Counter[str]
+    _waiters      : Counter[TaskName_p]
+
+    def __init__(self) -> None:
+        self.last          = {}
+        self._by_task      = Counter()
+        self._by_template  = Counter()
+        self._waiters      = Counter()
+
+    def __len__(self) -> int:
+        return len(self.last)
+
+    def add(self, waiter:TaskName_p, blocker:TaskName_p, ns:int) -> None:
+        """ Charge blocker with the ns that waiter waited """
+        self.last[waiter]                         = (blocker, ns)
+        self._by_task[blocker]                   += ns
+        self._by_template[history_key(blocker)]  += ns
+        self._waiters[blocker]                   += 1
+
+    def last_blocker(self, waiter:TaskName_p) -> Maybe[tuple[TaskName_p, int]]:
+        """ The dependency that waiter was last released by, and how long it waited """
+        return self.last.get(waiter, None)
+
+    def by_task(self) -> list[tuple[TaskName_p, int]]:
+        """ Blocking tasks, most waited on first """
+        return self._by_task.most_common()
+
+    def by_template(self) -> list[tuple[str, int]]:
+        """ Blocking templates, most waited on first """
+        return self._by_template.most_common()
+
+    def report(self, *, top:int=10) -> list[str]:
+        """ Lines ranking the tasks, then templates, which caused the most downstream waiting """
+        lines : list[str] = [f"Top {top} Blocking Tasks (ms waited behind):"]
+        for name, ns in self._by_task.most_common(top):
+            lines.append(f"  {name} : {ns / NS_MS:>12.1f} : waiters {self._waiters[name]}")
+
+        lines.append(f"Top {top} Blocking Templates (ms waited behind):")
+        for name, ns in self._by_template.most_common(top):
+            lines.append(f"  {name} : {ns / NS_MS:>12.1f}")
+        else:
+            return lines